@@ -0,0 +1,175 @@
+# src/background.py
+"""Background work scheduled by model writes."""
+
+import asyncio
+import logging
+from datetime import datetime
+from uuid import uuid4
+from typing import Dict, Tuple, Optional, Any, Awaitable, Callable
+from fastapi import HTTPException
+from pymongo import UpdateMany
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+# Denormalized name fields on transactions, per renamed entity kind
+NAME_FIELDS = {
+    "account": [
+        ("account_uid", "account_name"),
+        ("from_account_uid", "from_account_name"),
+        ("to_account_uid", "to_account_name"),
+    ],
+    "category": [
+        ("category_uid", "category_name"),
+    ],
+}
+
+
+class RenameFanout:
+    """
+    Propagates account/category renames into the names stored on transactions.
+
+    Renames are debounced: they collect for `delay` seconds, repeated renames of
+    the same entity collapse to the latest name, and each flush sends a single
+    bulk_write of update_many operations. Only documents still carrying a
+    different name are rewritten. A failed flush puts its renames back (newer
+    names win) and is retried with exponential backoff up to `max_delay`.
+    """
+
+    def __init__(self, delay: float = 2.0, max_delay: float = 60.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._pending: Dict[Tuple[str, str], str] = {}
+        self._db: Optional[AsyncIOMotorDatabase] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, db: AsyncIOMotorDatabase, kind: str, uid: str, name: str) -> None:
+        """Queue a rename; starts the background flush if none is running."""
+        self._db = db
+        self._pending[(kind, uid)] = name
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        delay = self.delay
+        while self._pending:
+            await asyncio.sleep(delay)
+            try:
+                await self._write()
+                delay = self.delay
+            except Exception:
+                delay = min(delay * 2, self.max_delay)
+                logger.exception(
+                    "Rename fan-out failed; retrying %d rename(s) in %.0fs", len(self._pending), delay
+                )
+
+    async def _write(self) -> None:
+        pending, self._pending = self._pending, {}
+        if not pending or self._db is None:
+            return
+        operations = []
+        for (kind, uid), name in pending.items():
+            for uid_field, name_field in NAME_FIELDS[kind]:
+                operations.append(UpdateMany(
+                    {uid_field: uid, name_field: {"$ne": name}},
+                    {"$set": {name_field: name}},
+                ))
+        try:
+            await self._db["transactions"].bulk_write(operations, ordered=False)
+        except BaseException:
+            # Put the renames back (also when cancelled mid-write), unless renamed again meanwhile
+            for key, name in pending.items():
+                self._pending.setdefault(key, name)
+            raise
+
+    async def flush(self) -> None:
+        """Write pending renames now (used on shutdown and in tests)."""
+        task = self._cancel()
+        if task is not None:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self._write()
+
+    def reset(self) -> None:
+        """Drop pending renames and forget the database (used between tests)."""
+        self._cancel()
+        self._pending.clear()
+        self._db = None
+
+    def _cancel(self) -> Optional[asyncio.Task]:
+        """Stop the background flush; returns the cancelled task, if one was running."""
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return None
+        task.cancel()
+        return task
+
+
+rename_fanout = RenameFanout()
+
+
+class JobRunner:
+    """
+    Runs long operations as tracked background jobs.
+
+    Each job is a document in the `jobs` collection whose status moves from
+    pending to running to done (with its result) or failed (with the error),
+    so clients can poll it instead of holding a request open.
+    """
+
+    collection_name = "jobs"
+
+    def __init__(self):
+        self._tasks = set()
+
+    async def submit(
+        self,
+        db: AsyncIOMotorDatabase,
+        kind: str,
+        params: Dict[str, Any],
+        work: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Record a job and start `work` in the background; returns the job document."""
+        job = {
+            "uid": str(uuid4()),
+            "kind": kind,
+            "params": params,
+            "status": "pending",
+            "result": None,
+            "error": None,
+            "created_at": datetime.now(),
+            "finished_at": None,
+        }
+        await db[self.collection_name].insert_one(job)
+        job.pop("_id", None)
+        task = asyncio.create_task(self._run(db, job["uid"], work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    async def _run(self, db: AsyncIOMotorDatabase, uid: str, work) -> None:
+        jobs = db[self.collection_name]
+        await jobs.update_one({"uid": uid}, {"$set": {"status": "running"}})
+        try:
+            result = await work()
+            update = {"status": "done", "result": result}
+        except HTTPException as e:
+            update = {"status": "failed", "error": e.detail}
+        except Exception as e:
+            print(f"⚠️  Job {uid} failed: {e}")
+            update = {"status": "failed", "error": str(e)}
+        update["finished_at"] = datetime.now()
+        await jobs.update_one({"uid": uid}, {"$set": update})
+
+    async def get(self, db: AsyncIOMotorDatabase, uid: str) -> Optional[Dict[str, Any]]:
+        return await db[self.collection_name].find_one({"uid": uid}, {"_id": 0})
+
+    async def drain(self) -> None:
+        """Wait for running jobs (used on shutdown and in tests)."""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+
+job_runner = JobRunner()
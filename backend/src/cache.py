@@ -0,0 +1,451 @@
+# src/cache.py
+"""In-process caches shared by models and routes."""
+
+import bisect
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+from .periods import budget_period_keys
+
+# Every cache created here, so tests and admin tooling can reset them together
+_registry: List[Any] = []
+
+
+class NameCache:
+    """
+    Bounded LRU cache of uid → display name with hit/miss counters.
+
+    Models write through it on create/update/delete. Entries also expire after
+    ttl seconds, which bounds staleness when several worker processes each hold
+    their own copy and only the writing worker sees the invalidation.
+    """
+
+    def __init__(self, name: str, maxsize: int = 10000, ttl: float = 60.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        _registry.append(self)
+
+    def get(self, uid: str) -> Optional[str]:
+        """Return the cached name, or None on a miss (absent or expired)."""
+        entry = self._entries.get(uid)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[uid]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(uid)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, uid: str, name: Optional[str]) -> None:
+        if name is None:
+            self.invalidate(uid)
+            return
+        self._entries[uid] = (name, time.monotonic() + self.ttl)
+        self._entries.move_to_end(uid)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, uid: str) -> None:
+        self._entries.pop(uid, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    async def resolve(self, collection, uids: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Map uids to names, fetching only cache misses from collection in one $in query."""
+        names: Dict[str, str] = {}
+        missing = []
+        for uid in {u for u in uids if u}:
+            name = self.get(uid)
+            if name is None:
+                missing.append(uid)
+            else:
+                names[uid] = name
+        if missing:
+            cursor = collection.find({"uid": {"$in": missing}}, {"uid": 1, "name": 1, "_id": 0})
+            async for doc in cursor:
+                if doc.get("name") is not None:
+                    names[doc["uid"]] = doc["name"]
+                    self.set(doc["uid"], doc["name"])
+        return names
+
+
+# Category fields summed up the tree for /categories/tree
+TREE_TOTAL_FIELDS = ("total_spent", "total_earned", "budget_used")
+
+
+def _finalize_node(node: Dict[str, Any]) -> None:
+    """
+    Round aggregated totals and derive budget utilization flags for one tree node.
+    A tree node's totals already cover its subtree, so the stored subtree_* copies follow them.
+    """
+    for field in TREE_TOTAL_FIELDS:
+        node[field] = round(node[field], 2)
+        node["subtree_" + field] = node[field]
+    budget = node.get("budget", 0)
+    if budget and budget > 0:
+        node["budget_utilization"] = round(node["budget_used"] / budget, 4)
+        node["is_over_budget"] = node["budget_used"] > budget
+    else:
+        node["budget_utilization"] = None
+        node["is_over_budget"] = False
+
+
+def _bottom_up(roots: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Every node below ``roots``, children before their parents (iterative, no recursion limit)."""
+    order = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node["children"])
+    order.reverse()
+    return order
+
+
+def build_category_tree(
+    categories: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]], Dict[str, Dict[str, float]]]:
+    """
+    Nest categories under their parents, sum totals bottom-up and sort children by name.
+
+    Works iteratively in O(n), so deep trees don't hit the recursion limit.
+    Returns (roots, nodes by uid, each node's own un-aggregated totals).
+    """
+    nodes = {cat["uid"]: {**cat, "children": []} for cat in categories}
+    own = {
+        uid: {field: node.get(field, 0) or 0 for field in TREE_TOTAL_FIELDS}
+        for uid, node in nodes.items()
+    }
+    roots = []
+    for node in nodes.values():
+        parent_uid = node.get("parent_uid")
+        if parent_uid and parent_uid in nodes and parent_uid != node["uid"]:
+            nodes[parent_uid]["children"].append(node)
+        else:
+            roots.append(node)
+
+    for node in _bottom_up(roots):
+        for field in TREE_TOTAL_FIELDS:
+            node[field] = own[node["uid"]][field] + sum(child[field] for child in node["children"])
+        _finalize_node(node)
+        node["children"].sort(key=lambda c: c.get("name", ""))
+
+    roots.sort(key=lambda c: c.get("name", ""))
+    return roots, nodes, own
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def annotate_current_period(roots: List[Dict[str, Any]]) -> None:
+    """
+    Set each node's usage for its current budget period.
+
+    Like budget_used, the current-period usage covers the whole subtree: the
+    current bucket of each frequency is summed bottom-up, and every node reads
+    the sum for its own frequency. One-time budgets use the lifetime budget_used.
+    """
+    current = budget_period_keys()
+    usage: Dict[str, Dict[str, float]] = {}
+    for node in _bottom_up(roots):
+        buckets = node.get("budget_periods") or {}
+        sums = {frequency: buckets.get(key, 0) for frequency, key in current.items()}
+        for child in node["children"]:
+            for frequency, used in usage[child["uid"]].items():
+                sums[frequency] += used
+        usage[node["uid"]] = sums
+        frequency = node.get("frequency")
+        if frequency in sums:
+            node["budget_used_current_period"] = round(sums[frequency], 2)
+        else:
+            node["budget_used_current_period"] = node["budget_used"]
+
+
+def prune_tree(
+    roots: List[Dict[str, Any]],
+    nodes: Dict[str, Dict[str, Any]],
+    filters: Dict[str, Any],
+    max_depth: Optional[int] = None,
+    root_uid: Optional[str] = None,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Copy of an aggregated tree keeping the nodes whose fields equal ``filters``, plus the
+    ancestors needed to place them. Nodes keep their full subtree totals, so a parent
+    reports the same totals whichever children are shown. ``max_depth`` counts levels
+    below ``root_uid`` (or below the roots). Returns None if ``root_uid`` is unknown.
+    """
+    if root_uid:
+        if root_uid not in nodes:
+            return None
+        roots = [nodes[root_uid]]
+    depth = {node["uid"]: 0 for node in roots}
+    kept: Dict[str, Dict[str, Any]] = {}
+    for node in reversed(_bottom_up(roots)):
+        for child in node["children"]:
+            depth[child["uid"]] = depth[node["uid"]] + 1
+    for node in _bottom_up(roots):
+        if max_depth is not None and depth[node["uid"]] > max_depth:
+            continue
+        children = [kept[child["uid"]] for child in node["children"] if child["uid"] in kept]
+        if children or all(node.get(field) == value for field, value in filters.items()):
+            kept[node["uid"]] = {**node, "children": children}
+    return [kept[node["uid"]] for node in roots if node["uid"] in kept]
+
+
+def serialize_tree(roots: List[Dict[str, Any]]) -> bytes:
+    """JSON body for a built (or pruned) tree."""
+    return json.dumps(roots, default=_json_default, separators=(",", ":")).encode()
+
+
+class CategoryTreeCache:
+    """
+    The built and aggregated category tree, plus its pre-serialized JSON body.
+
+    CategoryModel writes invalidate it; transaction effects on category totals
+    patch the cached nodes in place (the node and its ancestors) and only mark
+    the body for lazy re-serialization. A TTL bounds staleness across workers.
+    Both bump a generation counter, so a tree read from the database while a
+    write landed is served once but not kept (see load).
+    """
+
+    def __init__(self, name: str, ttl: float = 30.0):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._roots: Optional[List[Dict[str, Any]]] = None
+        self._nodes: Dict[str, Dict[str, Any]] = {}
+        self._own: Dict[str, Dict[str, float]] = {}
+        self._body: Optional[bytes] = None
+        self._expires_at = 0.0
+        self._generation = 0
+        _registry.append(self)
+
+    @property
+    def generation(self) -> int:
+        """Changes on every invalidation or patch; read it before fetching categories for load."""
+        return self._generation
+
+    def get_bytes(self) -> Optional[bytes]:
+        """Return the serialized tree, or None if it must be rebuilt from the database."""
+        if self._roots is None or self._expires_at < time.monotonic():
+            self.misses += 1
+            self.invalidate()
+            return None
+        self.hits += 1
+        if self._body is None:
+            self._body = self._serialize()
+        return self._body
+
+    def pruned_bytes(
+        self, filters: Dict[str, Any], max_depth: Optional[int] = None, root_uid: Optional[str] = None
+    ) -> Optional[bytes]:
+        """Serialized prune_tree of the loaded tree (call right after get_bytes/load); None for an unknown root."""
+        roots = prune_tree(self._roots or [], self._nodes, filters, max_depth, root_uid)
+        return None if roots is None else serialize_tree(roots)
+
+    def load(self, categories: List[Dict[str, Any]], generation: Optional[int] = None) -> bytes:
+        """
+        Build the tree from category documents, cache it and return its serialized body.
+        If the generation moved past ``generation`` while the documents were read, a write
+        may be missing from them: the tree is installed already expired, so it serves the
+        current request (and pruned_bytes) but the next read rebuilds it.
+        """
+        self._roots, self._nodes, self._own = build_category_tree(categories)
+        self._body = self._serialize()
+        if generation is None or generation == self._generation:
+            self._expires_at = time.monotonic() + self.ttl
+        else:
+            self._expires_at = 0.0
+        return self._body
+
+    def apply_deltas(self, deltas: Dict[str, Dict[str, float]]) -> None:
+        """
+        Patch totals for {uid: {field: delta}} on each node and its ancestors.
+        ``budget_periods.<key>`` deltas only touch the node's own period bucket.
+        """
+        self._generation += 1
+        if self._roots is None:
+            return
+        for uid, fields in deltas.items():
+            changes = {f: d for f, d in fields.items() if f in TREE_TOTAL_FIELDS and d}
+            periods = {
+                f.split(".", 1)[1]: d for f, d in fields.items() if f.startswith("budget_periods.") and d
+            }
+            node = self._nodes.get(uid)
+            if not changes and not periods:
+                continue
+            if node is None:
+                # A category this tree hasn't seen; rebuild on next read
+                self.invalidate()
+                return
+            for key, delta in periods.items():
+                buckets = node.setdefault("budget_periods", {})
+                buckets[key] = buckets.get(key, 0) + delta
+            for field, delta in changes.items():
+                self._own[uid][field] += delta
+            seen = set()
+            while node is not None and node["uid"] not in seen:
+                seen.add(node["uid"])
+                for field, delta in changes.items():
+                    node[field] += delta
+                _finalize_node(node)
+                node = self._nodes.get(node.get("parent_uid"))
+            self._body = None
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._roots = None
+        self._nodes = {}
+        self._own = {}
+        self._body = None
+
+    def clear(self) -> None:
+        self.invalidate()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._nodes), "hits": self.hits, "misses": self.misses}
+
+    def _serialize(self) -> bytes:
+        annotate_current_period(self._roots)
+        return serialize_tree(self._roots)
+
+
+class NamePrefixIndex:
+    """
+    Typeahead index over account and category names.
+
+    A sorted array of (folded key, kind, uid) with one key per word of each name,
+    so "car" finds both "Car Loan" and "Credit Card". Lookups are a bisect plus a
+    short scan. Models upsert/remove entries on their writes once the index is
+    loaded; a TTL forces a periodic reload to pick up other workers' writes.
+    """
+
+    # Collections indexed, by result kind
+    SOURCES = {"account": "accounts", "category": "categories"}
+
+    def __init__(self, name: str, ttl: float = 300.0):
+        self.name = name
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._keys: List[Tuple[str, str, str]] = []
+        self._names: Dict[Tuple[str, str], str] = {}
+        self._expires_at = 0.0
+        _registry.append(self)
+
+    @property
+    def loaded(self) -> bool:
+        return self._expires_at >= time.monotonic()
+
+    @staticmethod
+    def _word_keys(name: str) -> List[str]:
+        """Folded name suffixes starting at each word, e.g. "credit card" and "card"."""
+        folded = " ".join(name.casefold().split())
+        keys = [folded]
+        keys.extend(folded[i + 1:] for i, ch in enumerate(folded) if ch == " ")
+        return keys
+
+    async def ensure_loaded(self, db) -> None:
+        """Build the index from the name fields of every account and category, if stale."""
+        if self.loaded:
+            self.hits += 1
+            return
+        self.misses += 1
+        names: Dict[Tuple[str, str], str] = {}
+        for kind, collection in self.SOURCES.items():
+            async for doc in db[collection].find({}, {"uid": 1, "name": 1, "_id": 0}):
+                if doc.get("name"):
+                    names[(kind, doc["uid"])] = doc["name"]
+        self._names = names
+        self._keys = sorted(
+            (key, kind, uid) for (kind, uid), name in names.items() for key in self._word_keys(name)
+        )
+        self._expires_at = time.monotonic() + self.ttl
+
+    def upsert(self, kind: str, uid: str, name: Optional[str]) -> None:
+        """Index a created or renamed entity (no-op until the index is loaded)."""
+        if not self.loaded:
+            return
+        self.remove(kind, uid)
+        if not name:
+            return
+        self._names[(kind, uid)] = name
+        for key in self._word_keys(name):
+            bisect.insort(self._keys, (key, kind, uid))
+
+    def remove(self, kind: str, uid: str) -> None:
+        old = self._names.pop((kind, uid), None)
+        if old is None:
+            return
+        for key in self._word_keys(old):
+            i = bisect.bisect_left(self._keys, (key, kind, uid))
+            if i < len(self._keys) and self._keys[i] == (key, kind, uid):
+                del self._keys[i]
+
+    # Matches examined per search, which bounds the cost of one-letter queries
+    SCAN_LIMIT = 200
+
+    def search(self, q: str, limit: int = 10, kind: Optional[str] = None) -> List[Dict[str, str]]:
+        """Entities with a name word starting with ``q``, whole-name matches first."""
+        prefix = " ".join(q.casefold().split())
+        if not prefix:
+            return []
+        results: List[Dict[str, str]] = []
+        seen = set()
+        for i in range(bisect.bisect_left(self._keys, (prefix,)), len(self._keys)):
+            key, entry_kind, uid = self._keys[i]
+            if not key.startswith(prefix):
+                break
+            if (kind and entry_kind != kind) or (entry_kind, uid) in seen:
+                continue
+            seen.add((entry_kind, uid))
+            results.append({"kind": entry_kind, "uid": uid, "name": self._names[(entry_kind, uid)]})
+            if len(results) >= self.SCAN_LIMIT:
+                break
+        results.sort(key=lambda r: (not r["name"].casefold().startswith(prefix), r["name"].casefold()))
+        return results[:limit]
+
+    def clear(self) -> None:
+        self._keys = []
+        self._names = {}
+        self._expires_at = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._names), "keys": len(self._keys), "hits": self.hits, "misses": self.misses}
+
+
+# Shared by AccountModel and CategoryModel writes and the /search routes
+name_index = NamePrefixIndex("name_search")
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every registered cache."""
+    return {cache.name: cache.stats() for cache in _registry}
+
+
+def clear_caches() -> None:
+    """Drop all cached entries (used between tests and after bulk changes made outside the models)."""
+    for cache in _registry:
+        cache.clear()
@@ -1,5 +1,5 @@
 """Application configuration and settings."""
-from typing import Optional
+from typing import Optional, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 from enum import Enum
@@ -20,12 +20,21 @@ class DatabaseSettings(BaseSettings):
     MONGO_PORT: str = "27017"
     MONGO_URI: Optional[str] = None
     APP_ENV: Environment = Environment.DEVELOPMENT
+    # "timeseries" stores the ledger in a MongoDB time-series collection (see src/migrate_timeseries.py)
+    TRANSACTIONS_STORAGE: Literal["standard", "timeseries"] = "standard"
+    # IANA timezone whose calendar days the summary rollups are bucketed by (see models/rollups.py)
+    REPORTING_TIMEZONE: str = "UTC"
 
     @property
     def database_name(self) -> str:
         """Get the database name based on environment."""
         return "expenseTracker_test" if self.APP_ENV == Environment.TEST else "expenseTracker"
     
+    @property
+    def transactions_timeseries(self) -> bool:
+        """Whether the transactions collection uses time-series storage."""
+        return self.TRANSACTIONS_STORAGE == "timeseries"
+
     @property
     def connection_uri(self) -> str:
         """Get the MongoDB connection URI."""
@@ -5,7 +5,7 @@ from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from mongomock import MongoClient as MockMongoClient
 import asyncio
 from contextlib import asynccontextmanager
-from typing import Optional, AsyncGenerator
+from typing import Optional, AsyncGenerator, Dict
 
 from src.config.settings import get_database_settings, Environment, COLLECTIONS
 from src.config.exceptions import (
@@ -18,6 +18,8 @@ from src.config.exceptions import (
 # Global client and db - made private to enforce usage through functions
 _client: Optional[AsyncIOMotorClient] = None
 _db: Optional[AsyncIOMotorDatabase] = None
+# Whether each connected deployment (keyed by client id) can run multi-document transactions
+_transaction_support: Dict[int, bool] = {}
 
 async def connect_to_mongo() -> AsyncIOMotorClient:
     """
@@ -107,6 +109,43 @@ async def get_client() -> AsyncIOMotorClient:
             raise DatabaseInitializationError("Client not initialized and connection failed") from e
     return _client
 
+async def supports_transactions(client) -> bool:
+    """
+    Return True if the deployment behind client is a replica set or sharded cluster.
+
+    Standalone servers (like the default docker-compose setup) reject
+    multi-document transactions, so callers fall back to non-transactional writes.
+    The answer is cached per client.
+    """
+    key = id(client)
+    if key not in _transaction_support:
+        try:
+            hello = await client.admin.command("hello")
+            _transaction_support[key] = bool(hello.get("setName")) or hello.get("msg") == "isdbgrid"
+        except Exception:
+            _transaction_support[key] = False
+    return _transaction_support[key]
+
+@asynccontextmanager
+async def start_atomic(db: AsyncIOMotorDatabase) -> AsyncGenerator[Optional[object], None]:
+    """
+    Open a client session with a running transaction for db's deployment.
+
+    Yields the session, or None when transactions are unsupported. The
+    transaction commits when the block exits and aborts if it raises.
+
+    Usage:
+        async with start_atomic(db) as session:
+            await db.transactions.insert_one(doc, session=session)
+    """
+    client = db.client
+    if not await supports_transactions(client):
+        yield None
+        return
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
 def get_collection(collection_name: str) -> AsyncIOMotorDatabase:
     """
     Get a specific collection by name.
@@ -1,6 +1,8 @@
 # src/db_indexes.py
 from src.database import get_db
-from pymongo import IndexModel, ASCENDING
+from src.config.settings import get_database_settings
+from src.migrate_timeseries import ensure_timeseries_collection
+from pymongo import IndexModel, ASCENDING, DESCENDING
 
 async def create_indexes():
     """Create MongoDB indexes for all collections"""
@@ -9,14 +11,33 @@ async def create_indexes():
         raise RuntimeError("Database is not connected before index creation")
 
     # Transaction indexes
+    timeseries = get_database_settings().transactions_timeseries
+    if timeseries:
+        await ensure_timeseries_collection(db)
+
+    # Filters are equality-then-sort: each filter field leads a (field, date, uid)
+    # index so filtered, paginated listings stay index scans
     transaction_indexes = [
-        IndexModel([("uid", ASCENDING)], unique=True),
-        IndexModel([("type", ASCENDING)]),
-        IndexModel([("date", ASCENDING)]),
-        IndexModel([("account_uid", ASCENDING)]),
-        IndexModel([("category_uid", ASCENDING)])
+        # Time-series collections don't support unique indexes
+        IndexModel([("uid", ASCENDING)], unique=not timeseries),
+        # Keyset pagination: newest first, uid breaks ties on equal dates
+        IndexModel([("date", DESCENDING), ("uid", DESCENDING)]),
+        IndexModel([("type", ASCENDING), ("date", DESCENDING), ("uid", DESCENDING)]),
+        IndexModel([("account_uid", ASCENDING), ("date", DESCENDING), ("uid", DESCENDING)]),
+        IndexModel([("from_account_uid", ASCENDING), ("date", DESCENDING), ("uid", DESCENDING)]),
+        IndexModel([("to_account_uid", ASCENDING), ("date", DESCENDING), ("uid", DESCENDING)]),
+        IndexModel([("category_uid", ASCENDING), ("date", DESCENDING), ("uid", DESCENDING)])
     ]
     await db.transactions.create_indexes(transaction_indexes)
+    # Single-field indexes from older deployments only cost writes now: date ranges and
+    # sorts use the (date, uid) index, each filter field leads its own (field, date, uid)
+    # index, and amount is never indexed. An amount-only filter walks (date, uid) newest
+    # first and stops once a page is full, so its cost grows with how rare matches are;
+    # combine it with a date range or another filter to bound the scan.
+    existing = await db.transactions.index_information()
+    for obsolete in ("date_1", "amount_1", "type_1", "account_uid_1", "category_uid_1"):
+        if obsolete in existing:
+            await db.transactions.drop_index(obsolete)
 
     # Account indexes
     account_indexes = [
@@ -34,9 +55,34 @@ async def create_indexes():
     category_indexes = [
         IndexModel([("uid", ASCENDING)], unique=True),
         IndexModel([("name", ASCENDING)]),
+        IndexModel([("parent_uid", ASCENDING)]),
+        # Materialized path: subtree and depth-limited reads are one scan of this index
+        IndexModel([("ancestors", ASCENDING), ("depth", ASCENDING)]),
         IndexModel([("created_at", ASCENDING)]),
         IndexModel([("updated_at", ASCENDING)])
     ]
 
     await db.categories.create_indexes(category_indexes)
-    print("✅ MongoDB indexes created for categories")
\ No newline at end of file
+    print("✅ MongoDB indexes created for categories")
+
+    # Rollup indexes: the write path upserts on the full key, summaries scan by period
+    rollup_indexes = [
+        IndexModel(
+            [("period", ASCENDING), ("account_uid", ASCENDING), ("category_uid", ASCENDING), ("type", ASCENDING)],
+            unique=True
+        ),
+        IndexModel([("account_uid", ASCENDING), ("period", ASCENDING)]),
+        IndexModel([("category_uid", ASCENDING), ("period", ASCENDING)])
+    ]
+
+    await db.rollups.create_indexes(rollup_indexes)
+    print("✅ MongoDB indexes created for rollups")
+
+    # Balance snapshots: one row per account per day; net worth sweeps them by day
+    snapshot_indexes = [
+        IndexModel([("account_uid", ASCENDING), ("day", ASCENDING)], unique=True),
+        IndexModel([("day", ASCENDING)])
+    ]
+
+    await db.balance_snapshots.create_indexes(snapshot_indexes)
+    print("✅ MongoDB indexes created for balance snapshots")
\ No newline at end of file
@@ -0,0 +1,148 @@
+# src/migrate_timeseries.py
+"""
+Convert the transactions collection to MongoDB time-series storage.
+
+In time-series mode MongoDB groups transactions into internal buckets per
+account (metaField) and time window (timeField), so date-range scans and
+aggregations over months of data read a few bucket documents instead of one
+document per transaction. TransactionModel's API is unchanged.
+
+Trade-offs of time-series mode:
+  - time-series collections don't support unique indexes, so uids are claimed
+    in the small 'transaction_uids' registry (keyed by _id) before each insert.
+  - writes to time-series collections can't join multi-document
+    transactions, so ledger writes and their side effects are not atomic;
+    updates and deletes are applied compare-and-swap instead.
+  - updates and deletes that filter on fields other than the metaField (renames,
+    category merges) need MongoDB 8.0 or later.
+
+Usage (stop the API first, then set TRANSACTIONS_STORAGE=timeseries):
+    python -m src.migrate_timeseries --batch-size 5000 [--drop-legacy]
+"""
+
+import argparse
+import asyncio
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+from src.database import get_db, close_mongo_connection
+from src.models.transaction import UID_REGISTRY
+
+TRANSACTIONS = "transactions"
+# Arbitrary updates/deletes on time-series measurements
+MIN_SERVER_VERSION = (8, 0)
+
+TIMESERIES_OPTIONS = {
+    "timeField": "date",
+    "metaField": "account_uid",
+    # "hours" granularity buckets span one day: one bucket per account per day
+    "granularity": "hours",
+}
+
+
+async def is_timeseries(db: AsyncIOMotorDatabase, name: str = TRANSACTIONS) -> bool:
+    """Return True if the named collection exists and is a time-series collection."""
+    async for info in await db.list_collections(filter={"name": name}):
+        return info.get("type") == "timeseries"
+    return False
+
+
+async def check_server_version(db: AsyncIOMotorDatabase) -> None:
+    info = await db.client.server_info()
+    if tuple(info.get("versionArray", [0, 0])[:2]) < MIN_SERVER_VERSION:
+        raise RuntimeError(
+            f"TRANSACTIONS_STORAGE=timeseries needs MongoDB {'.'.join(map(str, MIN_SERVER_VERSION))}+, "
+            f"server is {info.get('version')}"
+        )
+
+
+async def register_uids(db: AsyncIOMotorDatabase, docs) -> None:
+    """Claim the uids of already-stored transactions in the registry; existing claims are kept."""
+    claims = [{"_id": doc["uid"]} for doc in docs if doc.get("uid")]
+    if not claims:
+        return
+    try:
+        await db[UID_REGISTRY].insert_many(claims, ordered=False)
+    except BulkWriteError as e:
+        if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+            raise
+
+
+async def ensure_timeseries_collection(db: AsyncIOMotorDatabase) -> None:
+    """Create the transactions collection as time-series if it doesn't exist yet."""
+    await check_server_version(db)
+    if TRANSACTIONS in await db.list_collection_names():
+        if not await is_timeseries(db):
+            raise RuntimeError(
+                "TRANSACTIONS_STORAGE=timeseries but 'transactions' is a regular collection; "
+                "run `python -m src.migrate_timeseries` first"
+            )
+        return
+    await db.create_collection(TRANSACTIONS, timeseries=TIMESERIES_OPTIONS)
+
+
+async def migrate(db: AsyncIOMotorDatabase, batch_size: int = 5000, drop_legacy: bool = False) -> int:
+    """
+    Move every transaction into a new time-series 'transactions' collection, batch by batch.
+
+    The regular collection is renamed aside first (time-series collections can't
+    be renamed), then copied over in _id order so the copy can resume on rerun.
+    Returns the number of documents copied.
+    """
+    await check_server_version(db)
+    if await is_timeseries(db):
+        legacy_names = [n for n in await db.list_collection_names() if n.startswith(f"{TRANSACTIONS}_legacy_")]
+        if not legacy_names:
+            print("✅ transactions is already a time-series collection")
+            return 0
+        legacy_name = sorted(legacy_names)[-1]
+    else:
+        legacy_name = f"{TRANSACTIONS}_legacy_{datetime.now():%Y%m%d%H%M%S}"
+        if TRANSACTIONS in await db.list_collection_names():
+            await db[TRANSACTIONS].rename(legacy_name)
+        await db.create_collection(TRANSACTIONS, timeseries=TIMESERIES_OPTIONS)
+
+    legacy = db[legacy_name]
+    target = db[TRANSACTIONS]
+
+    # Documents keep their _id, so a rerun resumes after the last one copied
+    query = {}
+    last = await target.find({}, {"_id": 1}).sort("_id", -1).limit(1).to_list(length=1)
+    if last:
+        query = {"_id": {"$gt": last[0]["_id"]}}
+
+    copied = 0
+    while True:
+        batch = await legacy.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+        if not batch:
+            break
+        # Claim first: a rerun after a crash re-copies this batch and re-claiming is a no-op
+        await register_uids(db, batch)
+        # Ordered, so an interrupted batch leaves a prefix and resuming after the max _id skips nothing
+        await target.insert_many(batch, ordered=True)
+        copied += len(batch)
+        query = {"_id": {"$gt": batch[-1]["_id"]}}
+        print(f"… copied {copied} transactions")
+
+    if drop_legacy:
+        await legacy.drop()
+    print(f"✅ Migrated {copied} transactions to time-series storage (legacy: {legacy_name})")
+    return copied
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--drop-legacy", action="store_true", help="Drop the old collection after copying")
+    args = parser.parse_args()
+
+    db = await get_db()
+    try:
+        await migrate(db, batch_size=args.batch_size, drop_legacy=args.drop_legacy)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
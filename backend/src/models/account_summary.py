@@ -0,0 +1,85 @@
+from typing import Optional, Dict, Any
+from collections import defaultdict
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+class AccountSummaryModel:
+    """
+    Single document of account totals, kept in step by AccountModel and TransactionModel.
+
+    Holds the total balance and account count overall and per account type, so a
+    dashboard summary is one fetch by _id however many accounts there are. Writers
+    only $inc it; rebuild() recomputes it from the accounts collection.
+    """
+    collection_name = "account_summary"
+    SUMMARY_ID = "global"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[self.collection_name]
+
+    @staticmethod
+    def contribution(account: Dict[str, Any], sign: int = 1) -> Dict[str, float]:
+        """$inc fields that add (sign=-1: remove) one account's balance and count."""
+        balance = (account.get("balance", 0) or 0) * sign
+        prefix = f"by_type.{account.get('type')}."
+        return {
+            "total_balance": balance,
+            "account_count": sign,
+            prefix + "balance": balance,
+            prefix + "count": sign,
+        }
+
+    def operation(self, inc: Dict[str, float]) -> Optional[UpdateOne]:
+        """The upserting $inc for the summary document, or None if nothing changes."""
+        inc = {field: delta for field, delta in inc.items() if delta}
+        if not inc:
+            return None
+        return UpdateOne({"_id": self.SUMMARY_ID}, {"$inc": inc}, upsert=True)
+
+    async def increment(self, inc: Dict[str, float]) -> None:
+        op = self.operation(inc)
+        if op:
+            await self.collection.bulk_write([op])
+
+    @staticmethod
+    def balance_increments(balances: Dict[str, Dict[str, float]], types: Dict[str, Optional[str]]) -> Dict[str, float]:
+        """
+        $inc fields for {account_uid: {"balance": delta}} from TransactionModel's effects,
+        given the type of each account (fetched by the caller with the balances).
+        """
+        changes = {uid: fields.get("balance", 0) for uid, fields in balances.items() if fields.get("balance")}
+        inc: Dict[str, float] = defaultdict(float)
+        for uid, delta in changes.items():
+            # Unknown accounts don't count towards the summary, as their $inc matches nothing
+            if uid not in types:
+                continue
+            inc["total_balance"] += delta
+            inc[f"by_type.{types[uid]}.balance"] += delta
+        return dict(inc)
+
+    async def get(self) -> Dict[str, Any]:
+        """The summary document, built on first use."""
+        summary = await self.collection.find_one({"_id": self.SUMMARY_ID})
+        if summary is None:
+            summary = await self.rebuild()
+        return summary
+
+    async def rebuild(self) -> Dict[str, Any]:
+        """Recompute the summary from the accounts collection."""
+        pipeline = [{"$group": {
+            "_id": "$type",
+            "balance": {"$sum": {"$ifNull": ["$balance", 0]}},
+            "count": {"$sum": 1},
+        }}]
+        by_type = {row["_id"]: {"balance": row["balance"], "count": row["count"]}
+                   async for row in self.db["accounts"].aggregate(pipeline)}
+        summary = {
+            "_id": self.SUMMARY_ID,
+            "total_balance": sum(t["balance"] for t in by_type.values()),
+            "account_count": sum(t["count"] for t in by_type.values()),
+            "by_type": by_type,
+        }
+        await self.collection.replace_one({"_id": self.SUMMARY_ID}, summary, upsert=True)
+        return summary
@@ -1,10 +1,20 @@
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from collections import defaultdict
 from uuid import uuid4
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from ..cache import NameCache, name_index
+from ..background import rename_fanout
+from .snapshots import SnapshotModel
+from .account_summary import AccountSummaryModel
 
 class AccountModel:
     collection_name = "accounts"
+    # Shared uid → name cache, kept in step by this model's writes
+    name_cache = NameCache("account_names")
+    # Interest periods in a year, by interest_frequency
+    INTEREST_PERIODS_PER_YEAR = {"monthly": 12, "quarterly": 4, "annually": 1}
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -31,6 +41,10 @@ class AccountModel:
         data = self.prepare_data(data)
         result = await self.collection.insert_one(data)
         new_account = await self.collection.find_one({"_id": result.inserted_id})
+        self.name_cache.set(new_account["uid"], new_account.get("name"))
+        name_index.upsert("account", new_account["uid"], new_account.get("name"))
+        await SnapshotModel(self.db).record_balance(new_account["uid"], new_account.get("balance", 0) or 0)
+        await AccountSummaryModel(self.db).increment(AccountSummaryModel.contribution(new_account))
         return new_account
     
     async def get_all(self) -> List[Dict[str, Any]]:
@@ -38,6 +52,10 @@ class AccountModel:
         cursor = self.collection.find().sort("created_at", -1)
         return await cursor.to_list(length=1000)
     
+    async def get_names(self, uids) -> Dict[str, str]:
+        """Resolve uids to names through the shared cache; only misses hit the database."""
+        return await self.name_cache.resolve(self.collection, uids)
+
     async def get_by_uid(self, uid: str) -> Optional[Dict[str, Any]]:
         """Get an account by UID"""
         return await self.collection.find_one({"uid": uid})
@@ -45,15 +63,40 @@ class AccountModel:
     async def update(self, uid: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Update an account"""
         data["updated_at"] = datetime.now()
-        result = await self.collection.update_one({"uid": uid}, {"$set": data})
-        if result.modified_count:
-            return await self.get_by_uid(uid)
-        return None
+        before = await self.collection.find_one_and_update(
+            {"uid": uid}, {"$set": data}, return_document=ReturnDocument.BEFORE
+        )
+        if "name" in data:
+            self.name_cache.invalidate(uid)
+        if before is None:
+            return None
+        if "name" in data:
+            name_index.upsert("account", uid, data["name"])
+            # Rewrite the name stored on this account's transactions in the background
+            rename_fanout.schedule(self.db, "account", uid, data["name"])
+        if data.get("balance") is not None:
+            # A direct balance edit goes into today's snapshot as the difference it makes
+            await SnapshotModel(self.db).apply_adjustment(uid, before.get("balance", 0) or 0, data["balance"])
+        changed = {**before, **data}
+        if changed.get("type") != before.get("type") or changed.get("balance") != before.get("balance"):
+            # Move the account's share of the summary from its old type/balance to its new one
+            inc = defaultdict(float)
+            for account, sign in ((before, -1), (changed, 1)):
+                for field, delta in AccountSummaryModel.contribution(account, sign).items():
+                    inc[field] += delta
+            await AccountSummaryModel(self.db).increment(inc)
+        return await self.get_by_uid(uid)
     
     async def delete(self, uid: str) -> bool:
         """Delete an account"""
-        result = await self.collection.delete_one({"uid": uid})
-        return result.deleted_count > 0
+        deleted = await self.collection.find_one_and_delete({"uid": uid})
+        self.name_cache.invalidate(uid)
+        name_index.remove("account", uid)
+        if deleted is None:
+            return False
+        await SnapshotModel(self.db).delete_account(uid)
+        await AccountSummaryModel(self.db).increment(AccountSummaryModel.contribution(deleted, -1))
+        return True
     
     async def calculate_interest(self, uid: str) -> Optional[float]:
         """Calculate monthly interest for an account"""
@@ -65,16 +108,8 @@ class AccountModel:
         annual_rate = account.get("interest_rate", 0)
         frequency = account.get("interest_frequency", "monthly")
         
-        # Calculate interest based on frequency
-        if frequency == "monthly":
-            interest = balance * (annual_rate / 100) / 12
-        elif frequency == "quarterly":
-            interest = balance * (annual_rate / 100) / 4
-        elif frequency == "annually":
-            interest = balance * (annual_rate / 100)
-        else:
-            interest = balance * (annual_rate / 100) / 12  # default to monthly
-        
+        # Calculate interest based on frequency (monthly by default)
+        interest = balance * (annual_rate / 100) / self.INTEREST_PERIODS_PER_YEAR.get(frequency, 12)
         return round(interest, 2)
     
     @classmethod
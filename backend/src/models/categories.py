@@ -1,12 +1,27 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, NoReturn, Tuple
+from collections import defaultdict
 from datetime import datetime
+import asyncio
 from uuid import uuid4
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne, UpdateMany, ReturnDocument
+from pymongo.errors import BulkWriteError
+from ..cache import (
+    NameCache,
+    CategoryTreeCache,
+    TREE_TOTAL_FIELDS,
+    name_index,
+)
+from ..background import rename_fanout
 from fastapi import HTTPException
 
 
 class CategoryModel:
     collection_name = "categories"
+    # Shared uid → name cache, kept in step by this model's writes
+    name_cache = NameCache("category_names")
+    # Built /categories/tree, invalidated by writes here and patched by transaction effects
+    tree_cache = CategoryTreeCache("category_tree")
 
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
@@ -27,81 +42,274 @@ class CategoryModel:
 
         # initialize hierarchy and budget fields
         data.setdefault("parent_uid", None)
+        data.setdefault("ancestors", [])
+        data.setdefault("depth", 0)
         data.setdefault("total_spent", 0)
         data.setdefault("total_earned", 0)
         data.setdefault("budget", 0)
         data.setdefault("budget_used", 0)
+        # Budget usage per period bucket, for every frequency (see periods.budget_period_keys)
+        data.setdefault("budget_periods", {})
+        for field in TREE_TOTAL_FIELDS:
+            data.setdefault("subtree_" + field, 0)
         return data
     
     async def create(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Create a new category.
         - Checks if parent exists (if parent_uid provided)
-        - Ensures total child budgets do not exceed parent's budget
+        - Ensures total child budgets do not exceed parent's budget, by reserving
+          this category's budget on the parent's children_budget_sum atomically
         """
         data = self.prepare_data(data)
+        data.setdefault("children_budget_sum", 0)
         parent_uid = data.get("parent_uid")
+        budget = data.get("budget") or 0
 
         # ✅ Validate parent if this is a subcategory
         if parent_uid:
-            parent = await self.get_by_uid(parent_uid)
-            if not parent:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Parent category with UID '{parent_uid}' not found."
-                )
+            parent = await self._reserve_child_budget(parent_uid, budget)
+            data["ancestors"] = self.path_below(parent)
+            data["depth"] = len(data["ancestors"])
 
-            parent_budget = parent.get("budget", 0)
-            if parent_budget <= 0:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Parent category '{parent.get('name')}' has no budget set."
-                )
+        # ✅ Proceed with insertion
+        try:
+            result = await self.collection.insert_one(data)
+        except Exception:
+            if parent_uid:
+                await self._release_child_budget(parent_uid, budget)
+            raise
+        new_category = await self.collection.find_one({"_id": result.inserted_id})
+        self.name_cache.set(new_category["uid"], new_category.get("name"))
+        name_index.upsert("category", new_category["uid"], new_category.get("name"))
+        self.tree_cache.invalidate()
+        return new_category
 
-            # Get existing children
-            children = await self.get_children(parent_uid)
-            total_child_budget = sum(child.get("budget", 0) for child in children)
 
-            # Include this new child's proposed budget
-            new_total = total_child_budget + data.get("budget", 0)
+    async def create_many(self, categories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Create a batch of categories whose parents may be in the batch or already stored.
 
-            # ✅ Overflow detection
-            if new_total > parent_budget:
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"Budget overflow: total child budgets ({new_total}) "
-                        f"would exceed parent budget ({parent_budget})."
-                    ),
-                )
+        Uniqueness, parent references, cycles and budget containment are checked in one
+        in-memory pass (plus one $in query each for clashing uids and outside parents);
+        hierarchy fields are computed here and everything goes in with one insert_many.
+        Raises HTTPException(400) listing every problem; nothing is written in that case.
+        """
+        docs = [self.prepare_data(dict(cat)) for cat in categories]
+        errors: List[Dict[str, Any]] = []
+        by_uid: Dict[str, Dict[str, Any]] = {}
+        for doc in docs:
+            doc.setdefault("children_budget_sum", 0)
+            if doc["uid"] in by_uid:
+                errors.append({"uid": doc["uid"], "error": "Duplicate uid in request"})
+            by_uid[doc["uid"]] = doc
 
-        # ✅ Proceed with insertion
-        result = await self.collection.insert_one(data)
-        new_category = await self.collection.find_one({"_id": result.inserted_id})
-        return new_category
+        outside_uids = list({d["parent_uid"] for d in docs if d["parent_uid"] and d["parent_uid"] not in by_uid})
+        existing, outside = await asyncio.gather(
+            self.collection.find({"uid": {"$in": list(by_uid)}}, {"uid": 1, "_id": 0}).to_list(length=None),
+            self.collection.find({"uid": {"$in": outside_uids}}).to_list(length=None),
+        )
+        errors.extend({"uid": doc["uid"], "error": "Category uid already exists"} for doc in existing)
+        outside_parents = {doc["uid"]: doc for doc in outside}
+
+        # Ancestors: walk up inside the batch until a root, a stored parent or a known path
+        paths: Dict[str, List[str]] = {}
+        for doc in docs:
+            chain, node, seen = [], doc, set()
+            while node is not None and node["uid"] not in paths and node["uid"] not in seen:
+                seen.add(node["uid"])
+                chain.append(node)
+                node = by_uid.get(node["parent_uid"])
+            if node is not None and node["uid"] not in paths:
+                errors.append({"uid": doc["uid"], "error": "Parent references form a cycle"})
+                paths.update((member["uid"], []) for member in chain)
+                continue
+            if node is not None:
+                prefix = paths[node["uid"]] + [node["uid"]]
+            elif chain[-1]["parent_uid"] in outside_parents:
+                prefix = self.path_below(outside_parents[chain[-1]["parent_uid"]])
+            else:
+                prefix = []
+                if chain[-1]["parent_uid"]:
+                    errors.append({
+                        "uid": chain[-1]["uid"],
+                        "error": f"Parent category '{chain[-1]['parent_uid']}' not found",
+                    })
+            for member in reversed(chain):
+                paths[member["uid"]] = prefix
+                member["ancestors"] = prefix
+                member["depth"] = len(prefix)
+                prefix = prefix + [member["uid"]]
+
+        # Budget containment per parent, for parents in the batch and already stored alike
+        child_budgets: Dict[str, float] = defaultdict(float)
+        for doc in docs:
+            if doc["parent_uid"]:
+                child_budgets[doc["parent_uid"]] += doc.get("budget") or 0
+        for parent_uid, total in child_budgets.items():
+            parent = by_uid.get(parent_uid)
+            if parent is None:
+                continue
+            parent["children_budget_sum"] = total
+            parent_budget = parent.get("budget") or 0
+            if parent_budget <= 0:
+                errors.append({"uid": parent_uid, "error": f"Parent category '{parent.get('name')}' has no budget set."})
+            elif total > parent_budget:
+                errors.append({
+                    "uid": parent_uid,
+                    "error": f"Budget overflow: total child budgets ({total}) would exceed parent budget ({parent_budget}).",
+                })
+        if errors:
+            raise HTTPException(status_code=400, detail=errors)
+
+        # Stored parents are the only shared state; reserve their share atomically
+        reserved: List[Tuple[str, float]] = []
+        try:
+            for parent_uid in outside_parents:
+                await self._reserve_child_budget(parent_uid, child_budgets[parent_uid])
+                reserved.append((parent_uid, child_budgets[parent_uid]))
+            await self.collection.insert_many(docs, ordered=False)
+        except Exception as e:
+            if isinstance(e, BulkWriteError):
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                written = [doc["uid"] for i, doc in enumerate(docs) if i not in failed]
+                await self.collection.delete_many({"uid": {"$in": written}})
+            for parent_uid, amount in reserved:
+                await self._release_child_budget(parent_uid, amount)
+            raise
 
+        for doc in docs:
+            self.name_cache.set(doc["uid"], doc.get("name"))
+            name_index.upsert("category", doc["uid"], doc.get("name"))
+        self.tree_cache.invalidate()
+        return docs
 
     async def get_all(self) -> List[Dict[str, Any]]:
         """Get all categories."""
         cursor = self.collection.find().sort("created_at", -1)
         return await cursor.to_list(length=1000)
 
+    async def get_names(self, uids) -> Dict[str, str]:
+        """Resolve uids to names through the shared cache; only misses hit the database."""
+        return await self.name_cache.resolve(self.collection, uids)
+
     async def get_by_uid(self, uid: str) -> Optional[Dict[str, Any]]:
         """Get a category by UID"""
         return await self.collection.find_one({"uid": uid})
 
     async def update(self, uid: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Update a category"""
+        """
+        Update a category.
+        - A parent change rewrites the path of the whole subtree
+        - Budget changes are reserved on the parent's children_budget_sum, and a budget
+          can't drop below the sum already given to this category's own children
+        """
         data["updated_at"] = datetime.now()
-        result = await self.collection.update_one({"uid": uid}, {"$set": data})
+        query: Dict[str, Any] = {"uid": uid}
+        current = None
+        reserved = None
+        if "parent_uid" in data or "budget" in data:
+            current = await self.get_by_uid(uid)
+            if not current:
+                return None
+            old_parent, new_parent = current.get("parent_uid"), data.get("parent_uid", current.get("parent_uid"))
+            old_budget, new_budget = current.get("budget") or 0, (data.get("budget", current.get("budget")) or 0)
+            if old_parent != new_parent:
+                data["ancestors"] = await self._ancestors_for_parent(uid, new_parent)
+                data["depth"] = len(data["ancestors"])
+                if new_parent:
+                    await self._reserve_child_budget(new_parent, new_budget)
+                    reserved = (new_parent, new_budget)
+            elif new_parent and new_budget > old_budget:
+                await self._reserve_child_budget(new_parent, new_budget - old_budget)
+                reserved = (new_parent, new_budget - old_budget)
+            if "budget" in data:
+                query["$expr"] = {"$lte": [{"$ifNull": ["$children_budget_sum", 0]}, new_budget]}
+
+        result = await self.collection.update_one(query, {"$set": data})
+        if not result.matched_count:
+            if reserved:
+                await self._release_child_budget(*reserved)
+            if current:
+                raise HTTPException(
+                    status_code=400,
+                    detail=(
+                        f"Budget overflow: child budgets ({current.get('children_budget_sum', 0)}) "
+                        f"would exceed the new budget ({data.get('budget') or 0})."
+                    ),
+                )
+            return None
+
+        if current:
+            if old_parent != new_parent:
+                if old_parent:
+                    await self._release_child_budget(old_parent, old_budget)
+                await self._rewrite_descendant_paths(uid, len(current.get("ancestors") or []), data["ancestors"])
+                await self._shift_subtree_totals(current, current.get("ancestors") or [], data["ancestors"])
+            elif new_parent and new_budget < old_budget:
+                await self._release_child_budget(new_parent, old_budget - new_budget)
+
+        self.tree_cache.invalidate()
+        if "name" in data:
+            self.name_cache.invalidate(uid)
+            if result.modified_count:
+                name_index.upsert("category", uid, data["name"])
+                # Rewrite the name stored on this category's transactions in the background
+                rename_fanout.schedule(self.db, "category", uid, data["name"])
         if result.modified_count:
             return await self.get_by_uid(uid)
         return None
 
+    async def move(self, uid: str, parent_uid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Re-parent a category with its whole subtree (``parent_uid=None`` makes it a root).
+        Cycles are rejected from the new parent's ancestors, the category's budget is reserved
+        on the new parent, descendant paths are rewritten with one update and subtree totals
+        shift between the two ancestor chains: a constant number of round trips at any size.
+        """
+        return await self.update(uid, {"parent_uid": parent_uid})
+
     async def delete(self, uid: str) -> bool:
-        """Delete a category"""
-        result = await self.collection.delete_one({"uid": uid})
-        return result.deleted_count > 0
+        """
+        Delete a category without orphaning anything: its children move up to its parent,
+        its transactions become uncategorized and its totals leave its ancestors.
+        """
+        category = await self.get_by_uid(uid)
+        if not category:
+            return False
+        await self._fold(category, None)
+        return True
+
+    async def get_tree_bytes(
+        self,
+        frequency: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        transaction_type: Optional[str] = None,
+        max_depth: Optional[int] = None,
+        root_uid: Optional[str] = None,
+    ) -> Optional[bytes]:
+        """
+        Serialized /categories/tree body, rebuilt from every category only on a cache miss.
+        Filters prune the cached, fully aggregated tree to the matching categories and the
+        ancestors needed to place them; totals still cover each node's whole subtree.
+        ``max_depth`` counts levels below ``root_uid`` (or below the roots).
+        Returns None if ``root_uid`` does not exist.
+        """
+        body = self.tree_cache.get_bytes()
+        if body is None:
+            generation = self.tree_cache.generation
+            categories = await self.collection.find({}, {"_id": 0}).to_list(length=None)
+            body = self.tree_cache.load(categories, generation)
+        filters = {
+            field: value
+            for field, value in (
+                ("frequency", frequency), ("is_active", is_active), ("transaction_type", transaction_type)
+            )
+            if value is not None
+        }
+        if not filters and max_depth is None and root_uid is None:
+            return body
+        return self.tree_cache.pruned_bytes(filters, max_depth, root_uid)
 
     @classmethod
     async def ensure_indexes(cls, db: AsyncIOMotorDatabase) -> None:
@@ -112,11 +320,344 @@ class CategoryModel:
         await collection.create_index("updated_at")
         await collection.create_index("transaction_type")
         await collection.create_index("parent_uid")
+        await collection.create_index([("ancestors", 1), ("depth", 1)])
+
+    # =====================================================
+    # ================ DELETE AND MERGE ===================
+    # =====================================================
+
+    # Delete/merge operations touching more transactions than this run as background jobs
+    BACKGROUND_THRESHOLD = 5000
+
+    async def count_transactions(self, uids: List[str]) -> int:
+        """Number of transactions filed under any of ``uids``."""
+        return await self.db["transactions"].count_documents({"category_uid": {"$in": uids}})
+
+    async def check_merge(
+        self, source_uids: List[str], target_uid: Optional[str]
+    ) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Validate a delete/merge before anything is written, including the budget the
+        target must take on for all sources together. Returns (target, that budget change).
+        """
+        sources = await self.collection.find(
+            {"uid": {"$in": source_uids}},
+            {"uid": 1, "parent_uid": 1, "budget": 1, "children_budget_sum": 1, "_id": 0},
+        ).to_list(length=None)
+        missing = set(source_uids) - {doc["uid"] for doc in sources}
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Categories not found: {sorted(missing)}")
+        if not target_uid:
+            return None, 0
+        target = await self.get_by_uid(target_uid)
+        if not target:
+            raise HTTPException(status_code=404, detail=f"Category with UID {target_uid} not found")
+        for uid in source_uids:
+            if uid == target_uid or uid in (target.get("ancestors") or []):
+                raise HTTPException(
+                    status_code=400,
+                    detail="A category cannot be merged into itself or one of its descendants."
+                )
+        # The target gains the budgets of every child that survives the merge, and
+        # stops reserving for sources that were its children or a source's children
+        source_set = {doc["uid"] for doc in sources}
+        budget_change = sum(doc.get("children_budget_sum") or 0 for doc in sources) - sum(
+            doc.get("budget") or 0 for doc in sources
+            if doc.get("parent_uid") == target_uid or doc.get("parent_uid") in source_set
+        )
+        if budget_change > 0:
+            fits = (target.get("budget") or 0) > 0 and (
+                (target.get("children_budget_sum") or 0) + budget_change <= target["budget"]
+            )
+            if not fits:
+                self._budget_overflow(target, budget_change)
+        return target, budget_change
+
+    async def merge(self, source_uids: List[str], target_uid: Optional[str]) -> Dict[str, Any]:
+        """
+        Fold each source category into ``target_uid``, or delete the sources when it is None.
+        The target's budget is reserved for all sources in one conditional update before any
+        source is touched, so a budget overflow leaves everything as it was.
+        Every source costs a constant number of round trips whatever its size.
+        """
+        target, budget_change = await self.check_merge(source_uids, target_uid)
+        if budget_change > 0:
+            await self._reserve_child_budget(target_uid, budget_change)
+        elif budget_change < 0:
+            await self._release_child_budget(target_uid, -budget_change)
+        moved = 0
+        for uid in dict.fromkeys(source_uids):
+            # Re-read: folding an earlier source may have moved this one
+            source = await self.get_by_uid(uid)
+            moved += await self._fold(source, target)
+        return {"merged": list(dict.fromkeys(source_uids)), "target_uid": target_uid, "transactions_moved": moved}
+
+    async def _fold(self, source: Dict[str, Any], target: Optional[Dict[str, Any]]) -> int:
+        """
+        Remove ``source``, handing everything it holds to ``target`` (or, with no target,
+        lifting its children to its own parent and uncategorizing its transactions).
+        With a target, the caller has already settled the target's children_budget_sum.
+        Returns the number of transactions moved.
+        """
+        uid = source["uid"]
+        ancestors = source.get("ancestors") or []
+        new_parent = target["uid"] if target else source.get("parent_uid")
+        new_prefix = self.path_below(target) if target else ancestors
+        children_budget = source.get("children_budget_sum") or 0
+        own_budget = source.get("budget") or 0
+
+        if target:
+            if source.get("parent_uid") not in (None, target["uid"]):
+                await self._release_child_budget(source["parent_uid"], own_budget)
+        elif new_parent:
+            # The children's budgets fit inside the source's, so the parent never overflows
+            await self._release_child_budget(new_parent, own_budget - children_budget)
+
+        tx_result = await self.db["transactions"].update_many(
+            {"category_uid": uid},
+            {"$set": {"category_uid": target["uid"] if target else None,
+                      "category_name": target.get("name") if target else None}},
+        )
+        await self.collection.update_many({"parent_uid": uid}, {"$set": {"parent_uid": new_parent}})
+        await self._rewrite_descendant_paths(uid, len(ancestors) + 1, new_prefix)
+
+        # Totals: the whole subtree leaves the old ancestors and joins the target's path;
+        # without a target only the source's own totals disappear
+        own = {field: source.get(field, 0) or 0 for field in TREE_TOTAL_FIELDS}
+        if target:
+            await self._shift_subtree_totals(source, ancestors, self.path_below(target))
+            inc = {field: delta for field, delta in own.items() if delta}
+            for key, used in (source.get("budget_periods") or {}).items():
+                inc["budget_periods." + key] = used
+            if inc:
+                await self.collection.update_one({"uid": target["uid"]}, {"$inc": inc})
+        elif ancestors and any(own.values()):
+            await self.collection.update_many(
+                {"uid": {"$in": ancestors}},
+                {"$inc": {"subtree_" + field: -delta for field, delta in own.items()}},
+            )
+
+        await self._move_rollups(uid, target["uid"] if target else None)
+        await self.collection.delete_one({"uid": uid})
+        self.name_cache.invalidate(uid)
+        name_index.remove("category", uid)
+        self.tree_cache.invalidate()
+        return tx_result.modified_count
+
+    async def _move_rollups(self, uid: str, target_uid: Optional[str]) -> None:
+        """Re-key a category's rollup rows onto ``target_uid``, adding into rows that already exist."""
+        rollups = self.db["rollups"]
+        rows = await rollups.find({"category_uid": uid}).to_list(length=None)
+        if not rows:
+            return
+        await rollups.bulk_write([
+            UpdateOne(
+                {"period": row["period"], "account_uid": row.get("account_uid"),
+                 "category_uid": target_uid, "type": row["type"]},
+                {"$inc": {"amount": row.get("amount", 0), "count": row.get("count", 0)}},
+                upsert=True,
+            )
+            for row in rows
+        ], ordered=False)
+        await rollups.delete_many({"category_uid": uid})
 
     # =====================================================
     # =============== HIERARCHY HELPERS ===================
     # =====================================================
 
+    async def _reserve_child_budget(self, parent_uid: str, amount: float) -> Dict[str, Any]:
+        """
+        Add ``amount`` to the parent's children_budget_sum in one conditional update that
+        only matches while the sum still fits in the parent's budget, so concurrent writers
+        can't overflow it. Returns the updated parent; the reason is looked up only on failure.
+        """
+        parent = await self.collection.find_one_and_update(
+            {
+                "uid": parent_uid,
+                "budget": {"$gt": 0},
+                "$expr": {"$lte": [{"$add": [{"$ifNull": ["$children_budget_sum", 0]}, amount]}, "$budget"]},
+            },
+            {"$inc": {"children_budget_sum": amount}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if parent:
+            return parent
+
+        parent = await self.get_by_uid(parent_uid)
+        if not parent:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Parent category with UID '{parent_uid}' not found."
+            )
+        self._budget_overflow(parent, amount)
+
+    @staticmethod
+    def _budget_overflow(parent: Dict[str, Any], amount: float) -> NoReturn:
+        """Raise the 400 explaining why ``amount`` more child budget doesn't fit in ``parent``."""
+        parent_budget = parent.get("budget") or 0
+        if parent_budget <= 0:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Parent category '{parent.get('name')}' has no budget set."
+            )
+        new_total = (parent.get("children_budget_sum") or 0) + amount
+        raise HTTPException(
+            status_code=400,
+            detail=(
+                f"Budget overflow: total child budgets ({new_total}) "
+                f"would exceed parent budget ({parent_budget})."
+            ),
+        )
+
+    async def _release_child_budget(self, parent_uid: str, amount: float) -> None:
+        """Give ``amount`` back to the parent's children_budget_sum."""
+        if amount:
+            await self.collection.update_one({"uid": parent_uid}, {"$inc": {"children_budget_sum": -amount}})
+
+    @staticmethod
+    def path_below(parent: Dict[str, Any]) -> List[str]:
+        """Ancestors array for a direct child of ``parent``."""
+        return list(parent.get("ancestors") or []) + [parent["uid"]]
+
+    async def _ancestors_for_parent(self, uid: str, parent_uid: Optional[str]) -> List[str]:
+        """Validate a new parent for ``uid`` and return the resulting ancestors array."""
+        if not parent_uid:
+            return []
+        parent = await self.get_by_uid(parent_uid)
+        if not parent:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Parent category with UID '{parent_uid}' not found."
+            )
+        if parent_uid == uid or uid in (parent.get("ancestors") or []):
+            raise HTTPException(
+                status_code=400,
+                detail="A category cannot be moved under itself or one of its descendants."
+            )
+        return self.path_below(parent)
+
+    async def _rewrite_descendant_paths(self, uid: str, strip: int, new_prefix: List[str]) -> None:
+        """Replace the first ``strip`` ancestors of every descendant of ``uid`` with ``new_prefix``, in one update."""
+        # Every descendant's path starts with the same ancestors, up to and including ``uid``
+        await self.collection.update_many(
+            {"ancestors": uid},
+            [
+                {"$set": {"ancestors": {"$concatArrays": [
+                    new_prefix,
+                    {"$slice": ["$ancestors", strip, {"$size": "$ancestors"}]},
+                ]}}},
+                {"$set": {"depth": {"$size": "$ancestors"}}},
+            ],
+        )
+
+    async def _shift_subtree_totals(
+        self, category: Dict[str, Any], old_ancestors: List[str], new_ancestors: List[str]
+    ) -> None:
+        """
+        Move a category's subtree_* totals from its old ancestors to its new ones in one bulk_write.
+        Ancestors on both paths keep the subtree either way and are left untouched.
+        """
+        totals = {
+            "subtree_" + field: category.get("subtree_" + field, 0) or 0
+            for field in TREE_TOTAL_FIELDS
+        }
+        if not any(totals.values()):
+            return
+        losing = [uid for uid in old_ancestors if uid not in new_ancestors]
+        gaining = [uid for uid in new_ancestors if uid not in old_ancestors]
+        operations = []
+        if losing:
+            operations.append(UpdateMany({"uid": {"$in": losing}}, {"$inc": {f: -v for f, v in totals.items()}}))
+        if gaining:
+            operations.append(UpdateMany({"uid": {"$in": gaining}}, {"$inc": totals}))
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def get_subtree(self, uid: str, max_depth: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the category with nested ``children``, fetched with one query on ``ancestors``.
+        ``max_depth`` limits how many levels below the category are included.
+        """
+        root = await self.get_by_uid(uid)
+        if not root:
+            return None
+        query: Dict[str, Any] = {"ancestors": uid}
+        if max_depth is not None:
+            query["depth"] = {"$lte": root.get("depth", 0) + max_depth}
+        descendants = await self.collection.find(query).sort([("depth", 1), ("name", 1)]).to_list(length=None)
+
+        # Parents sort before their children, so every parent is indexed by the time it is needed
+        nodes = {uid: {**root, "children": []}}
+        for doc in descendants:
+            node = {**doc, "children": []}
+            nodes[doc["uid"]] = node
+            parent = nodes.get(doc.get("parent_uid"))
+            if parent is not None:
+                parent["children"].append(node)
+        return nodes[uid]
+
+    async def get_breadcrumb(self, uid: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the path from the root down to the category, inclusive."""
+        category = await self.get_by_uid(uid)
+        if not category:
+            return None
+        ancestors = category.get("ancestors") or []
+        if not ancestors:
+            return [category]
+        found = await self.collection.find({"uid": {"$in": ancestors}}).to_list(length=None)
+        by_uid = {doc["uid"]: doc for doc in found}
+        return [by_uid[a] for a in ancestors if a in by_uid] + [category]
+
+    async def backfill_hierarchy(self) -> int:
+        """
+        Compute ``ancestors``/``depth``, the subtree_* totals and children_budget_sum for
+        categories written before those fields existed. Reads every category once with a
+        projection and fixes the differing documents in one bulk_write; returns the number fixed.
+        """
+        subtree_fields = ["subtree_" + field for field in TREE_TOTAL_FIELDS]
+        stale = {"$or": [
+            {field: {"$exists": False}} for field in ("ancestors", subtree_fields[0], "children_budget_sum")
+        ]}
+        if not await self.collection.find_one(stale, {"_id": 1}):
+            return 0
+        projection = {"_id": 0, "uid": 1, "parent_uid": 1, "ancestors": 1, "budget": 1, "children_budget_sum": 1}
+        projection.update({field: 1 for field in (*TREE_TOTAL_FIELDS, *subtree_fields)})
+        docs = await self.collection.find({}, projection).to_list(length=None)
+        parents = {doc["uid"]: doc.get("parent_uid") for doc in docs}
+
+        paths: Dict[str, List[str]] = {}
+        for doc in docs:
+            chain, node, seen = [], doc["uid"], set()
+            # Walk up until a node whose path is known (or a root); cycles and dangling parents stop the walk
+            while node in parents and node not in paths and node not in seen:
+                seen.add(node)
+                chain.append(node)
+                node = parents[node]
+            prefix = paths.get(node, []) + ([node] if node in paths else [])
+            for child in reversed(chain):
+                paths[child] = prefix
+                prefix = prefix + [child]
+
+        # Every category's own totals count towards itself and each of its ancestors,
+        # and its budget towards its parent's children_budget_sum
+        sums = {doc["uid"]: dict.fromkeys((*subtree_fields, "children_budget_sum"), 0) for doc in docs}
+        for doc in docs:
+            for uid in (*paths[doc["uid"]], doc["uid"]):
+                for field in TREE_TOTAL_FIELDS:
+                    sums[uid]["subtree_" + field] += doc.get(field, 0) or 0
+            if doc.get("parent_uid") in sums:
+                sums[doc["parent_uid"]]["children_budget_sum"] += doc.get("budget") or 0
+
+        ops = []
+        for doc in docs:
+            target = {"ancestors": paths[doc["uid"]], "depth": len(paths[doc["uid"]]), **sums[doc["uid"]]}
+            if any(doc.get(field) != value for field, value in target.items() if field != "depth"):
+                ops.append(UpdateOne({"uid": doc["uid"]}, {"$set": target}))
+        if ops:
+            await self.collection.bulk_write(ops, ordered=False)
+            self.tree_cache.invalidate()
+        return len(ops)
+
     async def get_children(self, parent_uid: str) -> List[Dict[str, Any]]:
         """Return all direct children of a parent category."""
         cursor = self.collection.find({"parent_uid": parent_uid})
@@ -0,0 +1,136 @@
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from .accounts import AccountModel
+from .transaction import TransactionModel
+from ..schemas.transaction import TransactionCreate
+
+
+def accrual_period(as_of: datetime, frequency: str) -> str:
+    """Key of the accrual period containing ``as_of``: 2026-10, 2026-Q4 or 2026."""
+    if frequency == "quarterly":
+        return f"{as_of.year:04d}-Q{(as_of.month - 1) // 3 + 1}"
+    if frequency == "annually":
+        return f"{as_of.year:04d}"
+    return f"{as_of.year:04d}-{as_of.month:02d}"
+
+
+class InterestModel:
+    """
+    Accrues interest for every interest-bearing account in batches.
+
+    Accounts are streamed with a projection and handled a batch at a time: the
+    interest of the whole batch is computed from a per-frequency rate table, then
+    posted through TransactionModel.create_many, i.e. one insert_many of interest
+    transactions and one bulk_write of balance $incs per batch. Transaction uids
+    are derived from account and period and looked up before posting (and in dry
+    runs), so re-running a period posts nothing twice on either storage mode.
+    """
+
+    PROJECTION = {"_id": 0, "uid": 1, "balance": 1, "interest_rate": 1, "interest_frequency": 1}
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.accounts = db[AccountModel.collection_name]
+
+    @staticmethod
+    def compute(batch: List[Dict[str, Any]]) -> List[float]:
+        """Interest for each account of a batch over one period of its interest_frequency."""
+        periods = AccountModel.INTEREST_PERIODS_PER_YEAR
+        return [
+            round((acc.get("balance") or 0) * (acc.get("interest_rate") or 0) / 100
+                  / periods.get(acc.get("interest_frequency"), 12), 2)
+            for acc in batch
+        ]
+
+    async def accrue(
+        self,
+        category_uid: str,
+        as_of: Optional[datetime] = None,
+        dry_run: bool = False,
+        batch_size: int = 1000,
+    ) -> Dict[str, Any]:
+        """
+        Post one period of interest to every account with a positive rate, filed under
+        ``category_uid``. Positive interest is posted as income, negative interest (on
+        negative balances) as an expense. With ``dry_run`` nothing is written and every
+        entry that would be posted is returned.
+        """
+        as_of = as_of or datetime.now()
+        transaction_model = TransactionModel(self.db)
+        summary: Dict[str, Any] = {
+            "as_of": as_of,
+            "dry_run": dry_run,
+            "accounts": 0,
+            "posted": 0,
+            "already_posted": 0,
+            "failed": 0,
+            "total_interest": 0.0,
+        }
+        if dry_run:
+            summary["entries"] = []
+
+        cursor = self.accounts.find({"interest_rate": {"$gt": 0}}, self.PROJECTION, batch_size=batch_size)
+        batch: List[Dict[str, Any]] = []
+        async for account in cursor:
+            batch.append(account)
+            if len(batch) >= batch_size:
+                await self._accrue_batch(batch, as_of, dry_run, category_uid, transaction_model, summary)
+                batch = []
+        if batch:
+            await self._accrue_batch(batch, as_of, dry_run, category_uid, transaction_model, summary)
+
+        summary["total_interest"] = round(summary["total_interest"], 2)
+        return summary
+
+    async def _accrue_batch(
+        self,
+        batch: List[Dict[str, Any]],
+        as_of: datetime,
+        dry_run: bool,
+        category_uid: str,
+        transaction_model: TransactionModel,
+        summary: Dict[str, Any],
+    ) -> None:
+        due = []
+        for account, interest in zip(batch, self.compute(batch)):
+            summary["accounts"] += 1
+            if not interest:
+                continue
+            frequency = account.get("interest_frequency") or "monthly"
+            period = accrual_period(as_of, frequency)
+            due.append((f"interest-{account['uid']}-{period}", account, frequency, period, interest))
+        if not due:
+            return
+
+        # Time-series storage has no unique index on uid, so look the periods up explicitly
+        posted = await transaction_model.existing_uids([uid for uid, *_ in due])
+        txs = []
+        for uid, account, frequency, period, interest in due:
+            if uid in posted:
+                summary["already_posted"] += 1
+                continue
+            if dry_run:
+                summary["entries"].append({"account_uid": account["uid"], "period": period, "interest": interest})
+                summary["total_interest"] += interest
+                continue
+            txs.append(TransactionCreate(
+                uid=uid,
+                type="income" if interest > 0 else "expense",
+                amount=abs(interest),
+                account_uid=account["uid"],
+                category_uid=category_uid,
+                description=f"Interest ({frequency}, {period})",
+                date=as_of,
+            ).model_dump())
+        if not txs:
+            return
+
+        inserted, errors = await transaction_model.create_many(txs)
+        summary["posted"] += len(inserted)
+        duplicates = sum(1 for err in errors if err["error"] == "Transaction uid already exists")
+        summary["already_posted"] += duplicates
+        summary["failed"] += len(errors) - duplicates
+        summary["total_interest"] += sum(
+            tx["amount"] if tx["type"] == "income" else -tx["amount"] for tx in inserted
+        )
@@ -0,0 +1,170 @@
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from ..periods import reporting_timezone, rollup_period
+
+
+class RollupModel:
+    """
+    Reads the daily rollups maintained by TransactionModel's write path.
+
+    Each rollup document holds the summed amount and count of transactions for
+    one (period, account_uid, category_uid, type) key, where period is a calendar
+    day in the configured reporting timezone. Weeks and months are built from
+    days at read time, so cost grows with the number of days that have activity,
+    not the number of transactions.
+    """
+    collection_name = "rollups"
+    # Records the bucketing the stored rollups were built with
+    meta_collection_name = "rollups_meta"
+
+    # Rollup types and the sign they contribute to "net"
+    TYPES = {
+        "income": 1,
+        "expense": -1,
+        "reimburse": 1,
+        "transfer_in": 0,
+        "transfer_out": 0,
+    }
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[self.collection_name]
+
+    async def summarize(
+        self,
+        granularity: str = "month",
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        account_uid: Optional[str] = None,
+        category_uid: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return per-period totals by type, bucketed by day, week (Monday start) or month of the
+        reporting timezone. The range covers the whole days containing date_from and date_to.
+        With group_by="category" or "account" each period is split per category/account.
+        """
+        match: Dict[str, Any] = {}
+        if date_from or date_to:
+            match["period"] = {}
+            if date_from:
+                match["period"]["$gte"] = rollup_period(date_from)
+            if date_to:
+                match["period"]["$lte"] = rollup_period(date_to)
+        if account_uid:
+            match["account_uid"] = account_uid
+        if category_uid:
+            match["category_uid"] = category_uid
+
+        # Periods are already local days, so weeks and months truncate them as-is
+        period: Any = "$period"
+        if granularity != "day":
+            trunc: Dict[str, Any] = {"date": "$period", "unit": granularity}
+            if granularity == "week":
+                trunc["startOfWeek"] = "monday"
+            period = {"$dateTrunc": trunc}
+
+        group_id: Dict[str, Any] = {"period": period, "type": "$type"}
+        group_field = f"{group_by}_uid" if group_by else None
+        if group_field:
+            group_id[group_field] = f"${group_field}"
+
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": group_id,
+                "amount": {"$sum": "$amount"},
+                "count": {"$sum": "$count"},
+            }},
+            {"$sort": {"_id.period": 1}},
+        ]
+
+        # Pivot types into one row per (period[, group key])
+        rows: Dict[tuple, Dict[str, Any]] = {}
+        async for doc in self.collection.aggregate(pipeline):
+            key_id = doc["_id"]
+            key = (key_id["period"], key_id.get(group_field) if group_field else None)
+            row = rows.get(key)
+            if row is None:
+                row = {"period": key_id["period"], **{t: 0 for t in self.TYPES}, "net": 0, "count": 0}
+                if group_field:
+                    row[group_field] = key[1]
+                rows[key] = row
+            ttype = key_id["type"]
+            if ttype in self.TYPES:
+                row[ttype] = round(row[ttype] + doc["amount"], 2)
+                row["net"] = round(row["net"] + self.TYPES[ttype] * doc["amount"], 2)
+            row["count"] += int(doc["count"])
+        return list(rows.values())
+
+    async def rebuild(self, batch_size: int = 1000) -> int:
+        """Recompute all rollups from the transactions collection. Returns the number of rollup documents."""
+        # Local calendar day as a naive midnight, matching rollup_period
+        day = {"$dateFromString": {
+            "dateString": {"$dateToString": {
+                "date": {"$ifNull": ["$date", "$created_at"]}, "format": "%Y-%m-%d", "timezone": reporting_timezone(),
+            }},
+            "format": "%Y-%m-%d",
+        }}
+        pipelines = [
+            [
+                {"$match": {"type": {"$ne": "transfer"}}},
+                {"$group": {
+                    "_id": {"period": day, "account_uid": "$account_uid",
+                            "category_uid": "$category_uid", "type": "$type"},
+                    "amount": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                }},
+            ],
+            [
+                {"$match": {"type": "transfer"}},
+                {"$group": {
+                    "_id": {"period": day, "account_uid": "$from_account_uid",
+                            "category_uid": None, "type": "transfer_out"},
+                    "amount": {"$sum": {"$add": ["$amount", {"$ifNull": ["$transfer_fee", 0]}]}},
+                    "count": {"$sum": 1},
+                }},
+            ],
+            [
+                {"$match": {"type": "transfer"}},
+                {"$group": {
+                    "_id": {"period": day, "account_uid": "$to_account_uid",
+                            "category_uid": None, "type": "transfer_in"},
+                    "amount": {"$sum": "$amount"},
+                    "count": {"$sum": 1},
+                }},
+            ],
+        ]
+
+        await self.collection.delete_many({})
+        written = 0
+        for pipeline in pipelines:
+            batch = []
+            async for doc in self.db["transactions"].aggregate(pipeline, allowDiskUse=True):
+                batch.append({**doc["_id"], "amount": doc["amount"], "count": doc["count"]})
+                if len(batch) >= batch_size:
+                    await self.collection.insert_many(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                await self.collection.insert_many(batch)
+                written += len(batch)
+        return written
+
+    async def ensure_backfilled(self) -> None:
+        """
+        Build rollups for databases that have transactions from before rollups existed, or
+        whose rollups were built with another bucketing (hourly, or another timezone).
+        """
+        layout = {"unit": "day", "timezone": reporting_timezone()}
+        meta = self.db[self.meta_collection_name]
+        stored = await meta.find_one({"_id": "layout"}, {"_id": 0})
+        if stored == layout:
+            return
+        if await self.db["transactions"].find_one({}, {"_id": 1}):
+            count = await self.rebuild()
+            print(f"✅ Rebuilt {count} rollup documents ({layout['timezone']} days)")
+        else:
+            await self.collection.delete_many({})
+        await meta.replace_one({"_id": "layout"}, layout, upsert=True)
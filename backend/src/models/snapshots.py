@@ -0,0 +1,293 @@
+from typing import Optional, Dict, Any, List, Tuple
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pymongo import UpdateOne, UpdateMany
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+def snapshot_day(value: datetime) -> datetime:
+    """Truncate a date to its UTC day, the granularity snapshots are stored at."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def balance_deltas(tx: Dict[str, Any], sign: int = 1) -> List[Tuple[str, float]]:
+    """(account_uid, balance change) pairs for one transaction; sign=-1 reverses them."""
+    ttype = tx["type"]
+    amt = tx["amount"] * sign
+    fee = (tx.get("transfer_fee", 0) or 0) * sign
+    if ttype in ("income", "reimburse"):
+        return [(tx["account_uid"], amt)]
+    if ttype == "expense":
+        return [(tx["account_uid"], -amt)]
+    if ttype == "transfer":
+        return [(tx["from_account_uid"], -(amt + fee)), (tx["to_account_uid"], amt)]
+    return []
+
+
+class SnapshotModel:
+    """
+    Daily closing balance per account, maintained by TransactionModel's write path.
+
+    Each document holds the `closing` balance of one account at the end of one
+    UTC day on which its balance changed, plus that day's net `delta`. Days
+    without a row carry the previous row's closing forward. A write dated on day
+    d adds its delta to the row for d and to every later row, so back-dated
+    transactions keep the whole series right. History and net worth read only
+    these rows; a point-in-time balance is one indexed lookup plus one day of
+    transactions.
+    """
+    collection_name = "balance_snapshots"
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.collection = db[self.collection_name]
+
+    # =====================================================
+    # ================== WRITE PATH =======================
+    # =====================================================
+
+    async def _neighbours(self, keys: List[Tuple[str, datetime]], session=None) -> Dict[Tuple[str, datetime], Dict[str, Any]]:
+        """
+        For each (account_uid, day), the account's last row on or before that day ("prev")
+        and its first row after it ("next"), in one aggregation: one indexed
+        $lookup ... $sort/$limit per key, so the cost doesn't grow with history length.
+        """
+        def nearest(op: str, direction: int, fields: Dict[str, int]) -> Dict[str, Any]:
+            return {
+                "from": self.collection_name,
+                "localField": "account_uid",
+                "foreignField": "account_uid",
+                "let": {"day": "$day"},
+                "pipeline": [
+                    {"$match": {"$expr": {op: ["$day", "$$day"]}}},
+                    {"$sort": {"day": direction}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, **fields}},
+                ],
+                "as": "prev" if direction < 0 else "next",
+            }
+
+        pipeline = [
+            {"$documents": [{"account_uid": a, "day": d} for a, d in keys]},
+            {"$lookup": nearest("$lte", -1, {"day": 1, "closing": 1})},
+            {"$lookup": nearest("$gt", 1, {"closing": 1, "delta": 1})},
+        ]
+        return {
+            (row["account_uid"], row["day"]): {
+                "prev": row["prev"][0] if row["prev"] else None,
+                "next": row["next"][0] if row["next"] else None,
+            }
+            async for row in self.db.aggregate(pipeline, session=session)
+        }
+
+    async def operations(
+        self,
+        deltas: Dict[Tuple[str, datetime], Dict[str, float]],
+        session=None,
+        balances: Optional[Dict[str, float]] = None,
+    ) -> list:
+        """
+        Ordered bulk operations applying {(account_uid, day): {"delta": x}}.
+
+        Missing rows are created first, holding the balance of that day before this
+        write: the closing of the previous row, else the opening of the next one.
+        Then each delta is added to its own row and shifted onto later rows.
+        An account with no rows yet starts from ``balances`` if given, else from its
+        stored balance, so this must be planned before that balance is updated.
+        """
+        changes = {key: fields["delta"] for key, fields in deltas.items() if fields.get("delta")}
+        if not changes:
+            return []
+        neighbours = await self._neighbours(list(changes), session)
+
+        no_rows = []
+        inserts = []
+        for account_uid, day in changes:
+            around = neighbours.get((account_uid, day)) or {}
+            prev, nxt = around.get("prev"), around.get("next")
+            if prev and prev["day"] == day:
+                continue
+            if prev:
+                inserts.append((account_uid, day, prev["closing"]))
+            elif nxt:
+                inserts.append((account_uid, day, nxt["closing"] - nxt.get("delta", 0)))
+            else:
+                no_rows.append((account_uid, day))
+
+        # First snapshot of an account: the balance before this write is its current one
+        balances = dict(balances or {})
+        unknown = list({a for a, _ in no_rows if a not in balances})
+        if unknown:
+            cursor = self.db["accounts"].find(
+                {"uid": {"$in": unknown}}, {"uid": 1, "balance": 1, "_id": 0}, session=session
+            )
+            balances.update({doc["uid"]: doc.get("balance", 0) or 0 async for doc in cursor})
+        inserts.extend((a, d, balances.get(a, 0)) for a, d in no_rows)
+
+        operations = [
+            UpdateOne(
+                {"account_uid": a, "day": d},
+                {"$setOnInsert": {"closing": closing, "delta": 0}},
+                upsert=True,
+            )
+            for a, d, closing in inserts
+        ]
+        for (account_uid, day), delta in changes.items():
+            operations.append(UpdateOne({"account_uid": account_uid, "day": day}, {"$inc": {"closing": delta, "delta": delta}}))
+            operations.append(UpdateMany({"account_uid": account_uid, "day": {"$gt": day}}, {"$inc": {"closing": delta}}))
+        return operations
+
+    async def record_balance(self, account_uid: str, balance: float, when: Optional[datetime] = None) -> None:
+        """Start an account's series with its opening balance (on account creation)."""
+        await self.collection.update_one(
+            {"account_uid": account_uid, "day": snapshot_day(when or datetime.now())},
+            {"$setOnInsert": {"closing": balance, "delta": 0}},
+            upsert=True,
+        )
+
+    async def apply_adjustment(self, account_uid: str, previous: float, balance: float) -> None:
+        """Record a direct balance edit (not a transaction) as a delta on today's row."""
+        ops = await self.operations(
+            {(account_uid, snapshot_day(datetime.now())): {"delta": balance - previous}},
+            balances={account_uid: previous},
+        )
+        if ops:
+            await self.collection.bulk_write(ops, ordered=True)
+
+    async def delete_account(self, account_uid: str) -> None:
+        await self.collection.delete_many({"account_uid": account_uid})
+
+    # =====================================================
+    # =================== READ PATH =======================
+    # =====================================================
+
+    async def history(
+        self, account_uid: str, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Closing balances of one account on each day it changed within the range, led by
+        the balance carried into ``date_from``. Reads only snapshot rows.
+        """
+        query: Dict[str, Any] = {"account_uid": account_uid}
+        points = []
+        if date_from:
+            start = snapshot_day(date_from)
+            query["day"] = {"$gte": start}
+            prev = await self.collection.find_one(
+                {"account_uid": account_uid, "day": {"$lt": start}}, sort=[("day", -1)]
+            )
+            if prev:
+                points.append({"day": start, "closing": prev["closing"]})
+        if date_to:
+            query.setdefault("day", {})["$lte"] = snapshot_day(date_to)
+        cursor = self.collection.find(query, {"_id": 0, "day": 1, "closing": 1}).sort("day", 1)
+        async for row in cursor:
+            if points and points[-1]["day"] == row["day"]:
+                points[-1] = row
+            else:
+                points.append(row)
+        return points
+
+    async def net_worth(
+        self, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Sum of every account's closing balance on each day any balance changed in the range."""
+        current: Dict[str, float] = {}
+        query: Dict[str, Any] = {}
+        points = []
+        if date_from:
+            start = snapshot_day(date_from)
+            query["day"] = {"$gte": start}
+            # Balance carried into the range: the last row of each account before it
+            opening = self.collection.aggregate([
+                {"$match": {"day": {"$lt": start}}},
+                {"$sort": {"account_uid": 1, "day": 1}},
+                {"$group": {"_id": "$account_uid", "closing": {"$last": "$closing"}}},
+            ])
+            current = {row["_id"]: row["closing"] async for row in opening}
+            if current:
+                points.append({"day": start, "net_worth": round(sum(current.values()), 2)})
+        if date_to:
+            query.setdefault("day", {})["$lte"] = snapshot_day(date_to)
+
+        cursor = self.collection.find(query, {"_id": 0, "account_uid": 1, "day": 1, "closing": 1}).sort("day", 1)
+        async for row in cursor:
+            current[row["account_uid"]] = row["closing"]
+            point = {"day": row["day"], "net_worth": round(sum(current.values()), 2)}
+            if points and points[-1]["day"] == row["day"]:
+                points[-1] = point
+            else:
+                points.append(point)
+        return points
+
+    async def balance_at(self, account_uid: str, at: datetime) -> float:
+        """
+        Balance of an account at an exact time: the closing of the last snapshot day before
+        ``at`` plus that day's transactions up to ``at``.
+        """
+        if at.tzinfo is not None:
+            at = at.astimezone(timezone.utc).replace(tzinfo=None)
+        day = snapshot_day(at)
+        prev = await self.collection.find_one(
+            {"account_uid": account_uid, "day": {"$lt": day}}, sort=[("day", -1)]
+        )
+        if prev:
+            balance = prev["closing"]
+        else:
+            row = await self.collection.find_one({"account_uid": account_uid, "day": {"$gte": day}}, sort=[("day", 1)])
+            balance = row["closing"] - row.get("delta", 0) if row else 0
+        cursor = self.db["transactions"].find({
+            "$or": [
+                {"account_uid": account_uid},
+                {"from_account_uid": account_uid},
+                {"to_account_uid": account_uid},
+            ],
+            "date": {"$gte": day, "$lte": at},
+        })
+        async for tx in cursor:
+            balance += sum(delta for uid, delta in balance_deltas(tx) if uid == account_uid)
+        return round(balance, 2)
+
+    # =====================================================
+    # ==================== BACKFILL =======================
+    # =====================================================
+
+    async def rebuild(self) -> int:
+        """
+        Recompute every account's series from its current balance and its transactions,
+        walking back from today. Returns the number of rows written.
+        """
+        daily: Dict[str, Dict[datetime, float]] = defaultdict(lambda: defaultdict(float))
+        projection = {"_id": 0, "type": 1, "amount": 1, "transfer_fee": 1, "date": 1, "created_at": 1,
+                      "account_uid": 1, "from_account_uid": 1, "to_account_uid": 1}
+        async for tx in self.db["transactions"].find({}, projection):
+            day = snapshot_day(tx.get("date") or tx["created_at"])
+            for account_uid, delta in balance_deltas(tx):
+                daily[account_uid][day] += delta
+
+        today = snapshot_day(datetime.now())
+        rows = []
+        async for account in self.db["accounts"].find({}, {"_id": 0, "uid": 1, "balance": 1}):
+            closing = account.get("balance", 0) or 0
+            days = daily.get(account["uid"], {})
+            if not days:
+                rows.append({"account_uid": account["uid"], "day": today, "closing": closing, "delta": 0})
+            for day in sorted(days, reverse=True):
+                rows.append({"account_uid": account["uid"], "day": day, "closing": closing, "delta": days[day]})
+                closing -= days[day]
+
+        await self.collection.delete_many({})
+        for i in range(0, len(rows), 1000):
+            await self.collection.insert_many(rows[i:i + 1000], ordered=False)
+        return len(rows)
+
+    async def ensure_backfilled(self) -> None:
+        """Build snapshots once for databases that have accounts from before snapshots existed."""
+        if await self.collection.find_one({}, {"_id": 1}):
+            return
+        if not await self.db["accounts"].find_one({}, {"_id": 1}):
+            return
+        count = await self.rebuild()
+        print(f"✅ Backfilled {count} balance snapshots")
@@ -1,221 +1,673 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from ..database import start_atomic
+from ..config.settings import get_database_settings
+from ..background import NAME_FIELDS
+from .accounts import AccountModel
+from .categories import CategoryModel
+from .snapshots import SnapshotModel, snapshot_day, balance_deltas
+from .account_summary import AccountSummaryModel
+from ..periods import rollup_period, budget_period_keys
+from pymongo import UpdateOne, UpdateMany, ReturnDocument
+from pymongo.errors import BulkWriteError
+from fastapi import HTTPException
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Tuple, AsyncIterator
 from datetime import datetime
+from contextlib import asynccontextmanager
+import asyncio
+import base64
+import json
+
+# Time-series storage has no unique indexes: one {_id: uid} document per transaction
+# in this collection, whose _id index keeps uids unique
+UID_REGISTRY = "transaction_uids"
+
+
+def encode_cursor(tx: Dict[str, Any], balance: Optional[float] = None) -> str:
+    """
+    Build an opaque page cursor from the (date, uid) key of the last transaction on a page.
+    Ledger cursors also carry the balance checkpoint the next page starts from.
+    """
+    key: Dict[str, Any] = {"date": tx["date"].isoformat(), "uid": tx["uid"]}
+    if balance is not None:
+        key["balance"] = balance
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_key(cursor: str) -> Dict[str, Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        key["date"] = datetime.fromisoformat(key["date"])
+        key["uid"] = str(key["uid"])
+        return key
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_cursor. Raises ValueError if it is malformed."""
+    key = _decode_key(cursor)
+    return key["date"], key["uid"]
+
+
+def decode_ledger_cursor(cursor: str) -> Tuple[datetime, str, float]:
+    """Decode a ledger cursor into its (date, uid) key and balance checkpoint."""
+    key = _decode_key(cursor)
+    try:
+        return key["date"], key["uid"], float(key["balance"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+@asynccontextmanager
+async def _without_session():
+    yield None
 
 
 class TransactionModel:
     """Handles CRUD operations and automatic balance/category/budget updates for transactions."""
 
+    # Fields whose change alters balances, category totals, budgets or rollups
+    EFFECT_FIELDS = (
+        "type", "amount", "transfer_fee", "account_uid", "category_uid",
+        "from_account_uid", "to_account_uid", "date",
+    )
+
+    # Effect collections keyed by a compound key (upserted) rather than by uid
+    UPSERT_KEYS = {
+        "rollups": ("period", "account_uid", "category_uid", "type"),
+    }
+
+    # Effect buckets keyed by a tuple of uids, applied with one update_many to that collection
+    FANOUT_TARGETS = {
+        "category_subtrees": "categories",
+    }
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.collection = db["transactions"]
+        # Time-series storage (see migrate_timeseries) can't join multi-document transactions
+        # and has no unique indexes, so uids are claimed in a separate registry
+        self.timeseries = get_database_settings().transactions_timeseries
+        self.uid_registry = db[UID_REGISTRY]
+
+    def _atomic(self):
+        """Session scope for a ledger write and its effects."""
+        return _without_session() if self.timeseries else start_atomic(self.db)
 
     # ====================================================
     # =============== CRUD OPERATIONS =====================
     # ====================================================
 
     async def create(self, tx_data: dict):
-        """Create a new transaction and update balances, category totals, and budgets."""
+        """
+        Create a new transaction and update balances, category totals, and budgets.
+
+        Effects are computed in memory and sent as one bulk_write per collection,
+        together with the insert, inside a single MongoDB transaction when supported.
+        """
         tx_data["created_at"] = datetime.now()
-        result = await self.collection.insert_one(tx_data)
-        tx_data["_id"] = str(result.inserted_id)
+        category_meta, _ = await asyncio.gather(
+            self._category_meta([tx_data]), self._store_names([tx_data])
+        )
+        effects = self._effects_for([tx_data], category_meta)
+
+        if self.timeseries:
+            # Raises DuplicateKeyError for a taken uid, like the unique index does
+            await self.uid_registry.insert_one({"_id": tx_data["uid"]})
+        async with self._atomic() as session:
+            try:
+                result = await self.collection.insert_one(tx_data, session=session)
+            except Exception:
+                if self.timeseries:
+                    await self.uid_registry.delete_one({"_id": tx_data["uid"]})
+                raise
+            await self._write_effects(effects, session)
+        self._publish(effects)
 
-        await self._update_account_balances_on_create(tx_data)
-        await self._update_category_totals_on_create(tx_data)
-        await self._update_budget_on_create(tx_data)
+        tx_data["_id"] = str(result.inserted_id)
         return tx_data
 
+    async def create_many(self, txs: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Insert many validated transactions at once.
+
+        Documents go in with a single unordered insert_many. The balance, category
+        and budget effects of everything that was inserted are netted per document
+        and written with one bulk_write of $inc updates per collection. When
+        transactions are supported the whole batch is all-or-nothing.
+
+        Returns (inserted transactions, per-item errors keyed by input index).
+        """
+        if not txs:
+            return [], []
+
+        errors: List[Dict[str, Any]] = []
+        failed = set()
+
+        # Reject uids that already exist up front; the unique index still guards against races
+        existing = await self.existing_uids([tx["uid"] for tx in txs])
+        for index, tx in enumerate(txs):
+            if tx["uid"] in existing:
+                failed.add(index)
+                errors.append({"index": index, "uid": tx["uid"], "error": "Transaction uid already exists"})
+
+        pending = [i for i in range(len(txs)) if i not in failed]
+        if pending and self.timeseries:
+            pending = await self._claim_uids(txs, pending, failed, errors)
+        if not pending:
+            return [], errors
+
+        now = datetime.now()
+        for i in pending:
+            txs[i]["created_at"] = now
+        docs = [txs[i] for i in pending]
+        category_meta, _ = await asyncio.gather(self._category_meta(docs), self._store_names(docs))
+
+        # Only insert_many failures are per-item errors; a failed effects write propagates
+        # (and aborts the transaction) instead of being reported against transaction indexes
+        write_errors: List[Dict[str, Any]] = []
+        rolled_back = False
+        try:
+            async with self._atomic() as session:
+                try:
+                    await self.collection.insert_many(docs, ordered=False, session=session)
+                except BulkWriteError as e:
+                    write_errors = e.details.get("writeErrors", [])
+                    if session is not None:
+                        # Abort: nothing from this batch is kept
+                        rolled_back = True
+                        raise
+                rejected = {err["index"] for err in write_errors}
+                written = [tx for i, tx in enumerate(docs) if i not in rejected]
+                effects = self._effects_for(written, category_meta)
+                await self._write_effects(effects, session)
+            self._publish(effects)
+        except BulkWriteError:
+            if not rolled_back:
+                raise
+
+        rejected = {err["index"] for err in write_errors}
+        for err in write_errors:
+            index = pending[err["index"]]
+            errors.append({
+                "index": index,
+                "uid": txs[index].get("uid"),
+                "error": err.get("errmsg", "Insert failed"),
+            })
+        if rolled_back:
+            for position, index in enumerate(pending):
+                if position not in rejected:
+                    errors.append({
+                        "index": index,
+                        "uid": txs[index].get("uid"),
+                        "error": "Batch rolled back because another item failed",
+                    })
+            return [], errors
+        failed.update(pending[i] for i in rejected)
+        if self.timeseries and rejected:
+            # Release the claims of documents that didn't go in
+            await self.uid_registry.delete_many({"_id": {"$in": [docs[i]["uid"] for i in rejected]}})
+
+        inserted = [tx for i, tx in enumerate(txs) if i not in failed]
+        for tx in inserted:
+            tx["_id"] = str(tx["_id"])
+        return inserted, errors
+
+    @staticmethod
+    def build_query(
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        account_uid: Optional[str] = None,
+        category_uid: Optional[str] = None,
+        type: Optional[str] = None,
+        amount_min: Optional[float] = None,
+        amount_max: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build a Mongo filter; an account matches as account_uid or either side of a transfer.
+        Every equality filter leads a (field, date, uid) compound index, see db_indexes.
+        """
+        query: Dict[str, Any] = {}
+        if type:
+            query["type"] = type
+        if amount_min is not None or amount_max is not None:
+            query["amount"] = {}
+            if amount_min is not None:
+                query["amount"]["$gte"] = amount_min
+            if amount_max is not None:
+                query["amount"]["$lte"] = amount_max
+        if date_from or date_to:
+            query["date"] = {}
+            if date_from:
+                query["date"]["$gte"] = date_from
+            if date_to:
+                query["date"]["$lte"] = date_to
+        if account_uid:
+            query["$or"] = [
+                {"account_uid": account_uid},
+                {"from_account_uid": account_uid},
+                {"to_account_uid": account_uid},
+            ]
+        if category_uid:
+            query["category_uid"] = category_uid
+        return query
+
+    async def iter_batches(
+        self, query: Dict[str, Any], batch_size: int = 500
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield matching transactions oldest first, one cursor batch at a time."""
+        cursor = (
+            self.collection.find(query, {"_id": 0})
+            .sort([("date", 1), ("uid", 1)])
+            .batch_size(batch_size)
+        )
+        batch: List[Dict[str, Any]] = []
+        async for tx in cursor:
+            batch.append(tx)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     async def get_all(self):
         cursor = self.collection.find({})
         return [tx async for tx in cursor]
 
+    async def get_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        query: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return one page of transactions matching query, newest first, plus the cursor for the next page.
+
+        Pages are keyed on (date, uid) and served by the (date, uid) compound indexes,
+        so fetching page N costs the same as page 1.
+        """
+        query = dict(query or {})
+        if cursor:
+            last_date, last_uid = decode_cursor(cursor)
+            after_cursor = self._after_key(last_date, last_uid)
+            query = {"$and": [query, after_cursor]} if query else after_cursor
+
+        # Fetch one extra row to know whether another page exists
+        docs = await (
+            self.collection.find(query, {"_id": 0})
+            .sort([("date", -1), ("uid", -1)])
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        if len(docs) > limit:
+            docs = docs[:limit]
+            return docs, encode_cursor(docs[-1])
+        return docs, None
+
+    @staticmethod
+    def _after_key(last_date: datetime, last_uid: str) -> Dict[str, Any]:
+        """Filter for rows after (date, uid) in newest-first order."""
+        return {
+            "$or": [
+                {"date": {"$lt": last_date}},
+                {"date": last_date, "uid": {"$lt": last_uid}},
+            ]
+        }
+
+    async def get_ledger(
+        self, account_uid: str, limit: int = 100, cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Return one page of an account's transactions, newest first, each with the account's
+        ``balance`` right after it, plus the cursor for the next page.
+
+        Page 1 starts from the account's current balance; every later page starts from the
+        checkpoint carried in its cursor. The running balance is computed in the database
+        with $setWindowFields over the page alone, so page N costs the same as page 1.
+        """
+        if cursor:
+            last_date, last_uid, seed = decode_ledger_cursor(cursor)
+        else:
+            account = await self.db["accounts"].find_one({"uid": account_uid}, {"balance": 1, "_id": 0})
+            seed = (account or {}).get("balance", 0) or 0
+
+        # Each side is served by its (field, date, uid) index, see db_indexes
+        match: Dict[str, Any] = self.build_query(account_uid=account_uid)
+        if cursor:
+            match = {"$and": [match, self._after_key(last_date, last_uid)]}
+
+        # Signed effect of each row on this account; mirrors snapshots.balance_deltas
+        amount = "$amount"
+        fee = {"$ifNull": ["$transfer_fee", 0]}
+        signed = {"$switch": {
+            "branches": [
+                {"case": {"$in": ["$type", ["income", "reimburse"]]}, "then": amount},
+                {"case": {"$eq": ["$type", "expense"]}, "then": {"$multiply": [amount, -1]}},
+                {"case": {"$eq": ["$from_account_uid", account_uid]},
+                 "then": {"$multiply": [{"$add": [amount, fee]}, -1]}},
+                {"case": {"$eq": ["$to_account_uid", account_uid]}, "then": amount},
+            ],
+            "default": 0,
+        }}
+        pipeline = [
+            {"$match": match},
+            {"$sort": {"date": -1, "uid": -1}},
+            # Fetch one extra row to know whether another page exists
+            {"$limit": limit + 1},
+            {"$set": {"balance_change": signed}},
+            {"$setWindowFields": {
+                "sortBy": {"date": -1, "uid": -1},
+                "output": {"newer_change": {
+                    "$sum": "$balance_change", "window": {"documents": ["unbounded", "current"]},
+                }},
+            }},
+            # Balance after a row = seed minus everything newer than it
+            {"$set": {"balance": {"$round": [
+                {"$add": [seed, {"$subtract": ["$balance_change", "$newer_change"]}]}, 2
+            ]}}},
+            {"$unset": ["_id", "newer_change"]},
+        ]
+        docs = await self.collection.aggregate(pipeline).to_list(length=limit + 1)
+        if len(docs) > limit:
+            docs = docs[:limit]
+            last = docs[-1]
+            return docs, encode_cursor(last, round(last["balance"] - last["balance_change"], 2))
+        return docs, None
+
+    async def existing_uids(self, uids: List[str]) -> set:
+        """The subset of ``uids`` already stored, from one $in query on the uid index."""
+        cursor = self.collection.find({"uid": {"$in": uids}}, {"uid": 1, "_id": 0})
+        return {doc["uid"] async for doc in cursor}
+
     async def get_by_uid(self, uid: str):
         return await self.collection.find_one({"uid": uid}, {"_id": 0})
 
     async def update(self, uid: str, update_data: dict):
-        """Update an existing transaction and reapply all related logic."""
-        existing = await self.collection.find_one({"uid": uid})
-        if not existing:
-            return None
-
-        await self.collection.update_one({"uid": uid}, {"$set": update_data})
-        updated = {**existing, **update_data}
-
-        # Rollback → apply new effects
-        await self._rollback_all(existing)
-        await self._apply_all(updated)
+        """
+        Update an existing transaction and apply only the net change in its effects.
+
+        The old and new effects are netted per account/category, so each touched
+        document gets at most one $inc; edits that don't affect money (e.g. the
+        description) skip side-effect writes entirely.
+        """
+        if not update_data:
+            return await self.collection.find_one({"uid": uid})
+        await self._store_names([update_data])
+
+        async with self._atomic() as session:
+            if self.timeseries:
+                existing = await self._swap_timeseries(uid, update_data)
+            else:
+                existing = await self.collection.find_one_and_update(
+                    {"uid": uid},
+                    {"$set": update_data},
+                    return_document=ReturnDocument.BEFORE,
+                    session=session,
+                )
+            if not existing:
+                return None
+
+            updated = {**existing, **update_data}
+            effects = None
+            if any(existing.get(field) != updated.get(field) for field in self.EFFECT_FIELDS):
+                category_meta = await self._category_meta([existing, updated], session)
+                effects = self._new_effects()
+                self._add_effects(effects, existing, category_meta, sign=-1)
+                self._add_effects(effects, updated, category_meta)
+                await self._write_effects(effects, session)
+        if effects:
+            self._publish(effects)
         return updated
 
     async def delete(self, uid: str):
-        """Delete a transaction and rollback all effects."""
-        existing = await self.collection.find_one({"uid": uid})
-        if not existing:
-            return False
-
-        await self.collection.delete_one({"uid": uid})
-        await self._rollback_all(existing)
+        """Delete a transaction and rollback all effects in the same atomic write."""
+        async with self._atomic() as session:
+            if self.timeseries:
+                existing = await self._swap_timeseries(uid)
+                if existing:
+                    await self.uid_registry.delete_one({"_id": uid})
+            else:
+                existing = await self.collection.find_one_and_delete({"uid": uid}, session=session)
+            if not existing:
+                return False
+
+            category_meta = await self._category_meta([existing], session)
+            effects = self._new_effects()
+            self._add_effects(effects, existing, category_meta, sign=-1)
+            await self._write_effects(effects, session)
+        self._publish(effects)
         return True
 
     # ====================================================
-    # ============= LOGIC HELPERS ========================
+    # ============= TIME-SERIES STORAGE ==================
     # ====================================================
 
-    async def _apply_all(self, tx: dict):
-        await self._update_account_balances_on_create(tx)
-        await self._update_category_totals_on_create(tx)
-        await self._update_budget_on_create(tx)
-
-    async def _rollback_all(self, tx: dict):
-        await self._rollback_account_balances(tx)
-        await self._rollback_category_totals(tx)
-        await self._rollback_budget(tx)
+    # Attempts before a concurrently modified transaction is reported as a conflict
+    CAS_ATTEMPTS = 5
+
+    async def _claim_uids(
+        self, txs: List[Dict[str, Any]], pending: List[int], failed: set, errors: List[Dict[str, Any]]
+    ) -> List[int]:
+        """Claim the uids of txs[pending] in the uid registry; returns the indexes that got theirs."""
+        try:
+            await self.uid_registry.insert_many([{"_id": txs[i]["uid"]} for i in pending], ordered=False)
+            return pending
+        except BulkWriteError as e:
+            taken = set()
+            for err in e.details.get("writeErrors", []):
+                index = pending[err["index"]]
+                taken.add(index)
+                failed.add(index)
+                errors.append({"index": index, "uid": txs[index]["uid"], "error": "Transaction uid already exists"})
+            return [i for i in pending if i not in taken]
+
+    async def _swap_timeseries(self, uid: str, update_data: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+        """
+        Update (or, without update_data, delete) a transaction stored in time-series mode.
+
+        Time-series writes can't run in a session or use find_one_and_*, so the document is
+        read and then written only if its effect fields are still what was read; otherwise
+        the read is retried. Returns the document as it was, or None if there is none.
+        """
+        for _ in range(self.CAS_ATTEMPTS):
+            existing = await self.collection.find_one({"uid": uid})
+            if not existing:
+                return None
+            guard = {"_id": existing["_id"], **{field: existing.get(field) for field in self.EFFECT_FIELDS}}
+            if update_data is None:
+                done = (await self.collection.delete_one(guard)).deleted_count
+            else:
+                done = (await self.collection.update_one(guard, {"$set": update_data})).matched_count
+            if done:
+                return existing
+        raise HTTPException(status_code=409, detail=f"Transaction {uid} is being modified concurrently; retry")
 
     # ====================================================
-    # ============= ACCOUNT BALANCE LOGIC ================
+    # ============= DENORMALIZED NAMES ===================
     # ====================================================
 
-    async def _update_account_balances_on_create(self, tx: dict):
-        ttype = tx["type"]
-        amt = tx["amount"]
-        fee = tx.get("transfer_fee", 0) or 0
-
-        if ttype == "income":
-            await self.db["accounts"].update_one(
-                {"uid": tx["account_uid"]}, {"$inc": {"balance": amt}}
-            )
-        elif ttype == "expense":
-            await self.db["accounts"].update_one(
-                {"uid": tx["account_uid"]}, {"$inc": {"balance": -amt}}
-            )
-        elif ttype == "reimburse":
-            await self.db["accounts"].update_one(
-                {"uid": tx["account_uid"]}, {"$inc": {"balance": amt}}
-            )
-        elif ttype == "transfer":
-            await self.db["accounts"].update_one(
-                {"uid": tx["from_account_uid"]}, {"$inc": {"balance": -(amt + fee)}}
-            )
-            await self.db["accounts"].update_one(
-                {"uid": tx["to_account_uid"]}, {"$inc": {"balance": amt}}
-            )
-
-    async def _rollback_account_balances(self, tx: dict):
-        """Reverse previous account effects."""
-        ttype = tx["type"]
-        amt = tx["amount"]
-        fee = tx.get("transfer_fee", 0) or 0
-
-        if ttype == "income":
-            inc = -amt
-        elif ttype == "expense":
-            inc = amt
-        elif ttype == "reimburse":
-            inc = -amt
-        elif ttype == "transfer":
-            # Undo both directions
-            await self.db["accounts"].update_one(
-                {"uid": tx["from_account_uid"]}, {"$inc": {"balance": amt + fee}}
-            )
-            await self.db["accounts"].update_one(
-                {"uid": tx["to_account_uid"]}, {"$inc": {"balance": -amt}}
-            )
-            return
-        else:
-            return
-
-        await self.db["accounts"].update_one(
-            {"uid": tx["account_uid"]}, {"$inc": {"balance": inc}}
+    async def _store_names(self, txs: List[Dict[str, Any]]) -> None:
+        """
+        Copy account/category display names onto the documents about to be written,
+        so reads need no joins. Renames are propagated later by background.RenameFanout.
+        """
+        account_uids = [tx.get(f) for tx in txs for f, _ in NAME_FIELDS["account"]]
+        category_uids = [tx.get(f) for tx in txs for f, _ in NAME_FIELDS["category"]]
+        accounts, categories = await asyncio.gather(
+            AccountModel(self.db).get_names(account_uids),
+            CategoryModel(self.db).get_names(category_uids),
         )
+        for tx in txs:
+            for kind, names in (("account", accounts), ("category", categories)):
+                for uid_field, name_field in NAME_FIELDS[kind]:
+                    if uid_field in tx:
+                        tx[name_field] = names.get(tx[uid_field]) if tx[uid_field] else None
 
     # ====================================================
-    # ============= CATEGORY TOTAL LOGIC =================
+    # ============= BATCHED EFFECT LOGIC =================
     # ====================================================
 
-    async def _update_category_totals_on_create(self, tx: dict):
-        ttype = tx["type"]
-        amt = tx["amount"]
-        category_uid = tx.get("category_uid")
-
-        if not category_uid:
-            return
-
-        if ttype == "expense":
-            await self.db["categories"].update_one(
-                {"uid": category_uid}, {"$inc": {"total_spent": amt}}
-            )
-        elif ttype == "income":
-            await self.db["categories"].update_one(
-                {"uid": category_uid}, {"$inc": {"total_earned": amt}}
-            )
-        elif ttype == "reimburse":
-            # reduce spending since reimbursed
-            await self.db["categories"].update_one(
-                {"uid": category_uid}, {"$inc": {"total_spent": -amt}}
-            )
-
-    async def _rollback_category_totals(self, tx: dict):
-        """Reverse category totals."""
+    @staticmethod
+    def _new_effects() -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Empty accumulator of {collection: {uid or compound key: {field: delta}}}."""
+        return {
+            "accounts": defaultdict(lambda: defaultdict(float)),
+            "categories": defaultdict(lambda: defaultdict(float)),
+            "rollups": defaultdict(lambda: defaultdict(float)),
+            "category_subtrees": defaultdict(lambda: defaultdict(float)),
+            "snapshots": defaultdict(lambda: defaultdict(float)),
+        }
+
+    async def _account_meta(self, uids: List[str], session=None) -> Dict[str, Dict[str, Any]]:
+        """Fetch balance and type of every account in ``uids`` in one query, keyed by uid."""
+        if not uids:
+            return {}
+        cursor = self.db["accounts"].find(
+            {"uid": {"$in": uids}}, {"uid": 1, "balance": 1, "type": 1, "_id": 0}, session=session
+        )
+        return {acc["uid"]: acc async for acc in cursor}
+
+    async def _category_meta(self, txs: List[Dict[str, Any]], session=None) -> Dict[str, Dict[str, Any]]:
+        """Fetch budget and ancestors of every referenced category in one query, keyed by uid."""
+        uids = list({tx["category_uid"] for tx in txs if tx.get("category_uid")})
+        if not uids:
+            return {}
+        cursor = self.db["categories"].find(
+            {"uid": {"$in": uids}}, {"uid": 1, "budget": 1, "ancestors": 1, "_id": 0}, session=session
+        )
+        return {cat["uid"]: cat async for cat in cursor}
+
+    @staticmethod
+    def _add_effects(
+        effects: Dict[str, Any], tx: dict, categories_meta: Dict[str, Dict[str, Any]], sign: int = 1
+    ) -> None:
+        """
+        Accumulate the account, category and budget effects of one transaction (sign=-1 reverses them).
+        Balance changes also go to the account's daily snapshot bucket for the transaction's day.
+        Category deltas also go to the subtree_* totals of the category and all of its ancestors,
+        and budget usage to the category's budget_periods buckets for the transaction's week, month and year in the reporting timezone.
+        """
         ttype = tx["type"]
-        amt = tx["amount"]
+        amt = tx["amount"] * sign
+        fee = (tx.get("transfer_fee", 0) or 0) * sign
+        accounts = effects["accounts"]
+        categories = effects["categories"]
+        rollups = effects["rollups"]
+        period = rollup_period(tx.get("date") or tx["created_at"])
         category_uid = tx.get("category_uid")
-        if not category_uid:
-            return
 
-        if ttype == "expense":
-            inc = -amt
-        elif ttype == "income":
-            inc = -amt
-        elif ttype == "reimburse":
-            inc = amt
+        day = snapshot_day(tx.get("date") or tx["created_at"])
+        for account_uid, delta in balance_deltas(tx, sign):
+            accounts[account_uid]["balance"] += delta
+            effects["snapshots"][(account_uid, day)]["delta"] += delta
+
+        # Daily rollups; transfers are recorded once per side
+        if ttype == "transfer":
+            out_key = (period, tx["from_account_uid"], None, "transfer_out")
+            in_key = (period, tx["to_account_uid"], None, "transfer_in")
+            rollups[out_key]["amount"] += amt + fee
+            rollups[out_key]["count"] += sign
+            rollups[in_key]["amount"] += amt
+            rollups[in_key]["count"] += sign
         else:
-            return
-
-        field = "total_spent" if ttype in ["expense", "reimburse"] else "total_earned"
-        await self.db["categories"].update_one({"uid": category_uid}, {"$inc": {field: inc}})
-
-    # ====================================================
-    # ============= CATEGORY BUDGET LOGIC ================
-    # ====================================================
+            key = (period, tx.get("account_uid"), category_uid, ttype)
+            rollups[key]["amount"] += amt
+            rollups[key]["count"] += sign
 
-    async def _update_budget_on_create(self, tx: dict):
-        """Adjust the used portion of a category's budget."""
-        ttype = tx["type"]
-        amt = tx["amount"]
-        category_uid = tx.get("category_uid")
         if not category_uid:
             return
 
-        category = await self.db["categories"].find_one({"uid": category_uid})
-        if not category or "budget" not in category:
-            return  # no budget tracking for this category
-
+        meta = categories_meta.get(category_uid) or {}
+        budgeted = "budget" in meta
+        deltas: Dict[str, float] = {}
         if ttype == "expense":
-            await self.db["categories"].update_one(
-                {"uid": category_uid}, {"$inc": {"budget_used": amt}}
-            )
-        elif ttype == "reimburse":
-            await self.db["categories"].update_one(
-                {"uid": category_uid}, {"$inc": {"budget_used": -amt}}
-            )
-
-    async def _rollback_budget(self, tx: dict):
-        """Reverse budget changes when deleting/updating transactions."""
-        ttype = tx["type"]
-        amt = tx["amount"]
-        category_uid = tx.get("category_uid")
-        if not category_uid:
-            return
-
-        category = await self.db["categories"].find_one({"uid": category_uid})
-        if not category or "budget" not in category:
-            return
-
-        if ttype == "expense":
-            inc = -amt
+            deltas["total_spent"] = amt
+            if budgeted:
+                deltas["budget_used"] = amt
+        elif ttype == "income":
+            deltas["total_earned"] = amt
         elif ttype == "reimburse":
-            inc = amt
-        else:
-            return
-
-        await self.db["categories"].update_one(
-            {"uid": category_uid}, {"$inc": {"budget_used": inc}}
+            deltas["total_spent"] = -amt
+            if budgeted:
+                deltas["budget_used"] = -amt
+
+        path = tuple(meta.get("ancestors") or ()) + (category_uid,)
+        for field, delta in deltas.items():
+            categories[category_uid][field] += delta
+            effects["category_subtrees"][path]["subtree_" + field] += delta
+
+        if "budget_used" in deltas:
+            for period_key in budget_period_keys(tx.get("date") or tx["created_at"]).values():
+                categories[category_uid]["budget_periods." + period_key] += deltas["budget_used"]
+
+    def _effects_for(
+        self, txs: List[Dict[str, Any]], categories_meta: Dict[str, Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Net the effects of many transactions."""
+        effects = self._new_effects()
+        for tx in txs:
+            self._add_effects(effects, tx, categories_meta)
+        return effects
+
+    @staticmethod
+    def _publish(effects: Dict[str, Any]) -> None:
+        """Patch in-process caches with effects that have been committed."""
+        CategoryModel.tree_cache.apply_deltas(effects["categories"])
+
+    async def _write_effects(self, effects: Dict[str, Any], session=None) -> None:
+        """
+        Send netted effects as one bulk_write of $inc updates per collection, skipping zero deltas.
+        Collections listed in UPSERT_KEYS are upserted on their compound key; buckets in
+        FANOUT_TARGETS become one update_many per uid tuple on their target collection.
+
+        Daily balance snapshots are planned before anything is written, since new snapshot
+        rows start from the balances as they stand before this write. Balance changes
+        also go to the global account summary, per account type. Both read the balance
+        and type of the changed accounts from one shared fetch.
+
+        Collections are written concurrently outside a transaction; inside one the
+        writes share the session and must run one after another.
+        """
+        grouped: Dict[str, list] = defaultdict(list)
+        snapshots = SnapshotModel(self.db)
+        summary = AccountSummaryModel(self.db)
+        changed = [uid for uid, fields in effects["accounts"].items() if fields.get("balance")]
+        accounts = await self._account_meta(changed, session)
+        # Unknown accounts start their snapshots from zero, like their balance $inc matching nothing
+        balances = {uid: accounts.get(uid, {}).get("balance", 0) or 0 for uid in changed}
+        snapshot_ops = await snapshots.operations(effects.get("snapshots", {}), session, balances)
+        summary_inc = summary.balance_increments(
+            effects["accounts"], {uid: acc.get("type") for uid, acc in accounts.items()}
         )
+        for bucket, per_key in effects.items():
+            if bucket == "snapshots":
+                continue
+            key_fields = self.UPSERT_KEYS.get(bucket)
+            target = self.FANOUT_TARGETS.get(bucket)
+            operations = grouped[target or bucket]
+            for key, fields in per_key.items():
+                inc = {field: delta for field, delta in fields.items() if delta}
+                if not inc:
+                    continue
+                if key_fields:
+                    operations.append(UpdateOne(dict(zip(key_fields, key)), {"$inc": inc}, upsert=True))
+                elif target:
+                    operations.append(UpdateMany({"uid": {"$in": list(key)}}, {"$inc": inc}))
+                else:
+                    operations.append(UpdateOne({"uid": key}, {"$inc": inc}))
+        writes = [(self.db[collection], ops, False) for collection, ops in grouped.items() if ops]
+        if snapshot_ops:
+            # Ordered: rows must exist before deltas are added to them
+            writes.append((snapshots.collection, snapshot_ops, True))
+        summary_op = summary.operation(summary_inc)
+        if summary_op:
+            writes.append((summary.collection, [summary_op], False))
+
+        if session is None:
+            await asyncio.gather(*(coll.bulk_write(ops, ordered=ordered) for coll, ops, ordered in writes))
+        else:
+            for coll, ops, ordered in writes:
+                await coll.bulk_write(ops, ordered=ordered, session=session)
@@ -0,0 +1,62 @@
+# src/periods.py
+"""Calendar periods in the reporting timezone, shared by rollups and category budgets."""
+
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo
+
+from .config.settings import get_database_settings
+
+
+def reporting_timezone() -> str:
+    return get_database_settings().REPORTING_TIMEZONE
+
+
+def reporting_time(value: Optional[datetime] = None) -> datetime:
+    """
+    Wall-clock time of ``value`` (default: now) in the reporting timezone, as a naive datetime.
+    Naive values are taken as UTC, as stored transaction dates are.
+    """
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(ZoneInfo(reporting_timezone())).replace(tzinfo=None)
+
+
+def rollup_period(value: datetime) -> datetime:
+    """
+    Calendar day of a transaction date in the reporting timezone, the granularity rollups
+    are stored at. Naive dates are taken as UTC; the day is returned as a naive midnight.
+    """
+    local = reporting_time(value)
+    return datetime(local.year, local.month, local.day)
+
+
+def budget_period_key(moment: datetime, frequency: Optional[str]) -> Optional[str]:
+    """
+    Key of the budget period containing the reporting-timezone time ``moment`` for a category
+    frequency: "2026-10" (monthly), "2026-W42" (ISO week), "2026" (yearly); None for one-time budgets.
+    """
+    if frequency == "monthly":
+        return f"{moment.year:04d}-{moment.month:02d}"
+    if frequency == "weekly":
+        year, week, _ = moment.isocalendar()
+        return f"{year:04d}-W{week:02d}"
+    if frequency == "yearly":
+        return f"{moment.year:04d}"
+    return None
+
+
+# Recurring frequencies; usage is bucketed under all of them so ancestors with
+# another frequency can still sum their subtree's usage for their own period
+BUDGET_FREQUENCIES = ("weekly", "monthly", "yearly")
+
+
+def budget_period_keys(value: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    Key of the period containing ``value`` (default: now) for every recurring frequency,
+    on the reporting-timezone calendar that rollups use.
+    """
+    local = reporting_time(value)
+    return {frequency: budget_period_key(local, frequency) for frequency in BUDGET_FREQUENCIES}
@@ -1,11 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from typing import List, Optional
+from datetime import datetime
 from ..schemas.accounts import (
     AccountCreate,
     AccountUpdate,
-    AccountResponse
+    AccountResponse,
+    InterestAccrualResponse,
+    BalancePoint,
+    BalanceAt,
+    LedgerEntry,
+    LedgerPage,
+    AccountSummaryResponse
 )
 from ..models.accounts import AccountModel
+from ..models.interest import InterestModel
+from ..models.snapshots import SnapshotModel
+from ..models.account_summary import AccountSummaryModel
+from ..models.transaction import TransactionModel
+from .transactionsRoute import load_names, attach_names
 from ..database import get_db
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -35,6 +47,39 @@ async def get_accounts(
     accounts = await account_model.get_all()
     return [AccountResponse(**acc) for acc in accounts]
 
+@router.get("/summary", response_model=AccountSummaryResponse)
+async def get_accounts_summary(
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> AccountSummaryResponse:
+    """Total balance and account count, overall and per account type, from the maintained summary document"""
+    summary = await AccountSummaryModel(db).get()
+    by_type = {
+        type_: {"balance": round(totals.get("balance", 0), 2), "count": totals.get("count", 0)}
+        for type_, totals in summary.get("by_type", {}).items()
+        if totals.get("count")
+    }
+    return AccountSummaryResponse(
+        total_balance=round(summary.get("total_balance", 0), 2),
+        account_count=summary.get("account_count", 0),
+        by_type=by_type,
+    )
+
+@router.post("/interest/accrue", response_model=InterestAccrualResponse)
+async def accrue_interest(
+    category_uid: str = Query(..., description="Category for the generated interest transactions"),
+    dry_run: bool = Query(False, description="Preview the interest without writing anything"),
+    as_of: Optional[datetime] = Query(None, description="Accrual date (defaults to now)"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> InterestAccrualResponse:
+    """
+    Accrue one period of interest (per each account's interest_frequency) on every
+    interest-bearing account, posted as transactions. Re-running a period is a no-op,
+    and dry runs leave out periods that were already posted.
+    """
+    interest_model = InterestModel(db)
+    result = await interest_model.accrue(category_uid, as_of=as_of, dry_run=dry_run)
+    return InterestAccrualResponse(**result)
+
 @router.get("/{uid}", response_model=AccountResponse)
 async def get_account(
     uid: str,
@@ -50,6 +95,72 @@ async def get_account(
         )
     return AccountResponse(**account)
 
+@router.get("/{uid}/history", response_model=List[BalancePoint])
+async def get_account_history(
+    uid: str,
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> List[BalancePoint]:
+    """Daily closing balances of an account within a date range, read from its balance snapshots"""
+    account_model = AccountModel(db)
+    if not await account_model.get_by_uid(uid):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with UID {uid} not found"
+        )
+    points = await SnapshotModel(db).history(uid, date_from=date_from, date_to=date_to)
+    return [BalancePoint(**point) for point in points]
+
+@router.get("/{uid}/balance", response_model=BalanceAt)
+async def get_account_balance_at(
+    uid: str,
+    at: datetime = Query(..., description="Moment to report the balance at"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> BalanceAt:
+    """Balance of an account at a point in time"""
+    account_model = AccountModel(db)
+    if not await account_model.get_by_uid(uid):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with UID {uid} not found"
+        )
+    balance = await SnapshotModel(db).balance_at(uid, at)
+    return BalanceAt(account_uid=uid, at=at, balance=balance)
+
+@router.get("/{uid}/ledger", response_model=LedgerPage)
+async def get_account_ledger(
+    uid: str,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of entries to return"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> LedgerPage:
+    """
+    Page through an account's transactions (including both sides of transfers), newest first,
+    with the running balance after each one.
+    Pass the returned next_cursor back as ``cursor`` for the next page; it is null on the
+    last page and is also sent in the X-Next-Cursor header.
+    """
+    account_model = AccountModel(db)
+    if not await account_model.get_by_uid(uid):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Account with UID {uid} not found"
+        )
+    try:
+        entries, next_cursor = await TransactionModel(db).get_ledger(uid, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    accounts, categories = await load_names(entries, db)
+    return LedgerPage(
+        entries=[LedgerEntry(**attach_names(entry, accounts, categories)) for entry in entries],
+        next_cursor=next_cursor,
+    )
+
 @router.patch("/{uid}", response_model=AccountResponse)
 async def update_account(
     uid: str,
@@ -1,12 +1,16 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Literal
-from bson import ObjectId
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from typing import List, Literal, Optional
 from ..schemas.categories import (
     CategoryCreate,
     CategoryUpdate,
     CategoryResponse,
+    CategoryMerge,
+    CategoryMove,
+    CategoryBulkCreate,
+    CategoryBulkResponse,
 )
 from ..models.categories import CategoryModel
+from ..background import job_runner
 from ..database import get_db
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
@@ -24,39 +28,8 @@ async def create_category(
     """Create a new category with budget overflow protection."""
     category_model = CategoryModel(db)
     data = category.model_dump()
-    parent_uid = data.get("parent_uid")
-
-    # ✅ Check for parent budget overflow BEFORE creating
-    if parent_uid:
-        parent = await category_model.get_by_uid(parent_uid)
-        if not parent:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Parent category with UID '{parent_uid}' not found."
-            )
-
-        parent_budget = parent.get("budget", 0)
-        if parent_budget <= 0:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Parent category '{parent.get('name')}' has no budget set."
-            )
-
-        # Get existing children and sum their budgets
-        children = await category_model.get_children(parent_uid)
-        total_child_budget = sum(child.get("budget", 0) for child in children)
-
-        new_total = total_child_budget + data.get("budget", 0)
-        if new_total > parent_budget:
-            raise HTTPException(
-                status_code=400,
-                detail=(
-                    f"Budget overflow: total child budgets ({new_total}) "
-                    f"would exceed parent budget ({parent_budget})."
-                ),
-            )
-
-    # ✅ Proceed with creation
+
+    # ✅ Parent existence and budget overflow are enforced atomically by the model
     result = await category_model.create(data)
     if not result:
         raise HTTPException(status_code=400, detail="Could not create category")
@@ -65,6 +38,36 @@ async def create_category(
 
 
 
+@router.post("/bulk", response_model=CategoryBulkResponse, status_code=201)
+async def create_categories_bulk(
+    payload: CategoryBulkCreate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> CategoryBulkResponse:
+    """
+    Import a category tree in one request: nested ``children``, a flat list with
+    ``parent_uid`` references, or both. All nodes are validated together and
+    inserted at once; any problem rejects the whole import with a 400 listing them.
+    """
+    flat = []
+    errors = []
+    stack = [(node, None) for node in reversed(payload.categories)]
+    while stack:
+        node, parent_uid = stack.pop()
+        data = node.model_dump(exclude={"children"})
+        if parent_uid is not None:
+            if data.get("parent_uid") not in (None, parent_uid):
+                errors.append({"uid": data["uid"], "error": "parent_uid conflicts with the nesting"})
+            data["parent_uid"] = parent_uid
+        flat.append(data)
+        stack.extend((child, data["uid"]) for child in reversed(node.children))
+    if errors:
+        raise HTTPException(status_code=400, detail=errors)
+
+    category_model = CategoryModel(db)
+    created = await category_model.create_many(flat)
+    return CategoryBulkResponse(inserted=len(created), uids=[cat["uid"] for cat in created])
+
+
 @router.get("/", response_model=List[CategoryResponse])
 async def get_categories(
     db: AsyncIOMotorDatabase = Depends(get_db)
@@ -75,19 +78,13 @@ async def get_categories(
     return [CategoryResponse(**cat) for cat in categories]
 
 
-async def fetch_children(db, parent_uid: str):
-    """Recursively fetch children categories"""
-    children_cursor = db.categories.find({"parent_uid": parent_uid})
-    children = []
-    async for child in children_cursor:
-        child_dict = dict(child)
-        child_dict["children"] = await fetch_children(db, child_dict["uid"])
-        children.append(child_dict)
-    return children
-
-
 @router.get("/tree", status_code=status.HTTP_200_OK)
 async def get_category_tree(
+    frequency: Optional[Literal["monthly", "weekly", "yearly", "one-time"]] = Query(None),
+    is_active: Optional[bool] = Query(None),
+    transaction_type: Optional[Literal["income", "expense"]] = Query(None),
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels below the root(s) to include"),
+    root_uid: Optional[str] = Query(None, description="Return only this category's subtree"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     """
@@ -95,106 +92,50 @@ async def get_category_tree(
     Includes:
       - recursive child nesting
       - aggregated totals (spent, earned, used)
-      - budget utilization ratios
+      - budget utilization ratios and budget_used_current_period
       - over-budget flag
+    The aggregated tree and its JSON body are cached in-process (see CategoryTreeCache).
+    Filters prune the cached tree to the matching categories and their ancestors;
+    each returned node keeps the totals of its whole subtree, hidden children included.
     """
     category_model = CategoryModel(db)
-    all_categories = await category_model.get_all()
-
-    if not all_categories:
-        # optional: return empty list instead of 404
-        return []
-
-    # Build lookup map by UID
-    category_map = {cat["uid"]: {**cat, "children": []} for cat in all_categories}
-    roots = []
-
-    # Build hierarchy
-    for cat in category_map.values():
-        parent_uid = cat.get("parent_uid")
-        if parent_uid and parent_uid in category_map:
-            category_map[parent_uid]["children"].append(cat)
-        else:
-            roots.append(cat)
-
-    # Recursive aggregation
-    def aggregate_totals(category):
-        total_spent = category.get("total_spent", 0)
-        total_earned = category.get("total_earned", 0)
-        budget_used = category.get("budget_used", 0)
-
-        for child in category.get("children", []):
-            child_agg = aggregate_totals(child)
-            total_spent += child_agg["total_spent"]
-            total_earned += child_agg["total_earned"]
-            budget_used += child_agg["budget_used"]
-
-        category["total_spent"] = round(total_spent, 2)
-        category["total_earned"] = round(total_earned, 2)
-        category["budget_used"] = round(budget_used, 2)
-
-        budget = category.get("budget", 0)
-        if budget and budget > 0:
-            utilization = round(budget_used / budget, 4)
-            over_budget = budget_used > budget
-        else:
-            utilization = None
-            over_budget = False
-
-        category["budget_utilization"] = utilization
-        category["is_over_budget"] = over_budget
-
-        return {
-            "total_spent": total_spent,
-            "total_earned": total_earned,
-            "budget_used": budget_used,
-        }
-
-    for root in roots:
-        aggregate_totals(root)
-
-    # Optional: sort children alphabetically
-    def sort_children(category):
-        category["children"].sort(key=lambda c: c.get("name", ""))
-        for child in category["children"]:
-            sort_children(child)
-        return category
-    
-
-    for root in roots:
-        sort_children(root)
-
-    def convert_objectids(obj):
-        """Recursively convert ObjectId to string."""
-        if isinstance(obj, list):
-            return [convert_objectids(i) for i in obj]
-        elif isinstance(obj, dict):
-            return {
-                k: convert_objectids(v)
-                for k, v in obj.items()
-                if k != "_id"  # optionally remove Mongo's internal _id
-            }
-        elif isinstance(obj, ObjectId):
-            return str(obj)
-        return obj
-
-    # Apply conversion before returning
-    return convert_objectids(roots)
-        
+    body = await category_model.get_tree_bytes(
+        frequency=frequency,
+        is_active=is_active,
+        transaction_type=transaction_type,
+        max_depth=max_depth,
+        root_uid=root_uid,
+    )
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Category with UID {root_uid} not found")
+    return Response(content=body, media_type="application/json")
+
 
 @router.get("/{uid}", response_model=CategoryResponse)
 async def get_category(
     uid: str,
+    max_depth: Optional[int] = Query(None, ge=0, description="Levels of descendants to include (all by default)"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ) -> CategoryResponse:
-    """Get a specific category by UID"""
+    """Get a specific category by UID with its subtree nested under ``children``"""
     category_model = CategoryModel(db)
-    category = await category_model.get_by_uid(uid)
+    category = await category_model.get_subtree(uid, max_depth=max_depth)
     if not category:
         raise HTTPException(status_code=404, detail=f"Category with UID {uid} not found")
-    category_dict = dict(category)
-    category_dict["children"] = await fetch_children(db, uid)
-    return CategoryResponse(**category_dict)
+    return CategoryResponse(**category)
+
+
+@router.get("/{uid}/breadcrumb", response_model=List[CategoryResponse])
+async def get_category_breadcrumb(
+    uid: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> List[CategoryResponse]:
+    """Get the categories from the root down to ``uid``"""
+    category_model = CategoryModel(db)
+    path = await category_model.get_breadcrumb(uid)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Category with UID {uid} not found")
+    return [CategoryResponse(**cat) for cat in path]
 
 @router.patch("/{uid}", response_model=CategoryResponse)
 async def update_category(
@@ -206,32 +147,7 @@ async def update_category(
     category_model = CategoryModel(db)
     update_data = cat_data.model_dump(exclude_unset=True)
 
-    # Check if category exists
-    category = await category_model.get_by_uid(uid)
-    if not category:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Category {uid} not found or not modified"
-        )
-
-    # ✅ If updating a child budget, ensure parent limit isn't exceeded
-    if "budget" in update_data and category.get("parent_uid"):
-        parent = await category_model.get_by_uid(category["parent_uid"])
-        if parent:
-            siblings = await category_model.get_children(parent["uid"])
-            total_sibling_budgets = sum(
-                (update_data["budget"] if s["uid"] == uid else s.get("budget", 0))
-                for s in siblings
-            )
-            if total_sibling_budgets > parent.get("budget", 0):
-                raise HTTPException(
-                    status_code=400,
-                    detail=(
-                        f"Budget overflow: Total child budgets ({total_sibling_budgets}) "
-                        f"exceed parent budget ({parent.get('budget', 0)})"
-                    )
-                )
-
+    # ✅ Parent budget overflow is enforced atomically by the model
     updated_category = await category_model.update(uid, update_data)
     if not updated_category:
         raise HTTPException(
@@ -242,14 +158,65 @@ async def update_category(
     return CategoryResponse(**updated_category)
 
 
+@router.post("/{uid}/move", response_model=CategoryResponse)
+async def move_category(
+    uid: str,
+    move: CategoryMove,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> CategoryResponse:
+    """Move a category and its subtree under a new parent, rebalancing subtree totals."""
+    category_model = CategoryModel(db)
+    moved = await category_model.move(uid, move.parent_uid)
+    if not moved:
+        raise HTTPException(status_code=404, detail=f"Category {uid} not found")
+    return CategoryResponse(**moved)
+
+
+async def run_merge(
+    db: AsyncIOMotorDatabase,
+    response: Response,
+    source_uids: List[str],
+    target_uid: Optional[str],
+) -> dict:
+    """Merge/delete inline, or as a background job (202) when many transactions are affected."""
+    category_model = CategoryModel(db)
+    await category_model.check_merge(source_uids, target_uid)
+    if await category_model.count_transactions(source_uids) > CategoryModel.BACKGROUND_THRESHOLD:
+        job = await job_runner.submit(
+            db,
+            "category_merge",
+            {"source_uids": source_uids, "target_uid": target_uid},
+            lambda: category_model.merge(source_uids, target_uid),
+        )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"status": "accepted", "job_uid": job["uid"]}
+    return await category_model.merge(source_uids, target_uid)
+
+
+@router.post("/merge", status_code=status.HTTP_200_OK)
+async def merge_categories(
+    merge: CategoryMerge,
+    response: Response,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> dict:
+    """
+    Merge categories into a target: transactions, children, totals and budget usage move over.
+    Large merges run in the background; poll /jobs/{job_uid}.
+    """
+    result = await run_merge(db, response, merge.source_uids, merge.target_uid)
+    return {"status": result.pop("status", "merged"), **result}
+
+
 @router.delete("/{uid}", status_code=status.HTTP_200_OK,)
 async def delete_category(
     uid: str,
+    response: Response,
+    reassign_to: Optional[str] = Query(None, description="Category that takes over the transactions and children"),
     db: AsyncIOMotorDatabase = Depends(get_db)
 ) -> dict:
-    """Delete a category"""
-    category_model = CategoryModel(db)
-    deleted = await category_model.delete(uid)
-    if not deleted:
-        raise HTTPException(status_code=404, detail=f"Category {uid} not found")
-    return {"status": "deleted", "uid": uid}
+    """
+    Delete a category. Its transactions move to ``reassign_to`` (or become uncategorized)
+    and its children move under ``reassign_to`` (or up to its parent).
+    """
+    result = await run_merge(db, response, [uid], reassign_to)
+    return {"status": result.pop("status", "deleted"), "uid": uid, **result}
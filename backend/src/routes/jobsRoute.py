@@ -0,0 +1,18 @@
+from fastapi import APIRouter, HTTPException, Depends
+from ..background import job_runner
+from ..database import get_db
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+@router.get("/{uid}")
+async def get_job(
+    uid: str,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> dict:
+    """Get the status (and result or error once finished) of a background job"""
+    job = await job_runner.get(db, uid)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {uid} not found")
+    return job
@@ -0,0 +1,24 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional
+from datetime import datetime
+from ..schemas.networth import NetWorthPoint
+from ..models.snapshots import SnapshotModel
+from ..database import get_db
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+router = APIRouter(prefix="/networth", tags=["Net worth"])
+
+
+@router.get("/", response_model=List[NetWorthPoint])
+async def get_net_worth(
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> List[NetWorthPoint]:
+    """
+    Net worth on each day it changed within the range, led by the value carried into
+    ``from``. Read from the daily balance snapshots only.
+    """
+    snapshot_model = SnapshotModel(db)
+    points = await snapshot_model.net_worth(date_from=date_from, date_to=date_to)
+    return [NetWorthPoint(**point) for point in points]
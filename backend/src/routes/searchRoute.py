@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, Query
+from typing import List, Optional, Literal
+from ..cache import name_index
+from ..schemas.search import NameMatch
+from ..database import get_db
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/names", response_model=List[NameMatch])
+async def search_names(
+    q: str = Query(..., min_length=1, description="Prefix of any word in the name (case-insensitive)"),
+    kind: Optional[Literal["account", "category"]] = Query(None),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> List[NameMatch]:
+    """
+    Typeahead over account and category names, answered from the in-process
+    prefix index (see cache.NamePrefixIndex); Mongo is only read to (re)load it.
+    """
+    await name_index.ensure_loaded(db)
+    return name_index.search(q, limit=limit, kind=kind)
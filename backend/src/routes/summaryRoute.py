@@ -0,0 +1,52 @@
+from fastapi import APIRouter, HTTPException, Depends, status, Query
+from typing import List, Optional, Literal
+from datetime import datetime
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from ..schemas.summary import SummaryPeriod
+from ..models.rollups import RollupModel
+from ..periods import reporting_timezone
+from ..database import get_db
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+router = APIRouter(prefix="/summary", tags=["Summary"])
+
+
+@router.get("/", response_model=List[SummaryPeriod])
+async def get_summary(
+    granularity: Literal["day", "week", "month"] = Query("month"),
+    tz: Optional[str] = Query(None, description="IANA timezone of the periods; must match REPORTING_TIMEZONE"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    account_uid: Optional[str] = Query(None),
+    category_uid: Optional[str] = Query(None),
+    group_by: Optional[Literal["category", "account"]] = Query(None),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> List[SummaryPeriod]:
+    """
+    Get income/expense/transfer totals per period, read from the incrementally maintained rollups.
+    Periods are calendar days, weeks or months of the configured reporting timezone.
+    """
+    if tz is not None:
+        try:
+            ZoneInfo(tz)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown timezone '{tz}'"
+            )
+        if tz != reporting_timezone():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Rollups are bucketed in {reporting_timezone()}; set REPORTING_TIMEZONE to change it"
+            )
+
+    rollup_model = RollupModel(db)
+    rows = await rollup_model.summarize(
+        granularity=granularity,
+        date_from=date_from,
+        date_to=date_to,
+        account_uid=account_uid,
+        category_uid=category_uid,
+        group_by=group_by,
+    )
+    return [SummaryPeriod(**row) for row in rows]
@@ -1,51 +1,83 @@
 from ..models.categories import CategoryModel
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import List
+from ..models.accounts import AccountModel
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Literal
+from datetime import datetime
+import asyncio
+import csv
+import io
+import json
 from ..schemas.transaction import (
     TransactionCreate,
     TransactionUpdate,
-    TransactionResponse
+    TransactionResponse,
+    TransactionPage,
+    TransactionBulkCreate,
+    TransactionBulkResponse
 )
+from pydantic import ValidationError
 from ..models.transaction import TransactionModel
 from ..database import get_db
+from ..background import NAME_FIELDS
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
 
-async def enrich_transaction_with_names(tx: dict, db: AsyncIOMotorDatabase) -> dict:
-    """Attach readable names for accounts/categories and enrich reimbursed transactions."""
-    if not tx:
-        return tx
+def has_stored_names(tx: dict) -> bool:
+    """True if the document carries denormalized names for every uid it references."""
+    return all(
+        name_field in tx
+        for fields in NAME_FIELDS.values()
+        for uid_field, name_field in fields
+        if tx.get(uid_field)
+    )
 
-    # Account and category lookups
-    if tx.get("account_uid"):
-        account = await db["accounts"].find_one({"uid": tx["account_uid"]}, {"name": 1, "_id": 0})
-        tx["account_name"] = account["name"] if account else None
 
-    if tx.get("category_uid"):
-        category = await db["categories"].find_one({"uid": tx["category_uid"]}, {"name": 1, "_id": 0})
-        tx["category_name"] = category["name"] if category else None
+async def load_names(txs: List[Optional[dict]], db: AsyncIOMotorDatabase):
+    """
+    Resolve account/category uids through the shared name caches, for documents
+    written before names were stored on transactions.
+    """
+    legacy = [tx for tx in txs if tx and not has_stored_names(tx)]
+    if not legacy:
+        return {}, {}
 
-    # Transfer-related names
-    if tx.get("from_account_uid"):
-        from_acc = await db["accounts"].find_one({"uid": tx["from_account_uid"]}, {"name": 1, "_id": 0})
-        tx["from_account_name"] = from_acc["name"] if from_acc else None
+    account_uids = [tx.get(f) for tx in legacy for f in ("account_uid", "from_account_uid", "to_account_uid")]
+    category_uids = [tx.get("category_uid") for tx in legacy]
+    accounts, categories = await asyncio.gather(
+        AccountModel(db).get_names(account_uids),
+        CategoryModel(db).get_names(category_uids),
+    )
+    return accounts, categories
 
-    if tx.get("to_account_uid"):
-        to_acc = await db["accounts"].find_one({"uid": tx["to_account_uid"]}, {"name": 1, "_id": 0})
-        tx["to_account_name"] = to_acc["name"] if to_acc else None
 
-    # Reimbursed transaction details (nested enrichment)
+async def enrich_transaction_with_names(tx: dict, db: AsyncIOMotorDatabase) -> dict:
+    """Attach readable names for accounts/categories and enrich reimbursed transactions."""
+    if not tx:
+        return tx
+
+    # Reimbursed transaction details
+    reimbursed_tx = None
     if tx.get("expense_uid"):
         reimbursed_tx = await db["transactions"].find_one({"uid": tx["expense_uid"]}, {"_id": 0})
-        if reimbursed_tx:
-            # Recursively enrich the reimbursed transaction as well
-            reimbursed_tx = await enrich_transaction_with_names(reimbursed_tx, db)
-            tx["reimbursed_transaction"] = reimbursed_tx
-        else:
-            tx["reimbursed_transaction"] = None
 
+    accounts, categories = await load_names([tx, reimbursed_tx], db)
+    attach_names(tx, accounts, categories)
+    if tx.get("expense_uid"):
+        tx["reimbursed_transaction"] = (
+            attach_names(reimbursed_tx, accounts, categories) if reimbursed_tx else None
+        )
+
+    return tx
+
+def attach_names(tx: dict, accounts: dict, categories: dict) -> dict:
+    """Fill readable names missing from the document from resolved uid → name maps (no database calls)."""
+    tx.setdefault("account_name", accounts.get(tx.get("account_uid")))
+    tx.setdefault("category_name", categories.get(tx.get("category_uid")))
+    tx.setdefault("from_account_name", accounts.get(tx.get("from_account_uid")))
+    tx.setdefault("to_account_name", accounts.get(tx.get("to_account_uid")))
     return tx
 
 @router.post("/", response_model=TransactionResponse, status_code=201)
@@ -111,40 +143,164 @@ async def create_transaction(
     return TransactionResponse(**created_txn)
 
 
-@router.get("/", response_model=List[TransactionResponse])
-async def get_transactions(db: AsyncIOMotorDatabase = Depends(get_db)) -> List[TransactionResponse]:
-    """Get all transactions"""
+@router.post("/bulk", response_model=TransactionBulkResponse, status_code=201)
+async def create_transactions_bulk(
+    payload: TransactionBulkCreate,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> TransactionBulkResponse:
+    """
+    Import many transactions in one request.
+    Valid items are inserted together; invalid or duplicate items are reported per index.
+    """
+    transaction_model = TransactionModel(db)
+
+    valid = []
+    positions = []
+    errors = []
+    seen_uids = set()
+    for index, item in enumerate(payload.transactions):
+        try:
+            tx = TransactionCreate.model_validate(item)
+        except ValidationError as e:
+            errors.append({"index": index, "uid": item.get("uid"), "error": str(e.errors()[0]["msg"])})
+            continue
+        if tx.uid in seen_uids:
+            errors.append({"index": index, "uid": tx.uid, "error": "Duplicate uid in request"})
+            continue
+        seen_uids.add(tx.uid)
+        valid.append(tx.model_dump())
+        positions.append(index)
+
+    inserted, insert_errors = await transaction_model.create_many(valid)
+
+    # Map insert errors back to the caller's indexes
+    for err in insert_errors:
+        errors.append({**err, "index": positions[err["index"]]})
+    errors.sort(key=lambda e: e["index"])
+
+    return TransactionBulkResponse(
+        inserted=len(inserted),
+        uids=[tx["uid"] for tx in inserted],
+        errors=errors,
+    )
+
+
+@router.get("/", response_model=TransactionPage)
+async def get_transactions(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of transactions to return"),
+    cursor: Optional[str] = Query(None, description="Opaque next_cursor from a previous page"),
+    type: Optional[Literal["income", "expense", "reimburse", "transfer"]] = Query(None),
+    account_uid: Optional[str] = Query(None, description="Matches account_uid and either side of a transfer"),
+    category_uid: Optional[str] = Query(None),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    amount_min: Optional[float] = Query(None, ge=0),
+    amount_max: Optional[float] = Query(None, ge=0),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> TransactionPage:
+    """
+    Get one page of transactions matching the filters, newest first.
+    Pass the returned next_cursor back as ``cursor`` for the next page; it is null on the
+    last page and is also sent in the X-Next-Cursor header.
+    Amount bounds have no index of their own: on their own they scan newest first until
+    a page is filled, so pair them with a date range or another filter on large ledgers.
+    """
     transaction_model = TransactionModel(db)
-    transactions = await transaction_model.get_all()
-
-    # Preload all account/category names for efficiency
-    accounts = {
-        acc["uid"]: acc["name"]
-        async for acc in db["accounts"].find({}, {"uid": 1, "name": 1, "_id": 0})
-    }
-    categories = {
-        cat["uid"]: cat["name"]
-        async for cat in db["categories"].find({}, {"uid": 1, "name": 1, "_id": 0})
-    }
+    query = transaction_model.build_query(
+        date_from, date_to, account_uid, category_uid, type, amount_min, amount_max
+    )
+    try:
+        transactions, next_cursor = await transaction_model.get_page(limit=limit, cursor=cursor, query=query)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    # Resolve every reimbursed expense on this page with a single $in query
+    expense_uids = list({tx["expense_uid"] for tx in transactions if tx.get("expense_uid")})
+    expenses = []
+    if expense_uids:
+        expenses = await db["transactions"].find(
+            {"uid": {"$in": expense_uids}}, {"_id": 0}
+        ).to_list(length=len(expense_uids))
+
+    # Names are stored on the documents; only legacy rows fall back to the name caches
+    accounts, categories = await load_names(transactions + expenses, db)
+    reimbursed = {expense["uid"]: attach_names(expense, accounts, categories) for expense in expenses}
 
     enriched_transactions = []
     for tx in transactions:
         # Add readable names
-        tx["account_name"] = accounts.get(tx.get("account_uid"))
-        tx["category_name"] = categories.get(tx.get("category_uid"))
-        tx["from_account_name"] = accounts.get(tx.get("from_account_uid"))
-        tx["to_account_name"] = accounts.get(tx.get("to_account_uid"))
+        attach_names(tx, accounts, categories)
 
         # Include full reimbursed transaction details
-        if tx.get("expense_uid"):
-            reimbursed_tx = await db["transactions"].find_one({"uid": tx["expense_uid"]}, {"_id": 0})
-            if reimbursed_tx:
-                reimbursed_tx = await enrich_transaction_with_names(reimbursed_tx, db)
-                tx["reimbursed_transaction"] = reimbursed_tx
+        if tx.get("expense_uid") and tx["expense_uid"] in reimbursed:
+            tx["reimbursed_transaction"] = reimbursed[tx["expense_uid"]]
 
         enriched_transactions.append(TransactionResponse(**tx))
 
-    return enriched_transactions
+    return TransactionPage(transactions=enriched_transactions, next_cursor=next_cursor)
+
+
+EXPORT_FIELDS = [
+    "uid", "date", "type", "amount", "description", "account_uid", "category_uid",
+    "transfer_fee", "from_account_uid", "to_account_uid", "expense_uid",
+]
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+@router.get("/export")
+async def export_transactions(
+    format: Literal["csv", "ndjson"] = Query("ndjson", description="Output format"),
+    batch_size: int = Query(500, ge=1, le=10000, description="Rows fetched from MongoDB per round trip"),
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+    account_uid: Optional[str] = Query(None),
+    category_uid: Optional[str] = Query(None),
+    type: Optional[Literal["income", "expense", "reimburse", "transfer"]] = Query(None),
+    amount_min: Optional[float] = Query(None, ge=0),
+    amount_max: Optional[float] = Query(None, ge=0),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+) -> StreamingResponse:
+    """
+    Stream transactions straight from the database cursor as CSV or NDJSON.
+    Rows are written batch by batch, so memory stays flat regardless of export size.
+    """
+    transaction_model = TransactionModel(db)
+    query = transaction_model.build_query(
+        date_from, date_to, account_uid, category_uid, type, amount_min, amount_max
+    )
+
+    async def ndjson_rows():
+        async for batch in transaction_model.iter_batches(query, batch_size):
+            yield "".join(
+                json.dumps({f: _export_value(tx.get(f)) for f in EXPORT_FIELDS}) + "\n"
+                for tx in batch
+            )
+
+    async def csv_rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue()
+        async for batch in transaction_model.iter_batches(query, batch_size):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_export_value(tx.get(f)) for f in EXPORT_FIELDS] for tx in batch)
+            yield buffer.getvalue()
+
+    if format == "csv":
+        return StreamingResponse(
+            csv_rows(),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="transactions.csv"'},
+        )
+    return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
 
 
 @router.get("/{uid}", response_model=TransactionResponse)
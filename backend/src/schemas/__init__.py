@@ -2,5 +2,8 @@ from .transaction import (
     TransactionBase,
     TransactionCreate,
     TransactionUpdate,
-    TransactionResponse
+    TransactionResponse,
+    TransactionBulkCreate,
+    TransactionBulkError,
+    TransactionBulkResponse
 )
\ No newline at end of file
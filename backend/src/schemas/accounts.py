@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, Literal
+from typing import Optional, Literal, List, Dict
 from datetime import datetime
 from uuid import uuid4
+from .transaction import TransactionResponse
 
 class AccountBase(BaseModel):
     """Base schema for account data shared between create and response"""
@@ -76,4 +77,61 @@ class AccountResponse(AccountBase):
     created_at: datetime
     updated_at: datetime
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+
+class InterestAccrualEntry(BaseModel):
+    """Interest one account would receive (dry runs only)"""
+    account_uid: str
+    period: str
+    interest: float
+
+
+class InterestAccrualResponse(BaseModel):
+    """Outcome of a batch interest accrual"""
+    as_of: datetime
+    dry_run: bool
+    accounts: int
+    posted: int
+    already_posted: int
+    failed: int
+    total_interest: float
+    entries: Optional[List[InterestAccrualEntry]] = None
+
+
+class BalancePoint(BaseModel):
+    """Closing balance of an account at the end of a UTC day"""
+    day: datetime
+    closing: float
+
+
+class BalanceAt(BaseModel):
+    """Balance of an account at one moment"""
+    account_uid: str
+    at: datetime
+    balance: float
+
+
+class LedgerEntry(TransactionResponse):
+    """A transaction on an account's ledger with the account balance right after it"""
+    balance_change: float
+    balance: float
+
+
+class LedgerPage(BaseModel):
+    """One page of an account's ledger; next_cursor is None on the last page"""
+    entries: List[LedgerEntry]
+    next_cursor: Optional[str] = None
+
+
+class AccountTypeTotal(BaseModel):
+    """Balance and number of accounts of one type"""
+    balance: float
+    count: int
+
+
+class AccountSummaryResponse(BaseModel):
+    """Totals over all accounts"""
+    total_balance: float
+    account_count: int
+    by_type: Dict[str, AccountTypeTotal]
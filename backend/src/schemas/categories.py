@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, model_validator, ConfigDict
-from typing import Optional, Literal, List
+from typing import Optional, Literal, List, Dict
 from datetime import datetime
 from uuid import uuid4
 
@@ -59,14 +59,53 @@ class CategoryUpdate(BaseModel):
             raise ValueError("Category cannot be its own parent")
         return values
 
+# -------------------------
+# Bulk Import Schemas
+# -------------------------
+class CategoryBulkNode(CategoryCreate):
+    """A category in a bulk import; children may be nested or reference it by parent_uid"""
+    children: List["CategoryBulkNode"] = Field(default_factory=list)
+
+class CategoryBulkCreate(BaseModel):
+    """Schema for importing a category tree (nested, flat with parent_uid, or both)"""
+    categories: List[CategoryBulkNode] = Field(..., min_length=1)
+
+class CategoryBulkResponse(BaseModel):
+    """Outcome of a bulk import"""
+    inserted: int
+    uids: List[str] = Field(default_factory=list)
+
+# -------------------------
+# Move Schema
+# -------------------------
+class CategoryMove(BaseModel):
+    """Schema for moving a category (and its subtree) under a new parent"""
+    parent_uid: Optional[str] = Field(None, description="New parent UID, or null to make it a root category")
+
+# -------------------------
+# Merge Schema
+# -------------------------
+class CategoryMerge(BaseModel):
+    """Schema for merging categories into one"""
+    source_uids: List[str] = Field(..., min_length=1, description="Categories to fold into the target")
+    target_uid: str = Field(..., description="Category that receives transactions, children and totals")
+
 # -------------------------
 # Response Schema
 # -------------------------
 class CategoryResponse(CategoryBase):
     """Schema for category response with optional nested children"""
+    ancestors: List[str] = Field(default_factory=list, description="UIDs from the root down to the parent")
+    depth: int = Field(0, description="Number of ancestors; 0 for a root category")
+    subtree_total_spent: float = Field(0, description="total_spent of this category and all descendants")
+    subtree_total_earned: float = Field(0, description="total_earned of this category and all descendants")
+    subtree_budget_used: float = Field(0, description="budget_used of this category and all descendants")
+    children_budget_sum: float = Field(0, description="Sum of the budgets of direct children")
+    budget_periods: Dict[str, float] = Field(default_factory=dict, description="Budget used per period key")
     children: Optional[List["CategoryResponse"]] = Field(default_factory=list)
 
     model_config = ConfigDict(from_attributes=True)
 
 # Needed for forward references in Pydantic
 CategoryResponse.model_rebuild()
+CategoryBulkNode.model_rebuild()
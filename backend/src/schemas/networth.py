@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class NetWorthPoint(BaseModel):
+    """Sum of all account balances at the end of a UTC day"""
+    day: datetime
+    net_worth: float
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+from typing import Literal
+
+
+class NameMatch(BaseModel):
+    """One typeahead result"""
+    kind: Literal["account", "category"]
+    uid: str
+    name: str
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+
+class SummaryPeriod(BaseModel):
+    """Totals for one period (optionally one category/account within it)"""
+    period: datetime
+    account_uid: Optional[str] = None
+    category_uid: Optional[str] = None
+    income: float = 0
+    expense: float = 0
+    reimburse: float = 0
+    transfer_in: float = 0
+    transfer_out: float = 0
+    net: float = 0
+    count: int = 0
+
+    model_config = ConfigDict(from_attributes=True)
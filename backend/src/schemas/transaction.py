@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict
-from typing import Optional, Literal
+from typing import Optional, Literal, List, Dict, Any
 from datetime import datetime
 from uuid import uuid4
 
@@ -105,3 +105,28 @@ class TransactionResponse(TransactionBase):
     reimbursed_transaction: Optional[dict] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionPage(BaseModel):
+    """One page of transactions; next_cursor is None on the last page"""
+    transactions: List[TransactionResponse]
+    next_cursor: Optional[str] = None
+
+
+class TransactionBulkCreate(BaseModel):
+    """Schema for bulk-importing transactions; items are validated individually"""
+    transactions: List[Dict[str, Any]] = Field(..., min_length=1, max_length=10000)
+
+
+class TransactionBulkError(BaseModel):
+    """Error for a single item of a bulk import"""
+    index: int
+    uid: Optional[str] = None
+    error: str
+
+
+class TransactionBulkResponse(BaseModel):
+    """Outcome of a bulk import"""
+    inserted: int
+    uids: List[str] = Field(default_factory=list)
+    errors: List[TransactionBulkError] = Field(default_factory=list)
@@ -7,12 +7,22 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 
-from src.database import connect_to_mongo, close_mongo_connection
+from src.database import connect_to_mongo, close_mongo_connection, get_db
 from src.db_indexes import create_indexes
 from src.routes.transactionsRoute import router as transaction_router
 from src.routes.accountsRoute import router as account_router
 from src.routes.categoriesRoute import router as category_router
+from src.routes.summaryRoute import router as summary_router
+from src.routes.jobsRoute import router as jobs_router
+from src.routes.searchRoute import router as search_router
+from src.routes.networthRoute import router as networth_router
+from src.models.rollups import RollupModel
+from src.models.categories import CategoryModel
+from src.models.snapshots import SnapshotModel
+from src.models.account_summary import AccountSummaryModel
 from src.config.exceptions import DatabaseConnectionError, DatabaseInitializationError
+from src.cache import cache_stats
+from src.background import rename_fanout, job_runner
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -30,6 +40,13 @@ async def lifespan(app: FastAPI):
             # Startup: Connect to MongoDB and initialize indexes
             await connect_to_mongo()
             await create_indexes()
+            await RollupModel(await get_db()).ensure_backfilled()
+            await SnapshotModel(await get_db()).ensure_backfilled()
+            # Recomputed on every start so the incrementally kept totals can't drift for long
+            await AccountSummaryModel(await get_db()).rebuild()
+            fixed = await CategoryModel(await get_db()).backfill_hierarchy()
+            if fixed:
+                print(f"✅ Backfilled hierarchy fields on {fixed} categories")
             print("🚀 Server startup complete")
         except (DatabaseConnectionError, DatabaseInitializationError) as e:
             print(f"❌ Failed to initialize server: {str(e)}")
@@ -41,6 +58,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown: Close MongoDB connection (only in production mode)
     if not is_test_mode:
+        await job_runner.drain()
+        try:
+            await rename_fanout.flush()
+        except Exception as e:
+            print(f"⚠️  Pending renames were not written: {e}")
         await close_mongo_connection()
         print("👋 Server shutdown complete")
 
@@ -63,6 +85,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Exception handlers
@@ -84,9 +107,18 @@ async def database_initialization_exception_handler(request, exc):
 app.include_router(transaction_router, prefix='/api')
 app.include_router(account_router, prefix='/api')
 app.include_router(category_router, prefix='/api')
+app.include_router(summary_router, prefix='/api')
+app.include_router(jobs_router, prefix='/api')
+app.include_router(search_router, prefix='/api')
+app.include_router(networth_router, prefix='/api')
 
 # Health check endpoint
 @app.get("/health", tags=["Health"])
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/health/caches", tags=["Health"])
+async def cache_health():
+    """Size and hit/miss counters of the in-process caches"""
+    return cache_stats()
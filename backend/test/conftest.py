@@ -11,6 +11,8 @@ from httpx import AsyncClient, ASGITransport
 # Import your app and the get_db dependency
 from src.server import app
 from src.database import get_db
+from src.cache import clear_caches
+from src.background import rename_fanout, job_runner
 
 load_dotenv()
 
@@ -74,6 +76,10 @@ async def test_db():
     except Exception as e:
         print(f"⚠️  Warning: Could not clean collections: {e}")
 
+    # In-process caches and queued renames must not leak between tests
+    clear_caches()
+    rename_fanout.reset()
+
     # Yield database to the test
     yield db
 
@@ -112,6 +118,10 @@ async def async_client(test_db):
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test/api") as client:
         yield client
+
+    # Finish background work against this test's database
+    await job_runner.drain()
+    await rename_fanout.flush()
     
     # Clean up: Clear dependency overrides
     app.dependency_overrides.clear()
\ No newline at end of file
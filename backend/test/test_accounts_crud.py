@@ -206,3 +206,193 @@ async def test_all_account_types(async_client, test_db):
     
     for uid in created_uids:
         assert uid in retrieved_uids, f"Account UID {uid} not found in retrieved accounts"
+
+
+@pytest.mark.asyncio
+async def test_account_rename_refreshes_cached_names(async_client, test_db):
+    """Transaction writes resolve names from the shared cache, which follows account renames."""
+    from src.models.accounts import AccountModel
+    from src.background import rename_fanout
+
+    payload = random_account()
+    created = (await async_client.post("/accounts/", json=payload)).json()
+
+    hits_before = AccountModel.name_cache.hits
+    tx = await async_client.post("/transactions/", json={
+        "type": "income", "amount": 10, "account_uid": created["uid"], "category_uid": "cat-any",
+    })
+    assert tx.json()["account_name"] == payload["name"]
+    assert AccountModel.name_cache.hits > hits_before
+
+    await async_client.patch(f"/accounts/{created['uid']}", json={"name": "Renamed"})
+    assert AccountModel.name_cache.get(created["uid"]) is None
+
+    tx2 = await async_client.post("/transactions/", json={
+        "type": "income", "amount": 10, "account_uid": created["uid"], "category_uid": "cat-any",
+    })
+    assert tx2.json()["account_name"] == "Renamed"
+
+    await rename_fanout.flush()
+    res = await async_client.get(f"/transactions/{tx.json()['uid']}")
+    assert res.json()["account_name"] == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_batch_interest_accrual(async_client, test_db):
+    """Dry runs preview interest; real runs post it once per period per account."""
+    monthly = (await async_client.post("/accounts/", json={
+        "name": "Savings", "type": "savings", "balance": 1200, "interest_rate": 5,
+    })).json()
+    yearly = (await async_client.post("/accounts/", json={
+        "name": "Bond", "type": "investment", "balance": 1000, "interest_rate": 3, "interest_frequency": "annually",
+    })).json()
+    await async_client.post("/accounts/", json={"name": "Wallet", "type": "cash", "balance": 50})
+
+    res = await async_client.post("/accounts/interest/accrue", params={"as_of": "2026-10-17T00:00:00"})
+    assert res.status_code == 422
+
+    params = {"as_of": "2026-10-17T00:00:00", "category_uid": "cat-interest"}
+    preview = (await async_client.post("/accounts/interest/accrue", params={**params, "dry_run": True})).json()
+    assert preview["accounts"] == 2
+    assert preview["total_interest"] == 35
+    assert {e["account_uid"]: e["interest"] for e in preview["entries"]} == {monthly["uid"]: 5, yearly["uid"]: 30}
+    assert await test_db.transactions.count_documents({}) == 0
+
+    result = (await async_client.post("/accounts/interest/accrue", params=params)).json()
+    assert result["posted"] == 2
+    assert (await test_db.accounts.find_one({"uid": monthly["uid"]}))["balance"] == 1205
+
+    tx = await test_db.transactions.find_one({"account_uid": monthly["uid"]})
+    assert tx["type"] == "income"
+    assert tx["category_uid"] == "cat-interest"
+
+    again = (await async_client.post("/accounts/interest/accrue", params=params)).json()
+    assert again["posted"] == 0
+    assert again["already_posted"] == 2
+
+    # Dry runs leave out periods that were already posted
+    preview = (await async_client.post("/accounts/interest/accrue", params={**params, "dry_run": True})).json()
+    assert preview["entries"] == []
+    assert preview["already_posted"] == 2
+    assert preview["total_interest"] == 0
+
+
+@pytest.mark.asyncio
+async def test_balance_history_and_net_worth(async_client, test_db):
+    """Snapshots follow transactions, including back-dated ones, and answer history and net worth."""
+    checking = (await async_client.post("/accounts/", json={"name": "Checking", "type": "checking", "balance": 100})).json()
+    savings = (await async_client.post("/accounts/", json={"name": "Savings", "type": "savings", "balance": 0})).json()
+
+    async def post(tx):
+        response = await async_client.post("/transactions/", json={"amount": 0, **tx})
+        assert response.status_code == 201, response.text
+        return response.json()
+
+    await post({"type": "income", "amount": 50, "account_uid": checking["uid"], "category_uid": "cat-pay", "date": "2026-03-05T10:00:00"})
+    await post({"type": "transfer", "amount": 30, "from_account_uid": checking["uid"],
+                "to_account_uid": savings["uid"], "date": "2026-03-07T09:00:00"})
+    # Back-dated: lands before every existing row and shifts all of them
+    await post({"type": "expense", "amount": 20, "account_uid": checking["uid"], "category_uid": "cat-food", "date": "2026-03-01T12:00:00"})
+
+    history = (await async_client.get(f"/accounts/{checking['uid']}/history",
+                                       params={"from": "2026-03-01", "to": "2026-03-31"})).json()
+    assert [(p["day"][:10], p["closing"]) for p in history] == [
+        ("2026-03-01", 80), ("2026-03-05", 130), ("2026-03-07", 100),
+    ]
+
+    # Carried into the range from the row before it
+    later = (await async_client.get(f"/accounts/{checking['uid']}/history",
+                                     params={"from": "2026-03-06", "to": "2026-03-31"})).json()
+    assert [(p["day"][:10], p["closing"]) for p in later] == [("2026-03-06", 130), ("2026-03-07", 100)]
+
+    at = (await async_client.get(f"/accounts/{checking['uid']}/balance", params={"at": "2026-03-05T09:00:00"})).json()
+    assert at["balance"] == 80
+    at = (await async_client.get(f"/accounts/{checking['uid']}/balance", params={"at": "2026-03-05T11:00:00"})).json()
+    assert at["balance"] == 130
+
+    worth = (await async_client.get("/networth/", params={"from": "2026-03-01", "to": "2026-03-31"})).json()
+    assert [(p["day"][:10], p["net_worth"]) for p in worth] == [
+        ("2026-03-01", 80), ("2026-03-05", 130), ("2026-03-07", 130),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_bulk_backdated_import_matches_snapshot_rebuild(async_client, test_db):
+    """A bulk import spread over many days, interleaved with existing rows, leaves the same rows as a rebuild."""
+    from src.models.snapshots import SnapshotModel
+
+    acct = (await async_client.post("/accounts/", json={"name": "Import", "type": "checking", "balance": 500})).json()
+    for day in (3, 9):
+        res = await async_client.post("/transactions/", json={
+            "type": "income", "amount": 100, "account_uid": acct["uid"], "category_uid": "cat-pay",
+            "date": f"2026-02-{day:02d}T08:00:00",
+        })
+        assert res.status_code == 201
+    res = await async_client.post("/transactions/bulk", json={"transactions": [
+        {"type": "expense", "amount": day, "account_uid": acct["uid"], "category_uid": "cat-food",
+         "date": f"2026-02-{day:02d}T12:00:00"}
+        for day in range(1, 15)
+    ]})
+    assert res.json()["inserted"] == 14
+
+    def rows(docs):
+        return sorted((d["day"], round(d["closing"], 2), round(d["delta"], 2)) for d in docs)
+
+    incremental = rows(await test_db.balance_snapshots.find({"account_uid": acct["uid"]}).to_list(None))
+    await SnapshotModel(test_db).rebuild()
+    rebuilt = rows(await test_db.balance_snapshots.find({"account_uid": acct["uid"]}).to_list(None))
+    # The opening row written at account creation carries no delta and is not rebuilt
+    assert [r for r in incremental if r[2]] == rebuilt
+
+
+@pytest.mark.asyncio
+async def test_account_ledger_running_balance(async_client, test_db):
+    """Ledger pages carry the running balance across pages via the cursor checkpoint."""
+    wallet = (await async_client.post("/accounts/", json={"name": "Wallet", "type": "cash", "balance": 100})).json()
+    bank = (await async_client.post("/accounts/", json={"name": "Bank", "type": "checking", "balance": 0})).json()
+    for tx in [
+        {"type": "income", "amount": 50, "account_uid": wallet["uid"], "category_uid": "cat-pay", "date": "2026-01-01T00:00:00"},
+        {"type": "expense", "amount": 20, "account_uid": wallet["uid"], "category_uid": "cat-food", "date": "2026-01-02T00:00:00"},
+        {"type": "transfer", "amount": 30, "transfer_fee": 1, "from_account_uid": wallet["uid"],
+         "to_account_uid": bank["uid"], "date": "2026-01-03T00:00:00"},
+    ]:
+        assert (await async_client.post("/transactions/", json=tx)).status_code == 201
+
+    first = await async_client.get(f"/accounts/{wallet['uid']}/ledger", params={"limit": 2})
+    assert first.status_code == 200
+    page = first.json()
+    assert [(e["balance_change"], e["balance"]) for e in page["entries"]] == [(-31, 99), (-20, 130)]
+    assert page["next_cursor"] == first.headers["X-Next-Cursor"]
+
+    second = await async_client.get(
+        f"/accounts/{wallet['uid']}/ledger", params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    page = second.json()
+    assert [(e["balance_change"], e["balance"]) for e in page["entries"]] == [(50, 150)]
+    assert page["next_cursor"] is None
+    assert "X-Next-Cursor" not in second.headers
+
+    bad = await async_client.get(f"/accounts/{wallet['uid']}/ledger", params={"cursor": "nope"})
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_accounts_summary_follows_writes(async_client, test_db):
+    """The summary document tracks account creates, edits, deletes and transaction balance changes."""
+    cash = (await async_client.post("/accounts/", json={"name": "Cash", "type": "cash", "balance": 100})).json()
+    bank = (await async_client.post("/accounts/", json={"name": "Bank", "type": "checking", "balance": 400})).json()
+    await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 25, "account_uid": cash["uid"], "category_uid": "cat-food",
+    })
+    await async_client.patch(f"/accounts/{bank['uid']}", json={"type": "savings", "balance": 500})
+
+    summary = (await async_client.get("/accounts/summary")).json()
+    assert summary["total_balance"] == 575
+    assert summary["account_count"] == 2
+    assert summary["by_type"] == {"cash": {"balance": 75, "count": 1}, "savings": {"balance": 500, "count": 1}}
+
+    await async_client.delete(f"/accounts/{cash['uid']}")
+    summary = (await async_client.get("/accounts/summary")).json()
+    assert summary["total_balance"] == 500
+    assert summary["account_count"] == 1
+    assert list(summary["by_type"]) == ["savings"]
@@ -26,6 +26,19 @@ def random_category(parent_uid=None) -> dict:
         "is_active": True
     }
 
+async def post_category(async_client, name, budget, parent_uid=None):
+    """POST an expense category with a budget and return the raw response."""
+    return await async_client.post("/categories/", json={
+        "name": name, "transaction_type": "expense", "budget": budget, "parent_uid": parent_uid,
+    })
+
+
+async def make_category(async_client, name, budget, parent_uid=None) -> dict:
+    """Create an expense category with a budget and return it."""
+    res = await post_category(async_client, name, budget, parent_uid)
+    assert res.status_code == 201, res.text
+    return res.json()
+
 # ---------- CRUD Tests ----------
 
 @pytest.mark.asyncio
@@ -288,3 +301,434 @@ async def test_category_tree_aggregation(async_client, test_db):
         assert "budget_utilization" in child
         assert "is_over_budget" in child
         assert isinstance(child["children"], list)
+
+
+@pytest.mark.asyncio
+async def test_category_tree_read_racing_a_write_is_not_kept(async_client, test_db):
+    """A tree built from documents read before a concurrent write is not served from the cache later."""
+    from src.models.categories import CategoryModel
+
+    await async_client.post("/categories/", json={"name": "Home", "transaction_type": "expense"})
+    cache = CategoryModel.tree_cache
+    assert cache.get_bytes() is None
+
+    # A cache miss reads the categories, and a write lands before the tree is loaded
+    generation = cache.generation
+    categories = await test_db.categories.find({}, {"_id": 0}).to_list(length=None)
+    await async_client.post("/categories/", json={"name": "Travel", "transaction_type": "expense"})
+    cache.load(categories, generation)
+
+    tree = (await async_client.get("/categories/tree")).json()
+    assert sorted(node["name"] for node in tree) == ["Home", "Travel"]
+
+
+@pytest.mark.asyncio
+async def test_category_tree_cache_patched_by_transactions(async_client, test_db):
+    """Transaction effects patch the cached tree; category writes rebuild it."""
+    from src.models.categories import CategoryModel
+
+    parent = (await async_client.post("/categories/", json={
+        "name": "Home", "transaction_type": "expense", "budget": 1000,
+    })).json()
+    child = (await async_client.post("/categories/", json={
+        "name": "Rent", "transaction_type": "expense", "budget": 800, "parent_uid": parent["uid"],
+    })).json()
+
+    tree = (await async_client.get("/categories/tree")).json()
+    assert tree[0]["total_spent"] == 0
+
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 900, "account_uid": "acct-any", "category_uid": child["uid"],
+    })
+    assert res.status_code == 201
+
+    hits_before = CategoryModel.tree_cache.hits
+    tree = (await async_client.get("/categories/tree")).json()
+    assert CategoryModel.tree_cache.hits == hits_before + 1
+    root = tree[0]
+    assert root["total_spent"] == 900
+    assert root["children"][0]["budget_used"] == 900
+    assert root["children"][0]["is_over_budget"] is True
+
+    await async_client.patch(f"/categories/{child['uid']}", json={"name": "Mortgage"})
+    tree = (await async_client.get("/categories/tree")).json()
+    assert tree[0]["children"][0]["name"] == "Mortgage"
+    assert tree[0]["children"][0]["total_spent"] == 900
+
+
+@pytest.mark.asyncio
+async def test_category_ancestor_paths(async_client, test_db):
+    """Subtree, depth-limited and breadcrumb reads use the stored ancestors, which follow re-parenting."""
+    home = await make_category(async_client, "Home", 1000)
+    bills = await make_category(async_client, "Bills", 500, home["uid"])
+    power = await make_category(async_client, "Power", 100, bills["uid"])
+    other = await make_category(async_client, "Other", 1000)
+    assert power["ancestors"] == [home["uid"], bills["uid"]]
+    assert power["depth"] == 2
+
+    data = (await async_client.get(f"/categories/{home['uid']}")).json()
+    assert data["children"][0]["uid"] == bills["uid"]
+    assert data["children"][0]["children"][0]["uid"] == power["uid"]
+
+    data = (await async_client.get(f"/categories/{home['uid']}", params={"max_depth": 1})).json()
+    assert data["children"][0]["children"] == []
+
+    crumbs = (await async_client.get(f"/categories/{power['uid']}/breadcrumb")).json()
+    assert [c["uid"] for c in crumbs] == [home["uid"], bills["uid"], power["uid"]]
+
+    res = await async_client.patch(f"/categories/{bills['uid']}", json={"parent_uid": other["uid"]})
+    assert res.status_code == 200
+    moved = await test_db.categories.find_one({"uid": power["uid"]})
+    assert moved["ancestors"] == [other["uid"], bills["uid"]]
+
+    res = await async_client.patch(f"/categories/{other['uid']}", json={"parent_uid": power["uid"]})
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_category_hierarchy_backfilled(test_db):
+    """Categories stored without ancestors get their paths and subtree totals computed in one pass."""
+    from src.models.categories import CategoryModel
+
+    await test_db.categories.insert_many([
+        {"uid": "a", "name": "A", "parent_uid": None, "total_spent": 1},
+        {"uid": "b", "name": "B", "parent_uid": "a", "total_spent": 10},
+        {"uid": "c", "name": "C", "parent_uid": "b", "total_spent": 100},
+    ])
+    assert await CategoryModel(test_db).backfill_hierarchy() == 3
+    c = await test_db.categories.find_one({"uid": "c"})
+    assert c["ancestors"] == ["a", "b"] and c["depth"] == 2
+    a = await test_db.categories.find_one({"uid": "a"})
+    assert a["subtree_total_spent"] == 111
+    assert await CategoryModel(test_db).backfill_hierarchy() == 0
+
+
+@pytest.mark.asyncio
+async def test_subtree_totals_maintained_on_write(async_client, test_db):
+    """Transaction effects reach subtree_* on the category and every ancestor; moves shift them."""
+    home = await make_category(async_client, "Home", 1000)
+    bills = await make_category(async_client, "Bills", 500, home["uid"])
+    power = await make_category(async_client, "Power", 100, bills["uid"])
+    other = await make_category(async_client, "Other", 1000)
+
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 40, "account_uid": "acct-any", "category_uid": power["uid"],
+    })
+    tx = res.json()
+    await async_client.patch(f"/transactions/{tx['uid']}", json={"amount": 60})
+
+    for uid in (home["uid"], bills["uid"], power["uid"]):
+        data = (await async_client.get(f"/categories/{uid}")).json()
+        assert data["subtree_total_spent"] == 60
+        assert data["subtree_budget_used"] == 60
+
+    await async_client.patch(f"/categories/{bills['uid']}", json={"parent_uid": other["uid"]})
+    assert (await test_db.categories.find_one({"uid": home["uid"]}))["subtree_total_spent"] == 0
+    assert (await test_db.categories.find_one({"uid": other["uid"]}))["subtree_total_spent"] == 60
+
+
+@pytest.mark.asyncio
+async def test_children_budget_sum_guards_parent_budget(async_client, test_db):
+    """Child budgets are reserved on the parent's children_budget_sum and can't exceed its budget."""
+    parent = await make_category(async_client, "Home", 1000)
+    rent = await make_category(async_client, "Rent", 700, parent["uid"])
+    assert (await post_category(async_client, "Power", 400, parent["uid"])).status_code == 400
+    assert (await post_category(async_client, "Power", 300, parent["uid"])).status_code == 201
+
+    res = await async_client.patch(f"/categories/{rent['uid']}", json={"budget": 800})
+    assert res.status_code == 400
+    res = await async_client.patch(f"/categories/{parent['uid']}", json={"budget": 900})
+    assert res.status_code == 400
+
+    res = await async_client.patch(f"/categories/{rent['uid']}", json={"budget": 500})
+    assert res.status_code == 200
+    assert (await test_db.categories.find_one({"uid": parent["uid"]}))["children_budget_sum"] == 800
+
+    await async_client.delete(f"/categories/{rent['uid']}")
+    assert (await test_db.categories.find_one({"uid": parent["uid"]}))["children_budget_sum"] == 300
+
+
+@pytest.mark.asyncio
+async def test_budget_used_current_period(async_client, test_db):
+    """Budget usage is bucketed by the category's frequency; only the current bucket counts."""
+    from datetime import datetime, timezone
+
+    cat = (await async_client.post("/categories/", json={
+        "name": "Groceries", "transaction_type": "expense", "budget": 500, "frequency": "monthly",
+    })).json()
+    now = datetime.now(timezone.utc)
+    for amount, date in ((120, now), (80, now.replace(year=now.year - 1))):
+        res = await async_client.post("/transactions/", json={
+            "type": "expense", "amount": amount, "account_uid": "acct-any",
+            "category_uid": cat["uid"], "date": date.isoformat(),
+        })
+        assert res.status_code == 201
+
+    node = (await async_client.get("/categories/tree")).json()[0]
+    assert node["budget_used"] == 200
+    assert node["budget_used_current_period"] == 120
+    assert node["budget_periods"][f"{now.year:04d}-{now.month:02d}"] == 120
+
+
+@pytest.mark.asyncio
+async def test_budget_periods_use_reporting_timezone(async_client, test_db, monkeypatch):
+    """Budget buckets follow the reporting-timezone calendar, like the summary rollups."""
+    from src.config.settings import get_database_settings
+
+    monkeypatch.setattr(get_database_settings(), "REPORTING_TIMEZONE", "Asia/Manila")
+    cat = (await async_client.post("/categories/", json={
+        "name": "Groceries", "transaction_type": "expense", "budget": 500, "frequency": "monthly",
+    })).json()
+    # 20:00 UTC on Sunday 31 Aug is 04:00 on Monday 1 Sep in Manila (UTC+8)
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 25, "account_uid": "acct-any", "category_uid": cat["uid"],
+        "date": "2025-08-31T20:00:00",
+    })
+    assert res.status_code == 201
+
+    stored = await test_db.categories.find_one({"uid": cat["uid"]})
+    assert stored["budget_periods"] == {"2025-09": 25, "2025-W36": 25, "2025": 25}
+    rollup = await test_db.rollups.find_one({"category_uid": cat["uid"]})
+    assert rollup["period"].month == 9
+
+
+@pytest.mark.asyncio
+async def test_budget_used_current_period_covers_subtree(async_client, test_db):
+    """A parent's current-period usage includes its children's, even when their frequencies differ."""
+    from datetime import datetime, timezone
+
+    parent = (await async_client.post("/categories/", json={
+        "name": "Household", "transaction_type": "expense", "budget": 6000, "frequency": "yearly",
+    })).json()
+    child = (await async_client.post("/categories/", json={
+        "name": "Groceries", "transaction_type": "expense", "budget": 500, "frequency": "monthly",
+        "parent_uid": parent["uid"],
+    })).json()
+    now = datetime.now(timezone.utc)
+
+    async def spend(category, amount, date=now):
+        res = await async_client.post("/transactions/", json={
+            "type": "expense", "amount": amount, "account_uid": "acct-any",
+            "category_uid": category["uid"], "date": date.isoformat(),
+        })
+        assert res.status_code == 201
+
+    await spend(child, 120)
+    await spend(child, 80, now.replace(year=now.year - 1))
+    await spend(parent, 30)
+
+    node = (await async_client.get("/categories/tree")).json()[0]
+    assert node["budget_used"] == 230
+    assert node["budget_used_current_period"] == 150
+    assert node["children"][0]["budget_used_current_period"] == 120
+
+    # The cached tree is patched in place and re-aggregated on the next read
+    await spend(child, 10)
+    node = (await async_client.get("/categories/tree")).json()[0]
+    assert node["budget_used_current_period"] == 160
+    assert node["subtree_total_spent"] == node["total_spent"] == 240
+    assert node["subtree_budget_used"] == node["budget_used"] == 240
+    assert node["children"][0]["budget_used_current_period"] == 130
+
+
+@pytest.mark.asyncio
+async def test_delete_with_reassign_and_merge(async_client, test_db):
+    """Deleting/merging moves transactions, children, totals and child budgets to the target."""
+    food = await make_category(async_client, "Food", 1000)
+    dining = await make_category(async_client, "Dining", 400, food["uid"])
+    cafes = await make_category(async_client, "Cafes", 100, dining["uid"])
+    groceries = await make_category(async_client, "Groceries", 500, food["uid"])
+    for uid in (dining["uid"], cafes["uid"]):
+        await async_client.post("/transactions/", json={
+            "type": "expense", "amount": 30, "account_uid": "acct-any", "category_uid": uid,
+        })
+
+    res = await async_client.delete(f"/categories/{dining['uid']}", params={"reassign_to": groceries["uid"]})
+    assert res.status_code == 200
+    assert res.json()["transactions_moved"] == 1
+
+    moved = await test_db.transactions.find_one({"category_uid": groceries["uid"]})
+    assert moved["category_name"] == "Groceries"
+    target = await test_db.categories.find_one({"uid": groceries["uid"]})
+    assert target["total_spent"] == 30
+    assert target["subtree_total_spent"] == 60
+    assert target["children_budget_sum"] == 100
+    child = await test_db.categories.find_one({"uid": cafes["uid"]})
+    assert child["parent_uid"] == groceries["uid"]
+    assert child["ancestors"] == [food["uid"], groceries["uid"]]
+    root = await test_db.categories.find_one({"uid": food["uid"]})
+    assert root["subtree_total_spent"] == 60
+    assert root["children_budget_sum"] == 500
+
+    res = await async_client.post("/categories/merge", json={
+        "source_uids": [groceries["uid"]], "target_uid": cafes["uid"],
+    })
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_multi_source_merge_budget_overflow_changes_nothing(async_client, test_db):
+    """If the target can't hold every source's child budgets, no source is folded."""
+    home = await make_category(async_client, "Home", 1000)
+    await make_category(async_client, "Rent", 600, home["uid"])
+    garden = await make_category(async_client, "Garden", 300)
+    plants = await make_category(async_client, "Plants", 300, garden["uid"])
+    tools = await make_category(async_client, "Tools", 300)
+    await make_category(async_client, "Hardware", 300, tools["uid"])
+    await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 20, "account_uid": "acct-any", "category_uid": garden["uid"],
+    })
+
+    # Either source fits on its own (600 + 300), both together don't (600 + 600)
+    res = await async_client.post("/categories/merge", json={
+        "source_uids": [garden["uid"], tools["uid"]], "target_uid": home["uid"],
+    })
+    assert res.status_code == 400
+    assert await test_db.categories.count_documents({"uid": {"$in": [garden["uid"], tools["uid"]]}}) == 2
+    assert (await test_db.categories.find_one({"uid": plants["uid"]}))["parent_uid"] == garden["uid"]
+    assert (await test_db.categories.find_one({"uid": home["uid"]}))["children_budget_sum"] == 600
+    assert await test_db.transactions.count_documents({"category_uid": garden["uid"]}) == 1
+
+    # A source that already sits under the target frees its own reservation
+    rent = await test_db.categories.find_one({"name": "Rent"})
+    res = await async_client.post("/categories/merge", json={
+        "source_uids": [rent["uid"], garden["uid"]], "target_uid": home["uid"],
+    })
+    assert res.status_code == 200, res.text
+    assert (await test_db.categories.find_one({"uid": home["uid"]}))["children_budget_sum"] == 300
+    assert (await test_db.categories.find_one({"uid": plants["uid"]}))["parent_uid"] == home["uid"]
+
+
+@pytest.mark.asyncio
+async def test_large_merge_runs_as_job(async_client, test_db, monkeypatch):
+    """Merges above the threshold return 202 and finish as a tracked job."""
+    from src.background import job_runner
+    from src.models.categories import CategoryModel
+
+    monkeypatch.setattr(CategoryModel, "BACKGROUND_THRESHOLD", 0)
+    a = (await async_client.post("/categories/", json={"name": "A", "transaction_type": "expense"})).json()
+    b = (await async_client.post("/categories/", json={"name": "B", "transaction_type": "expense"})).json()
+    await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 5, "account_uid": "acct-any", "category_uid": a["uid"],
+    })
+
+    res = await async_client.post("/categories/merge", json={"source_uids": [a["uid"]], "target_uid": b["uid"]})
+    assert res.status_code == 202
+    await job_runner.drain()
+    job = (await async_client.get(f"/jobs/{res.json()['job_uid']}")).json()
+    assert job["status"] == "done"
+    assert job["result"]["transactions_moved"] == 1
+
+
+@pytest.mark.asyncio
+async def test_move_category_subtree(async_client, test_db):
+    """Moving a branch rebalances only the ancestors that differ and rejects cycles."""
+    root = await make_category(async_client, "Root", 1000)
+    left = await make_category(async_client, "Left", 400, root["uid"])
+    right = await make_category(async_client, "Right", 400, root["uid"])
+    branch = await make_category(async_client, "Branch", 100, left["uid"])
+    leaf = await make_category(async_client, "Leaf", 50, branch["uid"])
+    await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 25, "account_uid": "acct-any", "category_uid": leaf["uid"],
+    })
+
+    res = await async_client.post(f"/categories/{branch['uid']}/move", json={"parent_uid": right["uid"]})
+    assert res.status_code == 200
+    assert res.json()["ancestors"] == [root["uid"], right["uid"]]
+
+    docs = {d["uid"]: d async for d in test_db.categories.find({})}
+    assert docs[leaf["uid"]]["ancestors"] == [root["uid"], right["uid"], branch["uid"]]
+    assert docs[leaf["uid"]]["depth"] == 3
+    assert docs[root["uid"]]["subtree_total_spent"] == 25
+    assert docs[left["uid"]]["subtree_total_spent"] == 0
+    assert docs[right["uid"]]["subtree_total_spent"] == 25
+    assert docs[left["uid"]]["children_budget_sum"] == 0
+    assert docs[right["uid"]]["children_budget_sum"] == 100
+
+    res = await async_client.post(f"/categories/{right['uid']}/move", json={"parent_uid": leaf["uid"]})
+    assert res.status_code == 400
+    res = await async_client.post(f"/categories/{branch['uid']}/move", json={"parent_uid": None})
+    assert res.json()["depth"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_category_tree(async_client, test_db):
+    """Nested and flat nodes import together with computed paths and child budget sums."""
+    payload = {"categories": [
+        {"uid": "home", "name": "Home", "transaction_type": "expense", "budget": 1000, "children": [
+            {"uid": "rent", "name": "Rent", "transaction_type": "expense", "budget": 700},
+        ]},
+        {"uid": "power", "name": "Power", "transaction_type": "expense", "budget": 100, "parent_uid": "rent"},
+    ]}
+    res = await async_client.post("/categories/bulk", json=payload)
+    assert res.status_code == 201
+    assert res.json()["inserted"] == 3
+
+    power = await test_db.categories.find_one({"uid": "power"})
+    assert power["ancestors"] == ["home", "rent"]
+    assert (await test_db.categories.find_one({"uid": "home"}))["children_budget_sum"] == 700
+
+    # Children of a stored parent are checked against its remaining budget
+    res = await async_client.post("/categories/bulk", json={"categories": [
+        {"uid": "gas", "name": "Gas", "transaction_type": "expense", "budget": 400, "parent_uid": "home"},
+    ]})
+    assert res.status_code == 400
+
+    res = await async_client.post("/categories/bulk", json={"categories": [
+        {"uid": "x", "name": "X", "transaction_type": "expense", "budget": 10, "parent_uid": "y"},
+        {"uid": "y", "name": "Y", "transaction_type": "expense", "budget": 10, "parent_uid": "x"},
+        {"uid": "home", "name": "Dup", "transaction_type": "expense"},
+    ]})
+    assert res.status_code == 400
+    reasons = {err["error"] for err in res.json()["detail"]}
+    assert "Parent references form a cycle" in reasons
+    assert "Category uid already exists" in reasons
+    assert await test_db.categories.count_documents({}) == 3
+
+
+@pytest.mark.asyncio
+async def test_category_tree_filters(async_client, test_db):
+    """The tree can be pruned by frequency, depth and root on the server."""
+    from src.models.categories import CategoryModel
+
+    await async_client.post("/categories/bulk", json={"categories": [
+        {"uid": "home", "name": "Home", "transaction_type": "expense", "budget": 1000, "frequency": "yearly",
+         "children": [
+             {"uid": "rent", "name": "Rent", "transaction_type": "expense", "budget": 700, "frequency": "monthly",
+              "children": [
+                  {"uid": "deposit", "name": "Deposit", "transaction_type": "expense", "budget": 100,
+                   "frequency": "one-time"},
+              ]},
+             {"uid": "repairs", "name": "Repairs", "transaction_type": "expense", "budget": 200,
+              "frequency": "yearly"},
+         ]},
+        {"uid": "salary", "name": "Salary", "transaction_type": "income", "frequency": "monthly"},
+    ]})
+
+    for uid, amount in (("rent", 100), ("repairs", 50)):
+        await async_client.post("/transactions/", json={
+            "type": "expense", "amount": amount, "account_uid": "acct-any", "category_uid": uid,
+        })
+
+    tree = (await async_client.get("/categories/tree", params={"frequency": "monthly"})).json()
+    assert [n["uid"] for n in tree] == ["home", "salary"]
+    assert [c["uid"] for c in tree[0]["children"]] == ["rent"]
+    assert tree[0]["children"][0]["children"] == []
+    # Pruned nodes keep their whole subtree's totals, hidden children included
+    assert tree[0]["total_spent"] == 150
+    assert tree[0]["budget_used"] == 150
+
+    # Filtered reads are served from the cached tree
+    hits = CategoryModel.tree_cache.hits
+    await async_client.get("/categories/tree", params={"frequency": "yearly"})
+    assert CategoryModel.tree_cache.hits == hits + 1
+
+    tree = (await async_client.get("/categories/tree", params={"root_uid": "rent", "max_depth": 0})).json()
+    assert [n["uid"] for n in tree] == ["rent"]
+    assert tree[0]["children"] == []
+
+    tree = (await async_client.get("/categories/tree", params={"transaction_type": "income"})).json()
+    assert [n["uid"] for n in tree] == ["salary"]
+
+    res = await async_client.get("/categories/tree", params={"root_uid": "missing"})
+    assert res.status_code == 404
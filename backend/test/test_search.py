@@ -0,0 +1,25 @@
+import pytest
+
+# ---------- Name Typeahead Tests ----------
+
+@pytest.mark.asyncio
+async def test_search_names_by_word_prefix(async_client, test_db):
+    """Names match on the prefix of any word; writes after the first load update the index."""
+    await async_client.post("/accounts/", json={"name": "Visa Credit Card", "type": "credit card", "balance": 0})
+    await async_client.post("/categories/", json={"name": "Car Insurance", "transaction_type": "expense"})
+
+    res = await async_client.get("/search/names", params={"q": "car"})
+    assert res.status_code == 200
+    assert [m["name"] for m in res.json()] == ["Car Insurance", "Visa Credit Card"]
+
+    account = (await async_client.post("/accounts/", json={
+        "name": "Cash Wallet", "type": "cash", "balance": 0,
+    })).json()
+    res = await async_client.get("/search/names", params={"q": "CA", "kind": "account"})
+    assert [m["name"] for m in res.json()] == ["Cash Wallet", "Visa Credit Card"]
+
+    await async_client.patch(f"/accounts/{account['uid']}", json={"name": "Pocket Money"})
+    res = await async_client.get("/search/names", params={"q": "cash"})
+    assert res.json() == []
+    res = await async_client.get("/search/names", params={"q": "mon"})
+    assert res.json()[0]["uid"] == account["uid"]
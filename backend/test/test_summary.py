@@ -0,0 +1,99 @@
+import pytest
+from datetime import datetime
+
+# ---------- Rollup + Summary Tests ----------
+
+async def _post(async_client, payload):
+    res = await async_client.post("/transactions/", json=payload)
+    assert res.status_code == 201, res.text
+    return res.json()
+
+
+@pytest.mark.asyncio
+async def test_rollups_maintained_on_write(async_client, test_db):
+    """Creating, updating and deleting transactions keeps daily rollups in step."""
+    tx = await _post(async_client, {
+        "type": "expense", "amount": 100, "account_uid": "acct-r", "category_uid": "cat-r",
+        "date": "2025-03-10T08:15:00",
+    })
+    await _post(async_client, {
+        "type": "expense", "amount": 50, "account_uid": "acct-r", "category_uid": "cat-r",
+        "date": "2025-03-10T21:45:00",
+    })
+
+    rollup = await test_db.rollups.find_one({"account_uid": "acct-r", "type": "expense"})
+    # Both land in one day bucket
+    assert rollup["period"] == datetime(2025, 3, 10)
+    assert rollup["amount"] == 150
+    assert rollup["count"] == 2
+
+    await async_client.patch(f"/transactions/{tx['uid']}", json={"amount": 120})
+    rollup = await test_db.rollups.find_one({"account_uid": "acct-r", "type": "expense"})
+    assert rollup["amount"] == 170
+    assert rollup["count"] == 2
+
+    await async_client.delete(f"/transactions/{tx['uid']}")
+    rollup = await test_db.rollups.find_one({"account_uid": "acct-r", "type": "expense"})
+    assert rollup["amount"] == 50
+    assert rollup["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_summary_by_month(async_client):
+    """Summary buckets rollups by month and nets income against expenses."""
+    await _post(async_client, {
+        "type": "income", "amount": 1000, "account_uid": "acct-s", "category_uid": "cat-salary",
+        "date": "2025-01-15T10:00:00",
+    })
+    await _post(async_client, {
+        "type": "expense", "amount": 300, "account_uid": "acct-s", "category_uid": "cat-food",
+        "date": "2025-01-20T10:00:00",
+    })
+    await _post(async_client, {
+        "type": "expense", "amount": 200, "account_uid": "acct-s", "category_uid": "cat-food",
+        "date": "2025-02-02T10:00:00",
+    })
+
+    res = await async_client.get("/summary/", params={"granularity": "month"})
+    assert res.status_code == 200
+    rows = res.json()
+    assert len(rows) == 2
+    january, february = rows
+    assert january["income"] == 1000
+    assert january["expense"] == 300
+    assert january["net"] == 700
+    assert february["expense"] == 200
+
+    res = await async_client.get("/summary/", params={"group_by": "category", "category_uid": "cat-food"})
+    assert res.status_code == 200
+    assert [row["expense"] for row in res.json()] == [300, 200]
+
+    res = await async_client.get("/summary/", params={"tz": "Not/AZone"})
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_rollups_use_reporting_timezone_days(async_client, test_db, monkeypatch):
+    """Rollups bucket by calendar day of REPORTING_TIMEZONE and rebuild when it changes."""
+    from src.config.settings import get_database_settings
+    from src.models.rollups import RollupModel
+
+    settings = get_database_settings()
+    monkeypatch.setattr(settings, "REPORTING_TIMEZONE", "Asia/Manila")
+    # 20:00 UTC is 04:00 the next day in Manila (UTC+8)
+    await _post(async_client, {
+        "type": "expense", "amount": 40, "account_uid": "acct-tz", "category_uid": "cat-tz",
+        "date": "2025-03-10T20:00:00",
+    })
+    rollup = await test_db.rollups.find_one({"account_uid": "acct-tz"})
+    assert rollup["period"] == datetime(2025, 3, 11)
+
+    res = await async_client.get("/summary/", params={"granularity": "day", "date_from": "2025-03-11T00:00:00+08:00"})
+    assert [(row["period"][:10], row["expense"]) for row in res.json()] == [("2025-03-11", 40)]
+    assert (await async_client.get("/summary/", params={"tz": "UTC"})).status_code == 400
+
+    # Rollups built under another layout are rebuilt at startup
+    monkeypatch.setattr(settings, "REPORTING_TIMEZONE", "UTC")
+    await RollupModel(test_db).ensure_backfilled()
+    rollup = await test_db.rollups.find_one({"account_uid": "acct-tz"})
+    assert rollup["period"] == datetime(2025, 3, 10)
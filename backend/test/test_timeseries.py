@@ -0,0 +1,114 @@
+import pytest
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+from src.config.settings import get_database_settings
+from src.migrate_timeseries import ensure_timeseries_collection, is_timeseries, migrate
+from src.models.transaction import TransactionModel, UID_REGISTRY
+from src.background import rename_fanout
+
+# ---------- Time-series storage mode (TRANSACTIONS_STORAGE=timeseries) ----------
+
+
+@pytest.fixture
+async def timeseries_db(test_db, monkeypatch):
+    """The test database with transactions stored in a time-series collection."""
+    monkeypatch.setattr(get_database_settings(), "TRANSACTIONS_STORAGE", "timeseries")
+    await test_db.drop_collection("transactions")
+    await ensure_timeseries_collection(test_db)
+    return test_db
+
+
+async def _account(async_client, name, balance=0):
+    res = await async_client.post("/accounts/", json={"name": name, "type": "checking", "balance": balance})
+    assert res.status_code == 201, res.text
+    return res.json()
+
+
+@pytest.mark.asyncio
+async def test_timeseries_crud_bulk_and_renames(async_client, timeseries_db):
+    """Create, update, delete, bulk import, renames and category merges work on time-series storage."""
+    db = timeseries_db
+    assert await is_timeseries(db)
+    acct = await _account(async_client, "Daily", 100)
+    food = (await async_client.post("/categories/", json={"name": "Food", "transaction_type": "expense"})).json()
+    misc = (await async_client.post("/categories/", json={"name": "Misc", "transaction_type": "expense"})).json()
+
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 30, "account_uid": acct["uid"], "category_uid": food["uid"],
+    })
+    assert res.status_code == 201, res.text
+    tx = res.json()
+
+    res = await async_client.patch(f"/transactions/{tx['uid']}", json={"amount": 40})
+    assert res.status_code == 200
+    assert (await db.accounts.find_one({"uid": acct["uid"]}))["balance"] == 60
+
+    # uids stay unique without a unique index
+    with pytest.raises(DuplicateKeyError):
+        await TransactionModel(db).create({**tx, "amount": 1, "date": datetime.now()})
+    res = await async_client.post("/transactions/bulk", json={"transactions": [
+        {"uid": tx["uid"], "type": "income", "amount": 5, "account_uid": acct["uid"], "category_uid": food["uid"]},
+        {"uid": "ts-new", "type": "income", "amount": 5, "account_uid": acct["uid"], "category_uid": food["uid"]},
+        {"uid": "ts-new", "type": "income", "amount": 5, "account_uid": acct["uid"], "category_uid": food["uid"]},
+    ]})
+    body = res.json()
+    assert body["inserted"] == 1
+    assert sorted(err["index"] for err in body["errors"]) == [0, 2]
+    assert await db.transactions.count_documents({"uid": "ts-new"}) == 1
+    assert (await db.accounts.find_one({"uid": acct["uid"]}))["balance"] == 65
+
+    # Rename fan-out and category folding update measurement fields
+    await async_client.patch(f"/accounts/{acct['uid']}", json={"name": "Everyday"})
+    await rename_fanout.flush()
+    assert await db.transactions.count_documents({"account_name": "Everyday"}) == 2
+    res = await async_client.delete(f"/categories/{food['uid']}", params={"reassign_to": misc["uid"]})
+    assert res.status_code == 200
+    assert await db.transactions.count_documents({"category_uid": misc["uid"]}) == 2
+
+    res = await async_client.delete(f"/transactions/{tx['uid']}")
+    assert res.status_code == 200
+    assert (await db.accounts.find_one({"uid": acct["uid"]}))["balance"] == 105
+    assert await db[UID_REGISTRY].find_one({"_id": tx["uid"]}) is None
+
+
+@pytest.mark.asyncio
+async def test_timeseries_interest_accrual(async_client, timeseries_db):
+    """Interest is posted once per period on time-series storage too."""
+    await async_client.post("/accounts/", json={
+        "name": "Savings", "type": "savings", "balance": 1200, "interest_rate": 5,
+    })
+    params = {"as_of": "2026-10-17T00:00:00", "category_uid": "cat-interest"}
+    first = (await async_client.post("/accounts/interest/accrue", params=params)).json()
+    again = (await async_client.post("/accounts/interest/accrue", params=params)).json()
+    preview = (await async_client.post("/accounts/interest/accrue", params={**params, "dry_run": True})).json()
+    assert first["posted"] == 1
+    assert again["posted"] == 0
+    assert again["already_posted"] == 1
+    assert preview["entries"] == []
+    assert await timeseries_db.transactions.count_documents({}) == 1
+
+
+@pytest.mark.asyncio
+async def test_migrate_to_timeseries(test_db):
+    """The migration renames the regular collection aside, copies it in batches and registers uids."""
+    docs = [
+        {"uid": f"mig-{i}", "type": "income", "amount": i, "account_uid": "acct-m",
+         "category_uid": "cat-m", "date": datetime(2025, 1, 1 + i)}
+        for i in range(5)
+    ]
+    await test_db.transactions.insert_many(docs)
+
+    with pytest.raises(RuntimeError):
+        await ensure_timeseries_collection(test_db)
+
+    assert await migrate(test_db, batch_size=2) == 5
+    assert await is_timeseries(test_db)
+    legacy = [n for n in await test_db.list_collection_names() if n.startswith("transactions_legacy_")]
+    assert len(legacy) == 1
+    assert await test_db[legacy[0]].count_documents({}) == 5
+    assert sorted(d["uid"] for d in await test_db.transactions.find().to_list(None)) == [d["uid"] for d in docs]
+    assert await test_db[UID_REGISTRY].count_documents({}) == 5
+
+    # A rerun resumes after the last copied document
+    assert await migrate(test_db, batch_size=2) == 0
+    assert await test_db.transactions.count_documents({}) == 5
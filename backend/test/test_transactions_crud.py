@@ -1,6 +1,7 @@
 import pytest
 import random
 import uuid
+import json
 from datetime import datetime, timedelta
 
 # ---------- Utility functions ----------
@@ -63,7 +64,7 @@ async def test_get_transactions(async_client, test_db):
     """Test retrieving all transactions."""
     response = await async_client.get("/transactions/")
     assert response.status_code == 200
-    assert response.json() == [], "Database should be empty initially"
+    assert response.json() == {"transactions": [], "next_cursor": None}, "Database should be empty initially"
 
     payloads = [random_transaction() for _ in range(3)]
     for payload in payloads:
@@ -72,7 +73,7 @@ async def test_get_transactions(async_client, test_db):
 
     response = await async_client.get("/transactions/")
     assert response.status_code == 200
-    transactions = response.json()
+    transactions = response.json()["transactions"]
     assert len(transactions) == 3
 
     for tx in transactions:
@@ -228,7 +229,7 @@ async def test_transaction_types(async_client):
 
     res = await async_client.get("/transactions/")
     assert res.status_code == 200
-    assert len(res.json()) == 4
+    assert len(res.json()["transactions"]) == 4
 
 
 # ---------- 🧩 NEW TEST: Reimbursement Details ----------
@@ -318,3 +319,342 @@ async def test_transaction_balance_updates(async_client, test_db):
     await async_client.post("/transactions/", json=income)
     acct = await test_db["accounts"].find_one({"uid": "acct-1"})
     assert acct["balance"] == 1300
+
+
+@pytest.mark.asyncio
+async def test_following_next_cursor_returns_every_transaction(async_client, test_db):
+    """Callers that need the full history get all of it by following next_cursor past the default page size."""
+    base = datetime(2025, 1, 1)
+    docs = [{**random_transaction(), "uid": f"tx-{i:03d}", "date": base + timedelta(hours=i)} for i in range(150)]
+    await test_db["transactions"].insert_many(docs)
+
+    first = (await async_client.get("/transactions/")).json()
+    assert len(first["transactions"]) == 100
+    assert first["next_cursor"]
+
+    seen = list(first["transactions"])
+    cursor = first["next_cursor"]
+    while cursor:
+        page = (await async_client.get("/transactions/", params={"cursor": cursor})).json()
+        seen.extend(page["transactions"])
+        cursor = page["next_cursor"]
+    assert sorted(tx["uid"] for tx in seen) == sorted(doc["uid"] for doc in docs)
+
+
+@pytest.mark.asyncio
+async def test_get_transactions_cursor_pagination(async_client):
+    """Pages are disjoint, ordered newest first, and the last page has no cursor."""
+    base = datetime(2025, 1, 1)
+    for i in range(5):
+        payload = random_transaction()
+        payload["date"] = (base + timedelta(days=i)).isoformat()
+        res = await async_client.post("/transactions/", json=payload)
+        assert res.status_code == 201
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = await async_client.get("/transactions/", params=params)
+        assert res.status_code == 200
+        page = res.json()
+        assert len(page["transactions"]) <= 2
+        seen.extend(page["transactions"])
+        cursor = page["next_cursor"]
+        assert res.headers.get("X-Next-Cursor") == cursor
+        if not cursor:
+            break
+
+    assert len(seen) == 5
+    assert len({tx["uid"] for tx in seen}) == 5
+    dates = [tx["date"] for tx in seen]
+    assert dates == sorted(dates, reverse=True)
+
+    res = await async_client.get("/transactions/", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_resolves_reimbursed_transactions(async_client, test_db):
+    """The listing attaches enriched details for every reimbursed expense on the page."""
+    await test_db["accounts"].insert_one({"uid": "acct-list", "name": "Cash"})
+    await test_db["categories"].insert_one({"uid": "cat-list", "name": "Travel"})
+
+    expense_uids = []
+    for i in range(3):
+        res = await async_client.post("/transactions/", json={
+            "type": "expense",
+            "amount": 100 + i,
+            "account_uid": "acct-list",
+            "category_uid": "cat-list",
+            "description": f"Trip {i}",
+        })
+        assert res.status_code == 201
+        expense_uids.append(res.json()["uid"])
+
+    for expense_uid in expense_uids:
+        res = await async_client.post("/transactions/", json={
+            "type": "reimburse",
+            "amount": 50,
+            "account_uid": "acct-list",
+            "expense_uid": expense_uid,
+        })
+        assert res.status_code == 201
+
+    res = await async_client.get("/transactions/")
+    assert res.status_code == 200
+    reimbursements = [tx for tx in res.json()["transactions"] if tx["type"] == "reimburse"]
+    assert len(reimbursements) == 3
+    for tx in reimbursements:
+        details = tx["reimbursed_transaction"]
+        assert details["uid"] == tx["expense_uid"]
+        assert details["account_name"] == "Cash"
+        assert details["category_name"] == "Travel"
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_transactions(async_client, test_db):
+    """Bulk import inserts valid items, nets balance effects and reports per-item errors."""
+    await test_db["accounts"].insert_one({"uid": "acct-bulk", "name": "Bulk", "balance": 1000})
+    await test_db["accounts"].insert_one({"uid": "acct-bulk-2", "name": "Bulk 2", "balance": 0})
+
+    items = [
+        {"type": "income", "amount": 500, "account_uid": "acct-bulk", "category_uid": "cat-bulk"},
+        {"type": "expense", "amount": 200, "account_uid": "acct-bulk", "category_uid": "cat-bulk"},
+        {"type": "transfer", "amount": 100, "transfer_fee": 5,
+         "from_account_uid": "acct-bulk", "to_account_uid": "acct-bulk-2"},
+        {"type": "expense", "amount": -1, "account_uid": "acct-bulk", "category_uid": "cat-bulk"},
+        {"type": "income", "amount": 10},
+    ]
+    res = await async_client.post("/transactions/bulk", json={"transactions": items})
+    assert res.status_code == 201, res.text
+    data = res.json()
+
+    assert data["inserted"] == 3
+    assert [err["index"] for err in data["errors"]] == [3, 4]
+    assert await test_db.transactions.count_documents({}) == 3
+
+    acct = await test_db["accounts"].find_one({"uid": "acct-bulk"})
+    assert acct["balance"] == 1000 + 500 - 200 - 105
+    acct2 = await test_db["accounts"].find_one({"uid": "acct-bulk-2"})
+    assert acct2["balance"] == 100
+
+    # Re-sending an existing uid is reported instead of failing the whole batch
+    dup = {**items[0], "uid": data["uids"][0]}
+    res = await async_client.post("/transactions/bulk", json={"transactions": [dup]})
+    assert res.status_code == 201
+    assert res.json()["inserted"] == 0
+    assert res.json()["errors"][0]["index"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_insert_and_effect_failures(test_db, monkeypatch):
+    """A rejected insert is reported per item with effects applied once; a failed effects write propagates."""
+    from pymongo.errors import BulkWriteError
+    from src.models.transaction import TransactionModel
+
+    await test_db["transactions"].create_index("uid", unique=True)
+    await test_db["accounts"].insert_one({"uid": "acct-dup", "name": "Dup", "balance": 0})
+    model = TransactionModel(test_db)
+    item = {"type": "income", "amount": 10, "account_uid": "acct-dup", "category_uid": "cat-dup", "date": datetime.now()}
+    # The in-batch duplicate gets past the existing-uid check and is rejected by the unique index
+    inserted, errors = await model.create_many([
+        {**item, "uid": "tx-a"}, {**item, "uid": "tx-a"}, {**item, "uid": "tx-b"},
+    ])
+    if inserted:
+        assert sorted(tx["uid"] for tx in inserted) == ["tx-a", "tx-b"]
+        assert [err["index"] for err in errors] == [1]
+        assert (await test_db["accounts"].find_one({"uid": "acct-dup"}))["balance"] == 20
+    else:
+        # With transactions the whole batch rolls back instead
+        assert sorted(err["index"] for err in errors) == [0, 1, 2]
+        assert (await test_db["accounts"].find_one({"uid": "acct-dup"}))["balance"] == 0
+
+    calls = []
+
+    async def failing_write(effects, session=None):
+        calls.append(effects)
+        if len(calls) == 1:
+            raise BulkWriteError({"writeErrors": [{"index": 0, "errmsg": "boom"}]})
+
+    monkeypatch.setattr(model, "_write_effects", failing_write)
+    with pytest.raises(BulkWriteError):
+        await model.create_many([{**item, "uid": "tx-c"}])
+    # Not mistaken for a rejected insert and retried
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_export_transactions_stream(async_client):
+    """Export streams every matching row as NDJSON or CSV."""
+    for i in range(3):
+        res = await async_client.post("/transactions/", json={
+            "type": "expense", "amount": 10 + i, "account_uid": "acct-exp", "category_uid": "cat-exp",
+        })
+        assert res.status_code == 201
+    res = await async_client.post("/transactions/", json={
+        "type": "income", "amount": 99, "account_uid": "acct-other", "category_uid": "cat-other",
+    })
+    assert res.status_code == 201
+
+    res = await async_client.get("/transactions/export", params={"account_uid": "acct-exp", "batch_size": 2})
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in res.text.splitlines()]
+    assert len(rows) == 3
+    assert all(row["account_uid"] == "acct-exp" for row in rows)
+
+    res = await async_client.get("/transactions/export", params={"format": "csv"})
+    assert res.status_code == 200
+    lines = res.text.strip().splitlines()
+    assert lines[0].startswith("uid,date,type,amount")
+    assert len(lines) == 1 + 4
+
+
+@pytest.mark.asyncio
+async def test_get_transactions_filters(async_client):
+    """Listing filters by type, account (including transfers), category, date and amount."""
+    txs = [
+        {"type": "expense", "amount": 20, "account_uid": "acct-f1", "category_uid": "cat-f1", "date": "2025-01-05T00:00:00"},
+        {"type": "expense", "amount": 200, "account_uid": "acct-f1", "category_uid": "cat-f2", "date": "2025-02-05T00:00:00"},
+        {"type": "income", "amount": 1000, "account_uid": "acct-f2", "category_uid": "cat-f3", "date": "2025-02-10T00:00:00"},
+        {"type": "transfer", "amount": 50, "from_account_uid": "acct-f2", "to_account_uid": "acct-f1", "date": "2025-03-01T00:00:00"},
+    ]
+    for tx in txs:
+        res = await async_client.post("/transactions/", json=tx)
+        assert res.status_code == 201
+
+    async def fetch(**params):
+        res = await async_client.get("/transactions/", params=params)
+        assert res.status_code == 200
+        return res.json()["transactions"]
+
+    assert len(await fetch(type="expense")) == 2
+    assert len(await fetch(account_uid="acct-f1")) == 3
+    assert len(await fetch(account_uid="acct-f2", type="transfer")) == 1
+    assert len(await fetch(category_uid="cat-f2")) == 1
+    assert len(await fetch(date_from="2025-02-01T00:00:00", date_to="2025-02-28T00:00:00")) == 2
+    assert len(await fetch(amount_min=50, amount_max=500)) == 2
+    assert len(await fetch(account_uid="acct-f1", limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_create_and_delete_apply_all_effects(async_client, test_db):
+    """Create applies balance, category and budget effects together; delete reverses them."""
+    await test_db["accounts"].insert_one({"uid": "acct-fx", "name": "Wallet", "balance": 1000})
+    await test_db["categories"].insert_one({
+        "uid": "cat-fx", "name": "Food", "budget": 500, "total_spent": 0, "budget_used": 0,
+    })
+
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 120, "account_uid": "acct-fx", "category_uid": "cat-fx",
+    })
+    assert res.status_code == 201
+    uid = res.json()["uid"]
+
+    acct = await test_db["accounts"].find_one({"uid": "acct-fx"})
+    cat = await test_db["categories"].find_one({"uid": "cat-fx"})
+    assert acct["balance"] == 880
+    assert cat["total_spent"] == 120
+    assert cat["budget_used"] == 120
+
+    res = await async_client.delete(f"/transactions/{uid}")
+    assert res.status_code == 200
+
+    acct = await test_db["accounts"].find_one({"uid": "acct-fx"})
+    cat = await test_db["categories"].find_one({"uid": "cat-fx"})
+    assert acct["balance"] == 1000
+    assert cat["total_spent"] == 0
+    assert cat["budget_used"] == 0
+
+
+@pytest.mark.asyncio
+async def test_update_applies_net_effects(async_client, test_db):
+    """Updating amount/category moves only the difference; description edits leave totals alone."""
+    await test_db["accounts"].insert_one({"uid": "acct-upd", "name": "Wallet", "balance": 1000})
+    await test_db["categories"].insert_many([
+        {"uid": "cat-upd-1", "name": "Food", "budget": 500, "total_spent": 0, "budget_used": 0},
+        {"uid": "cat-upd-2", "name": "Fun", "budget": 500, "total_spent": 0, "budget_used": 0},
+    ])
+
+    res = await async_client.post("/transactions/", json={
+        "type": "expense", "amount": 100, "account_uid": "acct-upd", "category_uid": "cat-upd-1",
+    })
+    uid = res.json()["uid"]
+
+    res = await async_client.patch(f"/transactions/{uid}", json={"description": "Lunch"})
+    assert res.status_code == 200
+    assert (await test_db["accounts"].find_one({"uid": "acct-upd"}))["balance"] == 900
+
+    res = await async_client.patch(f"/transactions/{uid}", json={"amount": 150, "category_uid": "cat-upd-2"})
+    assert res.status_code == 200
+
+    acct = await test_db["accounts"].find_one({"uid": "acct-upd"})
+    old_cat = await test_db["categories"].find_one({"uid": "cat-upd-1"})
+    new_cat = await test_db["categories"].find_one({"uid": "cat-upd-2"})
+    assert acct["balance"] == 850
+    assert old_cat["total_spent"] == 0 and old_cat["budget_used"] == 0
+    assert new_cat["total_spent"] == 150 and new_cat["budget_used"] == 150
+
+
+@pytest.mark.asyncio
+async def test_names_stored_and_fanned_out_on_rename(async_client, test_db):
+    """Names are written onto transactions and rewritten in the background after a rename."""
+    from src.background import rename_fanout
+
+    acct = (await async_client.post("/accounts/", json={"name": "Old Wallet", "type": "cash", "balance": 0})).json()
+    res = await async_client.post("/transactions/", json={
+        "type": "income", "amount": 10, "account_uid": acct["uid"], "category_uid": "cat-none",
+    })
+    tx_uid = res.json()["uid"]
+
+    stored = await test_db.transactions.find_one({"uid": tx_uid})
+    assert stored["account_name"] == "Old Wallet"
+
+    await async_client.patch(f"/accounts/{acct['uid']}", json={"name": "New Wallet"})
+    await rename_fanout.flush()
+
+    stored = await test_db.transactions.find_one({"uid": tx_uid})
+    assert stored["account_name"] == "New Wallet"
+    res = await async_client.get("/transactions/")
+    assert res.json()["transactions"][0]["account_name"] == "New Wallet"
+
+
+@pytest.mark.asyncio
+async def test_failed_rename_fanout_is_kept_and_retried(test_db):
+    """A failed fan-out write puts its renames back (newer names win) and the next attempt applies them."""
+    import asyncio
+    from pymongo.errors import AutoReconnect
+    from src.background import RenameFanout
+
+    await test_db.transactions.insert_one({"uid": "tx-rename", "account_uid": "acct-r", "account_name": "Old"})
+    failures = [AutoReconnect("primary stepped down")]
+
+    class FlakyDb:
+        """Fails the first bulk_write, then writes to the test database."""
+        def __getitem__(self, name):
+            collection = test_db[name]
+
+            class Collection:
+                async def bulk_write(self, operations, **kwargs):
+                    if failures:
+                        raise failures.pop()
+                    return await collection.bulk_write(operations, **kwargs)
+            return Collection()
+
+    fanout = RenameFanout(delay=0.01)
+    fanout.schedule(FlakyDb(), "account", "acct-r", "Middle")
+    fanout.schedule(FlakyDb(), "category", "cat-r", "Food")
+    with pytest.raises(AutoReconnect):
+        await fanout.flush()
+    fanout.schedule(FlakyDb(), "account", "acct-r", "New")
+
+    # The background loop retries with the merged renames
+    for _ in range(100):
+        if not fanout._pending:
+            break
+        await asyncio.sleep(0.01)
+    await fanout.flush()
+    assert (await test_db.transactions.find_one({"uid": "tx-rename"}))["account_name"] == "New"
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { createTransaction } from "../services/transactions";
+import { createTransaction, getAllTransactions } from "../services/transactions";
 import api from "../services/api";
 import toast from "react-hot-toast";
 
@@ -30,11 +30,11 @@ export default function TransactionForm({ onClose, onSuccess }) {
         const [accRes, catRes, txRes] = await Promise.all([
           api.get("/accounts/"),
           api.get("/categories/"),
-          api.get("/transactions/"),
+          getAllTransactions(),
         ]);
         setAccounts(accRes.data);
         setCategories(catRes.data);
-        setTransactions(txRes.data);
+        setTransactions(txRes);
       } catch (err) {
         console.error("Error fetching dropdown data:", err);
         toast.error("Failed to load dropdown data.");
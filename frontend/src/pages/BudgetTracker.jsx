@@ -15,7 +15,7 @@ export default function Budget() {
   const fetchCategories = async () => {
     try {
       setLoading(true);
-      const data = await getCategoryTree();
+      const data = await getCategoryTree({ frequency: selectedFrequency });
       setCategories(data);
     } catch (err) {
       console.error("Error fetching categories:", err);
@@ -27,23 +27,10 @@ export default function Budget() {
 
   useEffect(() => {
     fetchCategories();
-  }, []);
+  }, [selectedFrequency]);
 
-  // Filter categories by frequency
-  const filterByFrequency = (cats, freq) => {
-    return cats
-      .map((cat) => ({
-        ...cat,
-        children: cat.children ? filterByFrequency(cat.children, freq) : [],
-      }))
-      .filter((cat) => {
-        const hasMatchingFrequency = cat.frequency === freq;
-        const hasMatchingChildren = cat.children && cat.children.length > 0;
-        return hasMatchingFrequency || hasMatchingChildren;
-      });
-  };
-
-  const filteredCategories = filterByFrequency(categories, selectedFrequency);
+  // Categories arrive already pruned to the selected frequency
+  const filteredCategories = categories;
 
   // Calculate totals
   const calculateTotals = (cats) => {
@@ -1,7 +1,7 @@
 // frontend/src/pages/Dashboard.jsx
 import React, { useEffect, useState } from "react";
 import toast from "react-hot-toast";
-import { getAccounts, getTransactions, getCategories } from "../services/dashboard";
+import { getAccounts, getAccountsSummary, getRecentTransactions, getSummary, getCategories } from "../services/dashboard";
 
 // Import the enhanced components
 import { CategoryBudgets } from "../components/dashboard/CategoryBudgets.jsx";
@@ -20,9 +20,11 @@ export default function Dashboard() {
     const fetchDashboard = async () => {
       try {
         setLoading(true);
-        const [accData, txData, catData] = await Promise.all([
+        const [accData, summary, txData, periods, catData] = await Promise.all([
           getAccounts(),
-          getTransactions(),
+          getAccountsSummary(),
+          getRecentTransactions(10),
+          getSummary(),
           getCategories(),
         ]);
 
@@ -38,25 +40,16 @@ export default function Dashboard() {
         setAccounts(acc);
         setCategories(cat);
 
-        // Sort transactions by date descending and take latest 10
-        const latestTx = tx
-          .slice()
-          .sort((a, b) => new Date(b.date) - new Date(a.date))
-          .slice(0, 10);
+        // Already the newest 10, newest first
+        setTransactions(tx);
 
-        setTransactions(latestTx);
+        // Totals over one row per month from /summary, not over every transaction
+        const months = Array.isArray(periods) ? periods : [];
+        const income = months.reduce((sum, p) => sum + Number(p.income || 0), 0);
+        const expense = months.reduce((sum, p) => sum + Number(p.expense || 0), 0);
 
-        // Totals calculation (ensure numbers)
-        const income = tx
-          .filter((t) => t.transaction_type === "income")
-          .reduce((sum, t) => sum + Number(t.amount || 0), 0);
-
-        const expense = tx
-          .filter((t) => t.transaction_type === "expense")
-          .reduce((sum, t) => sum + Number(t.amount || 0), 0);
-
-        const balance = acc
-          .reduce((sum, a) => sum + Number(a.balance || 0), 0);
+        // Maintained on the server, so it covers every account, not just the ones listed
+        const balance = Number(summary?.total_balance || 0);
 
         setTotals({ income, expense, balance });
 
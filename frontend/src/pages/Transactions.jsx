@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { deleteTransaction } from "../services/transactions";
+import { deleteTransaction, getAllTransactions } from "../services/transactions";
 import api from "../services/api";
 import toast from "react-hot-toast";
 import TransactionForm from "../components/TransactionsForm.jsx";
@@ -37,11 +37,11 @@ export default function EnhancedTransactions() {
     try {
       setLoading(true);
       const [txRes, accRes, catRes] = await Promise.all([
-        api.get("/transactions/"),
+        getAllTransactions(),
         api.get("/accounts/"),
         api.get("/categories/"),
       ]);
-      setTransactions(txRes.data);
+      setTransactions(txRes);
       setAccounts(accRes.data);
       setCategories(catRes.data);
     } catch (err) {
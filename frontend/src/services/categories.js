@@ -12,9 +12,10 @@ export const getCategories = async () => {
   return res.data;
 };
 
-// Get tree (hierarchical)
-export const getCategoryTree = async () => {
-  const res = await api.get("/categories/tree");
+// Get tree (hierarchical); filters (frequency, is_active, transaction_type,
+// max_depth, root_uid) are applied on the server
+export const getCategoryTree = async (params = {}) => {
+  const res = await api.get("/categories/tree", { params });
   return res.data;
 };
 
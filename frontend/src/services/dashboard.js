@@ -8,8 +8,15 @@ export const getAccounts = async () => {
   return res.data;
 };
 
-export const getTransactions = async () => {
-  const res = await axios.get(`${BASE_URL}/transactions`);
+// Newest transactions: a single page, not the whole history
+export const getRecentTransactions = async (limit = 10) => {
+  const res = await axios.get(`${BASE_URL}/transactions/`, { params: { limit } });
+  return res.data.transactions;
+};
+
+// Income/expense totals per month, from the server-side rollups
+export const getSummary = async (params = {}) => {
+  const res = await axios.get(`${BASE_URL}/summary/`, { params: { granularity: "month", ...params } });
   return res.data;
 };
 
@@ -17,3 +24,8 @@ export const getCategories = async () => {
   const res = await axios.get(`${BASE_URL}/categories/tree`);
   return res.data;
 };
+
+export const getAccountsSummary = async () => {
+  const res = await axios.get(`${BASE_URL}/accounts/summary`);
+  return res.data;
+};
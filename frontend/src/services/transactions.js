@@ -1,10 +1,23 @@
 import api from "./api";
 
-export const getTransactions = async () => {
-  const response = await api.get("/transactions/");
+// GET /transactions — one page: { transactions, next_cursor }
+export const getTransactions = async (params = {}) => {
+  const response = await api.get("/transactions/", { params });
   return response.data;
 };
 
+// Follows next_cursor until the last page, for views that need the full history
+export const getAllTransactions = async (params = {}) => {
+  const all = [];
+  let cursor = null;
+  do {
+    const page = await getTransactions({ ...params, limit: 1000, ...(cursor ? { cursor } : {}) });
+    all.push(...page.transactions);
+    cursor = page.next_cursor;
+  } while (cursor);
+  return all;
+};
+
 export const getTransactionById = async (uid) => {
   const response = await api.get(`/transactions/${uid}`);
   return response.data;